@@ -0,0 +1,156 @@
+"""Local stand-in for the public APIs the pages call, for offline runs and tests.
+
+    python api_stub.py --port 8766 --latency-ms 150
+    TSHIRTGEN_HTTP_STUB=http://127.0.0.1:8766 streamlit run app.py
+
+http_client routes ``https://<host>/<path>`` to ``<stub>/<host>/<path>``
+when TSHIRTGEN_HTTP_STUB is set; this server answers with canned JSON (or
+text) shaped like each real API. Latency can be set per host, and a host can
+be made flaky (its first N requests answer 503) or slow enough to time out,
+to exercise timeouts, retries and fan-out.
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Host -> (content type, body factory taking the query)
+RESPONSES = {
+    "api.agify.io": lambda q: {"name": q.get("name", ""), "age": 42, "count": 1000},
+    "api.genderize.io": lambda q: {"name": q.get("name", ""), "gender": "female", "probability": 0.97},
+    "api.nationalize.io": lambda q: {"name": q.get("name", ""),
+                                     "country": [{"country_id": "IN", "probability": 0.61}]},
+    "official-joke-api.appspot.com": lambda q: {"setup": "Why do stubs never fail?", "punchline": "They are canned."},
+    "numbersapi.com": lambda q: "42 is the answer to everything (stub).",
+    "api.thecatapi.com": lambda q: [{"url": "https://cdn2.thecatapi.com/images/0.jpg"}],
+    "api.thedogapi.com": lambda q: [{"url": "https://cdn2.thedogapi.com/images/0.jpg"}],
+    "bored.api.lewagon.com": lambda q: {"activity": "Write a stub server", "type": "busywork", "participants": 1},
+    "geocoding-api.open-meteo.com": lambda q: {"results": [{"name": q.get("name", "London"), "country": "Stubland",
+                                                            "latitude": 51.5, "longitude": -0.12}]},
+    "api.open-meteo.com": lambda q: {
+        "current_weather": {"temperature": 18.5, "windspeed": 11.0},
+        "daily": {"time": [f"2024-06-{d:02d}" for d in range(1, 8)],
+                  "temperature_2m_max": [20, 21, 19, 22, 23, 21, 20],
+                  "temperature_2m_min": [12, 13, 11, 14, 15, 13, 12]}},
+    "restcountries.com": lambda q: [{"name": {"common": "Stubland"}, "flags": {"png": "https://flagcdn.com/w320/jp.png"},
+                                     "capital": ["Stubville"], "region": "Asia", "population": 1000000,
+                                     "area": 1234.5, "currencies": {"STB": {"name": "Stub dollar"}},
+                                     "latlng": [36.0, 138.0]}],
+    "ipapi.co": lambda q: {"ip": "203.0.113.7", "city": "Stubville", "latitude": 36.0, "longitude": 138.0},
+    "api.coingecko.com": lambda q: coin_markets(int(q.get("per_page", 10)), int(q.get("page", 1))),
+}
+_ticks = itertools.count()
+
+
+def coin_markets(per_page: int, page: int) -> list:
+    """A page of /coins/markets. Prices tick: each response moves a tenth of the coins by 1%."""
+    tick = next(_ticks)
+    out = []
+    for i in range((page - 1) * per_page, page * per_page):
+        moves = (tick + (-i) % 10) // 10       # times coin i has moved so far
+        price = 100.0 / (i + 1) * (1 + (-1) ** i * 0.01) ** moves
+        out.append({"id": f"coin{i}", "name": f"Coin {i}", "symbol": f"c{i}", "market_cap_rank": i + 1,
+                    "current_price": price, "market_cap": 10**9 // (i + 1),
+                    "price_change_percentage_24h": (-1) ** i * 1.5})
+    return out
+
+
+class StubState:
+    """Latency and failure settings, plus what the stub has served."""
+
+    def __init__(self, latency_ms: float = 0.0, host_latency_ms: Optional[Dict[str, float]] = None,
+                 flaky: Optional[Dict[str, int]] = None):
+        self.latency_ms = latency_ms
+        self.host_latency_ms = dict(host_latency_ms or {})
+        self.flaky = dict(flaky or {})
+        self.lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.peak_in_flight: Dict[str, int] = {}
+
+    def enter(self, host: str) -> bool:
+        """Count a request; False if it should fail (flaky host)."""
+        with self.lock:
+            self.hits[host] = self.hits.get(host, 0) + 1
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.peak_in_flight[host] = max(self.peak_in_flight.get(host, 0), self.in_flight[host])
+            if self.flaky.get(host, 0) > 0:
+                self.flaky[host] -= 1
+                return False
+            return True
+
+    def leave(self, host: str):
+        with self.lock:
+            self.in_flight[host] -= 1
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            host = url.path.lstrip("/").split("/", 1)[0]
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            ok = state.enter(host)
+            try:
+                time.sleep(state.host_latency_ms.get(host, state.latency_ms) / 1000)
+                if not ok:
+                    return self._send(503, {"error": "flaky"}, {"Retry-After": "0"})
+                if host not in RESPONSES:
+                    return self._send(404, {"error": f"no stub for {host}"})
+                self._send(200, RESPONSES[host](query))
+            finally:
+                state.leave(host)
+
+        def _send(self, status: int, body, headers: Optional[dict] = None):
+            text = isinstance(body, str)
+            data = (body if text else json.dumps(body)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain" if text else "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+def make_server(state: StubState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    return server
+
+def parse_host_values(items, cast) -> dict:
+    """["host=value", ...] -> {host: cast(value)}."""
+    return {k: cast(v) for k, v in (item.split("=", 1) for item in items or [])}
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Serve canned responses for the APIs the pages use.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8766)
+    p.add_argument("--latency-ms", type=float, default=0.0, help="Delay before every response")
+    p.add_argument("--host-latency", nargs="*", metavar="HOST=MS", help="Per-host delay, e.g. api.agify.io=300")
+    p.add_argument("--flaky", nargs="*", metavar="HOST=N", help="First N requests to HOST answer 503")
+    args = p.parse_args(argv)
+
+    state = StubState(args.latency_ms, parse_host_values(args.host_latency, float), parse_host_values(args.flaky, int))
+    server = make_server(state, args.host, args.port)
+    print(f"API stub on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
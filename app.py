@@ -1,281 +1,447 @@
-import io
-import math
-import random
-import colorsys
-from typing import Tuple, List
-
-import numpy as np
-import cv2
-from PIL import Image, ImageDraw, ImageFont
+import hashlib
+import os
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from engine import (PALETTE_MODES, BASE_STYLES, NOISE_TEXTURES, DesignParams, build_palette, resolve_seed,
+                    preview_params, render_design)
+from export import EXPORT_FORMATS, EXTENSIONS, MIME_TYPES, export_image, encode_png
+from profiler import NULL_PROFILER, Profiler
+from render_cache import STORE_COMPRESS_LEVEL, RenderCache, cache_key
+from spool import Spool
+
+# Modules that only one mode or panel needs (seed exploration, morphs,
+# separations, the render-server client) are imported where they are used,
+# so a cold start pays only for what the first page view draws
+# (see benchmarks/startup.py).
 
 # ---------------- Page config ----------------
 st.set_page_config(page_title="🎽 Random T‑Shirt Style Generator", page_icon="🎨", layout="wide")
 
+# Memory budgets (MB): decoded designs held in memory, and exported print
+# files spooled to disk per session and in total.
+CACHE_MEMORY_MB = int(os.environ.get("TSHIRTGEN_CACHE_MEMORY_MB", 512))
+SESSION_SPOOL_MB = int(os.environ.get("TSHIRTGEN_SESSION_SPOOL_MB", 256))
+SPOOL_MB = int(os.environ.get("TSHIRTGEN_SPOOL_MB", 2048))
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """One cache per server process, shared by every session."""
+    return RenderCache(memory_bytes=CACHE_MEMORY_MB * 2**20)
+
+@st.cache_resource
+def get_spool() -> Spool:
+    """Exported print files on disk, shared by every session under per-session budgets."""
+    return Spool(owner_bytes=SESSION_SPOOL_MB * 2**20, total_bytes=SPOOL_MB * 2**20)
+
+render_cache = get_render_cache()
+spool = get_spool()
+ctx = get_script_run_ctx()
+session_id = ctx.session_id if ctx else "bare"
+
+def spooled(key: str, build) -> bytes:
+    """This session's spooled ``key``, or ``build()`` spooled again if the
+    file was evicted (by a budget) between drawing a button and its click."""
+    entry = spool.get(session_id, key)
+    if entry is not None:
+        try:
+            return spool.read(entry)
+        except OSError:
+            pass
+    data = build()
+    spool.put(session_id, key, data)
+    return data
+
+# Print files go to a render server (render_server.py) when one is configured
+RENDER_SERVER = os.environ.get("TSHIRTGEN_RENDER_SERVER")
+
+@st.cache_resource
+def get_render_client():
+    from render_server import RenderClient
+    return RenderClient(RENDER_SERVER)
+
+@st.cache_resource
+def get_thumbnail_pool():
+    """Worker processes for contact-sheet thumbnails, shared by every session."""
+    from explore import thumbnail_pool
+    return thumbnail_pool()
+
 # ---------------- Sidebar controls ----------------
 with st.sidebar:
     st.title("⚙️ Controls")
-    seed_input = st.text_input("Seed (empty = random)", "")
+    mode = st.radio("Mode", ["Single design", "Explore seeds"], horizontal=True, key="mode")
+    seed_input = st.text_input("Seed (empty = random)", "", key="seed_input")
     width = st.number_input("Canvas width (px)", min_value=512, max_value=8000, value=3000, step=100)
     height = st.number_input("Canvas height (px)", min_value=512, max_value=8000, value=3600, step=100)
     transparent_bg = st.checkbox("Transparent background", value=False)
 
     st.markdown("---")
-    palette_mode = st.selectbox("Palette strategy", ["random", "complementary", "triadic", "analogous", "monochrome"], index=0)
-    base_style = st.selectbox("Base style", ["solid", "vertical_stripes", "radial_gradient", "linear_gradient", "noise"], index=2)
+    palette_mode = st.selectbox("Palette strategy", PALETTE_MODES, index=0)
+    base_style = st.selectbox("Base style", BASE_STYLES, index=2)
 
     st.markdown("---")
     layers_count = st.slider("Shape layers", 3, 25, 12)
     add_text = st.checkbox("Add random text overlay", value=True)
+    text_layers = st.slider("Text layers", 1, 6, 1, disabled=not add_text)
+    font_files = st.file_uploader("Custom fonts (.ttf/.otf)", type=["ttf", "otf"], accept_multiple_files=True,
+                                  disabled=not add_text)
     add_lines = st.checkbox("Add line splashes", value=True)
     add_blend_noise = st.checkbox("Blend extra noise", value=True)
-    anti_alias = st.checkbox("Anti‑alias (slightly slower)", value=True)
+    noise_texture = st.selectbox("Noise texture", NOISE_TEXTURES, index=0, disabled=not add_blend_noise)
+    anti_alias = st.checkbox("Anti‑alias shape edges", value=True)
 
     st.caption("Tip: For print, use large canvases (e.g., 4500×5400 for 15×18\" at 300 DPI).")
 
+    st.markdown("---")
+    export_format = st.selectbox("Download format", EXPORT_FORMATS, index=0)
+    if export_format == "PNG":
+        compress_level = st.slider("Compression level", 0, 9, 6, help="0 = fastest/largest, 9 = slowest/smallest")
+        quality = 90
+    elif export_format == "TIFF":
+        # Pillow writes TIFF deflate at one fixed level: it is on or off
+        compress_level = 6 if st.checkbox("Deflate compression", value=True) else 0
+        quality = 90
+    else:
+        quality = st.slider("Quality", 50, 100, 90)
+        compress_level = 6
+    optimize = st.checkbox("Optimize (smaller file, slower encode)", value=False)
+    dpi = st.number_input("DPI metadata", min_value=72, max_value=1200, value=300, step=1)
+
+    st.markdown("---")
+    profile_render = st.checkbox("Profile render (bypasses cache)", value=False)
+
 st.title("🎽 Random T‑Shirt Style Generator")
 st.markdown("Generate abstract, colorful T‑shirt print styles with procedural shapes, gradients, and noise. Use the seed to reproduce designs.")
 
-# ---------------- Utilities ----------------
-def set_seed(seed_text: str):
-    if seed_text.strip():
-        try:
-            seed_val = int(seed_text.strip())
-        except ValueError:
-            seed_val = abs(hash(seed_text)) % (2**32)
-    else:
-        seed_val = random.randint(0, 2**32 - 1)
-    random.seed(seed_val)
-    np.random.seed(seed_val)
-    return seed_val
-
-def clamp01(x):
-    """Clamp scalar or numpy array to [0,1]."""
-    return np.clip(x, 0.0, 1.0)
-
-def to_rgb_tuple(h, s, v) -> Tuple[int, int, int]:
-    r, g, b = colorsys.hsv_to_rgb(h, s, v)
-    return int(r * 255), int(g * 255), int(b * 255)
-
-def build_palette(mode: str, base_h=None) -> List[Tuple[int, int, int]]:
-    if base_h is None:
-        base_h = random.random()
-    s = 0.7 + 0.3 * random.random()
-    v = 0.8 + 0.2 * random.random()
-    palette = []
-
-    if mode == "complementary":
-        palette = [to_rgb_tuple(base_h, s, v), to_rgb_tuple((base_h + 0.5) % 1.0, s, v)]
-    elif mode == "triadic":
-        palette = [
-            to_rgb_tuple(base_h, s, v),
-            to_rgb_tuple((base_h + 1/3) % 1.0, s, v),
-            to_rgb_tuple((base_h + 2/3) % 1.0, s, v),
-        ]
-    elif mode == "analogous":
-        offsets = [-0.08, -0.04, 0.0, 0.04, 0.08]
-        palette = [to_rgb_tuple((base_h + o) % 1.0, s, v) for o in offsets]
-    elif mode == "monochrome":
-        vs = [0.35, 0.55, 0.75, 0.9]
-        palette = [to_rgb_tuple(base_h, s, v_) for v_ in vs]
-    else:  # random
-        palette = [to_rgb_tuple(random.random(), 0.6 + 0.4 * random.random(), 0.6 + 0.4 * random.random()) for _ in range(5)]
-    return palette
-
-def np_to_pil(arr: np.ndarray, mode="RGBA") -> Image.Image:
-    return Image.fromarray(arr, mode)
-
-def pil_to_np(img: Image.Image) -> np.ndarray:
-    return np.array(img)
-
-def make_base(width: int, height: int, style: str, transparent: bool) -> Image.Image:
-    if transparent:
-        base = np.zeros((height, width, 4), dtype=np.uint8)
-    else:
-        base = np.zeros((height, width, 3), dtype=np.uint8)
-        base[:] = (255, 255, 255)
-
-    if style == "solid":
-        pass
-    elif style == "radial_gradient":
-        cx, cy = width / 2, height / 2
-        yy, xx = np.mgrid[0:height, 0:width]
-        dist = np.sqrt((xx - cx)**2 + (yy - cy)**2) / np.sqrt(cx**2 + cy**2)
-        t = (1 - clamp01(dist))**1.2
-        c1 = np.array([random.randint(0, 255) for _ in range(3)], dtype=np.float32)
-        c2 = np.array([random.randint(0, 255) for _ in range(3)], dtype=np.float32)
-        grad = (c1[None, None, :] * (1 - t[..., None]) + c2[None, None, :] * t[..., None]).astype(np.uint8)
-        base[..., :3] = grad
-        if transparent and base.shape[-1] == 4:
-            base[..., 3] = 255
-    elif style == "linear_gradient":
-        yy, xx = np.mgrid[0:height, 0:width]
-        t = clamp01(xx / width)
-        c1 = np.array([random.randint(0, 255) for _ in range(3)], dtype=np.float32)
-        c2 = np.array([random.randint(0, 255) for _ in range(3)], dtype=np.float32)
-        grad = (c1[None, None, :] * (1 - t[..., None]) + c2[None, None, :] * t[..., None]).astype(np.uint8)
-        base[..., :3] = grad
-        if transparent and base.shape[-1] == 4:
-            base[..., 3] = 255
-    elif style == "noise":
-        noise = (np.random.rand(height, width, 3) * 255).astype(np.uint8)
-        base[..., :3] = cv2.GaussianBlur(noise, (0, 0), sigmaX=1.2, sigmaY=1.2)
-        if transparent and base.shape[-1] == 4:
-            base[..., 3] = 255
-
-    mode = "RGBA" if base.shape[-1] == 4 else "RGB"
-    return np_to_pil(base, mode=mode)
-
-# ---------------- Shape drawing ----------------
-def draw_shapes(img: Image.Image, palette: List[Tuple[int, int, int]], layers: int):
-    draw = ImageDraw.Draw(img, "RGBA")
-    w, h = img.size
-    for _ in range(layers):
-        color = random.choice(palette)
-        a = random.randint(100, 200)
-        fill = (*color, a)
-        shape_type = random.choice(["circle", "square", "rect", "poly", "line"])
-        cx, cy = random.randint(0, w), random.randint(0, h)
-        size = random.randint(int(0.05 * min(w, h)), int(0.35 * min(w, h)))
-
-        if shape_type == "circle":
-            bbox = [cx - size, cy - size, cx + size, cy + size]
-            draw.ellipse(bbox, fill=fill)
-        elif shape_type == "square":
-            bbox = [cx - size, cy - size, cx + size, cy + size]
-            draw.rectangle(bbox, fill=fill)
-        elif shape_type == "rect":
-            w2 = size * random.uniform(0.6, 1.6)
-            h2 = size * random.uniform(0.4, 1.4)
-            bbox = [int(cx - w2), int(cy - h2), int(cx + w2), int(cy + h2)]
-            draw.rectangle(bbox, fill=fill)
-        elif shape_type == "poly":
-            n = random.randint(3, 8)
-            pts = []
-            for i in range(n):
-                ang = 2 * math.pi * i / n + random.uniform(-0.2, 0.2)
-                r = size * random.uniform(0.6, 1.2)
-                px = int(cx + r * math.cos(ang))
-                py = int(cy + r * math.sin(ang))
-                pts.append((px, py))
-            draw.polygon(pts, fill=fill)
-
-        elif shape_type == "line":
-            x1 = random.randint(0, w)
-            y1 = random.randint(0, h)
-            x2 = random.randint(0, w)
-            y2 = random.randint(0, h)
-            stroke = (*color, 255)
-            thickness = random.randint(2, 8)
-            draw.line([(x1, y1), (x2, y2)], fill=stroke, width=thickness)
-
-# ---------------- Noise & text overlays ----------------
-def blend_noise(img: Image.Image, strength: float = 0.25):
-    """Blend random noise into the image for texture."""
-    arr = pil_to_np(img).astype(np.float32)
-    noise = (np.random.rand(*arr.shape[:2], 3) * 255).astype(np.float32)
-    arr[..., :3] = (1 - strength) * arr[..., :3] + strength * noise
-    arr = np.clip(arr, 0, 255).astype(np.uint8)
-    if arr.shape[-1] == 4:
-        arr[..., 3] = pil_to_np(img)[..., 3]
-    mode = "RGBA" if arr.shape[-1] == 4 else "RGB"
-    return np_to_pil(arr, mode)
-
-def add_text_overlay(img: Image.Image, palette: List[Tuple[int, int, int]]):
-    """Overlay random bold text onto the design."""
-    if img.mode != "RGBA":
-        img = img.convert("RGBA")
-
-    w, h = img.size
-    text = random.choice(["VIBE", "RAW", "WAVE", "BOLD", "MOTION", "EDGE"])
-    color = random.choice(palette)
-    alpha = random.randint(160, 220)
-    fill = (*color, alpha)
-
-    size = int(min(w, h) * random.uniform(0.08, 0.18))
-    try:
-        font = ImageFont.truetype("Arial.ttf", size=size)
-    except:
-        font = ImageFont.load_default()
-
-    tx = random.randint(int(0.1 * w), int(0.8 * w))
-    ty = random.randint(int(0.1 * h), int(0.8 * h))
-    angle = random.randint(-25, 25)
-
-    # Create overlay
-    temp = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    dtemp = ImageDraw.Draw(temp)
-    dtemp.text((tx, ty), text, font=font, fill=fill)
-
-    # Rotate overlay separately
-    temp = temp.rotate(angle, resample=Image.BICUBIC, center=(tx, ty), expand=False)
-
-    # Composite safely
-    img = Image.alpha_composite(img, temp)
-    return img
-
-def scale_for_antialias(img: Image.Image, aa: bool) -> Image.Image:
-    """Optionally render larger and downsample for smoother edges."""
-    if not aa:
-        return img
-    w, h = img.size
-    big = img.resize((int(w * 1.5), int(h * 1.5)), Image.BICUBIC)
-    return big.resize((w, h), Image.LANCZOS)
+# ---------------- Custom fonts ----------------
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fonts")
+
+def save_font(upload) -> str:
+    """Store an uploaded font under its content hash, so the path (and the render cache key) names its bytes."""
+    data = upload.getvalue()
+    ext = os.path.splitext(upload.name)[1].lower()
+    path = os.path.join(FONT_DIR, hashlib.sha256(data).hexdigest()[:32] + ext)
+    if not os.path.exists(path):
+        os.makedirs(FONT_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    return path
+
+fonts = tuple(save_font(f) for f in font_files or [])
 
 # ---------------- Main generate ----------------
-seed_value = set_seed(seed_input)
+seed_value = resolve_seed(seed_input)
 st.caption(f"Seed: {seed_value}")
 
-generate = st.button("🎲 Generate")
-if generate:
-    with st.spinner("Crafting your T‑shirt art..."):
-        # Base background
-        base = make_base(width, height, base_style, transparent_bg)
-
-        # Palette
-        palette = build_palette(palette_mode)
-
-        # Shapes
-        draw_shapes(base, palette, layers_count)
-
-        # Extra line splashes with OpenCV
-        if add_lines:
-            arr = pil_to_np(base)
-            for _ in range(random.randint(6, 14)):
-                x1, y1 = random.randint(0, width-1), random.randint(0, height-1)
-                x2, y2 = random.randint(0, width-1), random.randint(0, height-1)
-                color = random.choice(palette)
-                thickness = random.randint(2, 10)
-                if arr.shape[-1] == 4:
-                    cv2.line(arr[..., :3], (x1, y1), (x2, y2), color, thickness, lineType=cv2.LINE_AA)
-                else:
-                    cv2.line(arr, (x1, y1), (x2, y2), color, thickness, lineType=cv2.LINE_AA)
-            base = np_to_pil(arr, "RGBA" if arr.shape[-1] == 4 else "RGB")
-
-        # Blend noise
-        if add_blend_noise:
-            base = blend_noise(base, strength=random.uniform(0.15, 0.35))
+params = DesignParams(
+    width=int(width),
+    height=int(height),
+    transparent_bg=transparent_bg,
+    palette_mode=palette_mode,
+    base_style=base_style,
+    layers_count=layers_count,
+    add_text=add_text,
+    add_lines=add_lines,
+    add_blend_noise=add_blend_noise,
+    anti_alias=anti_alias,
+    noise_texture=noise_texture,
+    text_layers=text_layers,
+    fonts=fonts,
+)
+
+# ---------------- Seed exploration ----------------
+def promote(seed: int):
+    """Open a contact-sheet seed as the full-resolution design."""
+    st.session_state["mode"] = "Single design"
+    st.session_state["seed_input"] = str(seed)
+    st.session_state["last_design"] = (st.session_state["sheet"]["params"], seed)
+
+if mode == "Explore seeds":
+    from explore import MIN_SHEET, MAX_SHEET, THUMB_WIDTH, render_sheet, sheet_seeds
+
+    col_count, col_order = st.columns(2)
+    count = col_count.slider("Thumbnails", MIN_SHEET, MAX_SHEET, 36, step=4)
+    order = col_order.radio("Seeds", ["Consecutive from seed", "Random"], horizontal=True)
+    if st.button("🔎 Render contact sheet"):
+        seeds = sheet_seeds(seed_value, count, randomize=order == "Random")
+        st.session_state["sheet"] = {"params": params, "seeds": seeds, "thumbs": {}}
+
+    sheet = st.session_state.get("sheet")
+    if sheet is None:
+        st.info("Render a contact sheet of small thumbnails with the current settings, then pick a seed.")
+    else:
+        # Placeholders in seed order, filled as thumbnails finish
+        per_row = 6
+        cells = {}
+        for i in range(0, len(sheet["seeds"]), per_row):
+            for seed, col in zip(sheet["seeds"][i:i + per_row], st.columns(per_row)):
+                cells[seed] = col.empty()
+
+        def show(seed: int, data: bytes):
+            with cells[seed].container():
+                st.image(data, use_container_width=True)
+                st.button(f"Use {seed}", key=f"promote_{seed}", on_click=promote, args=(seed,),
+                          use_container_width=True)
+
+        pending = [s for s in sheet["seeds"] if s not in sheet["thumbs"]]
+        for seed in sheet["seeds"]:
+            if seed in sheet["thumbs"]:
+                show(seed, sheet["thumbs"][seed])
+        if pending:
+            progress = st.progress(0.0, text=f"Rendering {len(pending)} thumbnails at {THUMB_WIDTH} px…")
+            for done, (seed, data) in enumerate(render_sheet(get_thumbnail_pool(), sheet["params"], pending), 1):
+                sheet["thumbs"][seed] = data
+                show(seed, data)
+                progress.progress(done / len(pending), text=f"{done}/{len(pending)} thumbnails")
+            progress.empty()
 
-        # Text overlay
-        if add_text:
-            base = add_text_overlay(base, palette)
+else:
+    generate = st.button("🎲 Generate")
+    if generate:
+        st.session_state["last_design"] = (params, seed_value)
+
+    # Reruns from unrelated widgets keep showing the last design, served from the cache.
+    last = st.session_state.get("last_design")
+    if last is not None:
+        design_params, design_seed = last
+        workers = os.cpu_count() or 1
+        profiler = Profiler() if generate and profile_render else NULL_PROFILER
+        with profiler, st.spinner("Crafting your T‑shirt art..."):
+            # Interactive preview: the same composition at ~800 px wide
+            if profiler.enabled:
+                # Profiled runs do the cache-miss work for real
+                preview = render_design(preview_params(design_params), design_seed, workers=workers, profiler=profiler)
+                with profiler.stage("encode_png"):
+                    encode_png(preview, STORE_COMPRESS_LEVEL, workers=workers)
+            else:
+                preview, _ = render_cache.get(preview_params(design_params), design_seed, workers=workers)
+
+            # Preview, sent to the browser as a small JPEG (WebP when it needs alpha)
+            with profiler.stage("encode_preview"):
+                preview_export = export_image(preview, "WebP" if design_params.transparent_bg else "JPEG", quality=85)
+        if profiler.enabled:
+            st.session_state["render_profile"] = profiler
+
+        st.image(preview_export.data, caption=f"Preview ({preview.width}×{preview.height}) · {preview_export.summary()}",
+                 use_container_width=True)
+
+        export_settings = {"fmt": export_format, "compress_level": compress_level, "optimize": optimize,
+                           "quality": quality, "dpi": int(dpi)}
+        if RENDER_SERVER:
+            # Thin client: the render server renders and encodes; this page polls the job.
+            import requests
+            from render_server import QueueFull
+
+            client = get_render_client()
+            if st.button(f"🖨️ Render {export_format} ({design_params.width}×{design_params.height})"):
+                try:
+                    job = client.submit(design_params, design_seed, export=export_settings, owner=session_id)
+                    st.session_state["print_job"] = {"id": job["id"], "seed": design_seed, "format": export_format}
+                    st.session_state.pop("print_job_error", None)
+                except QueueFull as exc:
+                    st.warning(f"The render server is busy; try again in {exc.retry_after:.0f}s.")
+                except requests.RequestException as exc:
+                    st.error(f"Render server unavailable: {exc}")
+
+            print_job = st.session_state.get("print_job")
+            if "print_job_error" in st.session_state:
+                st.error(st.session_state["print_job_error"])
+
+            @st.fragment(run_every=1.0 if print_job and "summary" not in print_job else None)
+            def print_job_status():
+                if "summary" not in print_job:
+                    try:
+                        job = client.status(print_job["id"])
+                    except requests.RequestException as exc:
+                        st.error(f"Lost track of the render job: {exc}")
+                        return
+                    if job["status"] in ("queued", "running"):
+                        where = f"position {job['position'] + 1} in queue" if job["status"] == "queued" else "rendering"
+                        st.info(f"Print file {where}…")
+                        return
+                    if job["status"] != "done":
+                        st.session_state.pop("print_job", None)
+                        st.session_state["print_job_error"] = f"Render {job['status']}: {job['error'] or 'no result'}"
+                        st.rerun()  # stop polling; the error shows above the next run
+                    print_job["summary"] = (f"{job['format']} · {job['bytes'] / 2**20:.2f} MB · "
+                                            f"render {job['render_seconds']:.1f}s + encode {job['encode_seconds']:.1f}s"
+                                            f" · {job['wait_seconds']:.1f}s queued")
+                    st.rerun()  # stop polling
+                # The file stays in the server's spool; it is fetched only when clicked
+                fmt = print_job["format"]
+                st.download_button(f"⬇️ Download {fmt}", data=lambda: client.result(print_job["id"]),
+                                   file_name=f"tshirt_style_{print_job['seed']}.{EXTENSIONS[fmt]}",
+                                   mime=MIME_TYPES[fmt])
+                st.caption(f"Last export: {print_job['summary']}")
+
+            if print_job:
+                print_job_status()
+        else:
+            # Download: the print-resolution render and encode run only when clicked,
+            # and the file is spooled to disk (not kept in the session) so repeat
+            # downloads are served from a memory map. The callable runs on its own
+            # thread, outside the script, so it reports back through a plain dict
+            # kept in session state.
+            export_log = st.session_state.setdefault("export_log", {})
+            settings_hash = hashlib.sha256(repr(sorted(export_settings.items())).encode()).hexdigest()
+            export_key = f"{cache_key(design_params, design_seed)[:32]}-{settings_hash[:12]}.{EXTENSIONS[export_format]}"
+
+            def print_file() -> bytes:
+                img, _ = render_cache.get(design_params, design_seed, workers=workers)
+                result = export_image(img, **export_settings, workers=workers)
+                export_log["last"] = result.summary()
+                return result.data
+
+            st.download_button(
+                f"⬇️ Download {export_format} ({design_params.width}×{design_params.height})",
+                data=lambda: spooled(export_key, print_file),
+                file_name=f"tshirt_style_{design_seed}.{EXTENSIONS[export_format]}",
+                mime=MIME_TYPES[export_format]
+            )
+            if "last" in export_log:
+                st.caption(f"Last export: {export_log['last']}")
+
+        # Screen printing: reduce the print-resolution design to N spot inks, one film each
+        with st.expander("🖨️ Screen-print separations"):
+            from PIL import Image
+            from separation import DEFAULT_INKS, MAX_INKS, MIN_INKS, separate, separation_bundle
+
+            inks = st.slider("Ink colours", MIN_INKS, MAX_INKS, DEFAULT_INKS)
+            def separation_zip(params: DesignParams, seed: int, inks: int, dpi: int):
+                img, _ = render_cache.get(params, seed, workers=workers)
+                sep = separate(img, inks, build_palette(params.palette_mode, seed), workers=workers)
+                return sep, separation_bundle(sep, f"tshirt_style_{seed}_{inks}inks", dpi, workers)
+
+            if st.button(f"🧪 Separate into {inks} inks ({design_params.width}×{design_params.height})"):
+                with st.spinner("Separating…"):
+                    sep, bundle = separation_zip(design_params, design_seed, inks, int(dpi))
+                    name = f"tshirt_style_{design_seed}_{inks}inks"
+                    spool.put(session_id, f"{name}.zip", bundle)
+                    proof = sep.proof().convert("RGB")
+                    proof.thumbnail((preview.width, preview.height), Image.NEAREST)
+                st.session_state["separation"] = {
+                    "key": f"{name}.zip",
+                    "inputs": (design_params, design_seed, inks, int(dpi)),
+                    "inks": [(sep.ink_hex(i), sep.coverage[i]) for i in range(len(sep.inks))],
+                    "proof": export_image(proof, "JPEG", quality=90).data,
+                    "summary": sep.summary(),
+                }
+
+            separation = st.session_state.get("separation")
+            separation_entry = spool.get(session_id, separation["key"]) if separation else None
+            if separation_entry is not None:
+                st.image(separation["proof"], caption=f"Composite proof · {separation['summary']}")
+                for col, (color, coverage) in zip(st.columns(len(separation["inks"])), separation["inks"]):
+                    col.markdown(f"<div style='background:{color};height:2rem;border-radius:4px'></div>",
+                                 unsafe_allow_html=True)
+                    col.caption(f"{color} · {coverage * 100:.1f}%")
+                st.download_button("⬇️ Download films + proof (ZIP)",
+                                   data=lambda: spooled(separation["key"],
+                                                        lambda: separation_zip(*separation["inputs"])[1]),
+                                   file_name=separation["key"], mime="application/zip")
+
+        # Animated variant: this design morphing into a second seed
+        with st.expander("🎞️ Animated morph"):
+            from morph import (DEFAULT_FPS, DEFAULT_FRAMES, DEFAULT_WIDTH, MORPH_EXTENSIONS, MORPH_FORMATS,
+                               MORPH_MIME_TYPES, render_morph)
+
+            col_seed, col_format = st.columns(2)
+            morph_to = col_seed.text_input("Morph into seed", str(design_seed + 1))
+            morph_format = col_format.selectbox("Animation format", MORPH_FORMATS)
+            col_frames, col_fps, col_width = st.columns(3)
+            morph_frames = col_frames.slider("Frames", 8, 240, DEFAULT_FRAMES)
+            morph_fps = col_fps.slider("FPS", 6, 60, DEFAULT_FPS)
+            morph_width = col_width.number_input("Width (px)", min_value=128, max_value=1920, value=DEFAULT_WIDTH, step=32)
+            morph_loop = st.checkbox("Loop back to this design")
+            def morph_file(params: DesignParams, seed: int, to_seed: int, fmt: str, frames: int, fps: int,
+                           loop: bool) -> bytes:
+                out_path = spool.temp_path()
+                try:
+                    render_morph(params, seed, to_seed, out_path, fmt, frames, fps, loop, workers)
+                    with open(out_path, "rb") as f:
+                        return f.read()
+                finally:
+                    if os.path.exists(out_path):
+                        os.remove(out_path)
+
+            if st.button("🎬 Render animation"):
+                bar = st.progress(0.0, text="Starting workers…")
+                out_path = spool.temp_path()
+                morph_seed = resolve_seed(morph_to)
+                morph_params = preview_params(design_params, int(morph_width))
+                result = render_morph(morph_params, design_seed, morph_seed,
+                                      out_path, morph_format, morph_frames, morph_fps, morph_loop, workers,
+                                      progress=lambda i, n: bar.progress(i / n, text=f"Frame {i}/{n}"))
+                bar.empty()
+                name = f"tshirt_morph_{design_seed}_{morph_seed}.{MORPH_EXTENSIONS[morph_format]}"
+                spool.adopt(session_id, name, out_path)
+                st.session_state["morph"] = {
+                    "key": name,
+                    "inputs": (morph_params, design_seed, morph_seed, morph_format, morph_frames, morph_fps,
+                               morph_loop),
+                    "format": morph_format,
+                    "summary": result.summary(),
+                }
+
+            morph = st.session_state.get("morph")
+            morph_entry = spool.get(session_id, morph["key"]) if morph else None
+            if morph_entry is not None:
+                if morph["format"] == "GIF":
+                    st.image(morph_entry.path)
+                else:
+                    st.video(morph_entry.path)
+                st.download_button(f"⬇️ Download {morph['format']}",
+                                   data=lambda: spooled(morph["key"], lambda: morph_file(*morph["inputs"])),
+                                   file_name=morph["key"], mime=MORPH_MIME_TYPES[morph["format"]])
+                st.caption(morph["summary"])
 
-        # Anti‑alias finishing
-        base = scale_for_antialias(base, anti_alias)
+    else:
+        st.info("Click ‘Generate’ to create a fresh design. Use a seed to reproduce results.")
 
-        # Preview
-        st.image(base, caption="Generated design", use_container_width=True)
 
-        # Download
-        buf = io.BytesIO()
-        base.save(buf, format="PNG")
-        buf.seek(0)
+render_profile = st.session_state.get("render_profile")
+if profile_render and render_profile is not None:
+    with st.expander("⏱️ Render profile", expanded=True):
+        st.dataframe(render_profile.table(), use_container_width=True, hide_index=True)
         st.download_button(
-            "⬇️ Download PNG",
-            data=buf,
-            file_name=f"tshirt_style_{seed_value}.png",
-            mime="image/png"
+            "⬇️ Download Chrome trace",
+            data=render_profile.chrome_trace_json(),
+            file_name="render_trace.json",
+            mime="application/json"
         )
 
-else:
-    st.info("Click ‘Generate’ to create a fresh design. Use a seed to reproduce results.")
+stats = render_cache.stats
+usage = render_cache.usage()
+with st.sidebar.expander("Render cache"):
+    st.caption(
+        f"Hits: {stats.memory_hits} memory / {stats.disk_hits} disk · Misses: {stats.misses} "
+        f"· Hit rate: {stats.hit_rate:.0%}"
+    )
+    st.caption(
+        f"Memory: {usage['memory_items']} designs, {usage['memory_bytes'] / 2**20:.0f} MB · "
+        f"Disk: {usage['disk_items']} PNGs, {usage['disk_bytes'] / 2**20:.0f} MB"
+    )
+
+# ---------------- Memory gauge ----------------
+def process_rss() -> int:
+    """Resident set size of this server process in bytes (Linux), else 0."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+spool_usage = spool.usage(session_id)
+with st.sidebar.expander("Memory"):
+    rss = process_rss()
+    if rss:
+        st.caption(f"Server process RSS: {rss / 2**20:.0f} MB")
+    st.progress(min(1.0, usage["memory_bytes"] / usage["memory_budget"]),
+                text=f"Design cache in memory: {usage['memory_bytes'] / 2**20:.0f} / {CACHE_MEMORY_MB} MB")
+    st.progress(min(1.0, spool_usage["owner_bytes"] / spool_usage["owner_budget"]),
+                text=f"This session's spooled files: {spool_usage['owner_bytes'] / 2**20:.0f} / {SESSION_SPOOL_MB} MB "
+                     f"({spool_usage['owner_items']} files)")
+    st.progress(min(1.0, spool_usage["bytes"] / spool_usage["total_budget"]),
+                text=f"All sessions: {spool_usage['bytes'] / 2**20:.0f} / {SPOOL_MB} MB "
+                     f"({spool_usage['owners']} sessions, {spool_usage['evictions']} evicted)")
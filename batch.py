@@ -0,0 +1,186 @@
+"""Headless batch rendering: many seeds across a process pool.
+
+    python batch.py --count 1000 --out designs/ --width 1500 --height 1800
+    python batch.py --count 20000 --out catalog/ --dedupe skip --dedupe-index catalog.npz
+
+With ``--dedupe``, every seed is first fingerprinted from a small render
+(see phash.py) and checked against a persistent index of earlier designs;
+near-duplicates are flagged in the manifest or skipped before their
+full-resolution render and encode.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from engine import PALETTE_MODES, BASE_STYLES, NOISE_TEXTURES, DesignParams, render_design
+from export import EXPORT_FORMATS, DEFAULT_COMPRESS_LEVEL, export_image
+from phash import DEFAULT_RADIUS, HashIndex, design_hash
+
+
+def render_one(job) -> dict:
+    """Render a single seed in a worker and write it straight to disk."""
+    params, seed, out_dir, band_rows, export = job
+    t0 = time.perf_counter()
+    img = render_design(params, seed, band_rows)
+    render_seconds = time.perf_counter() - t0
+    result = export_image(img, **export)
+    file_name = f"tshirt_style_{seed}.{result.extension}"
+    with open(os.path.join(out_dir, file_name), "wb") as f:
+        f.write(result.data)
+    return {
+        "seed": seed,
+        "file": file_name,
+        "bytes": result.size,
+        "render_seconds": round(render_seconds, 4),
+        "encode_seconds": round(result.seconds, 4),
+        "seconds": round(time.perf_counter() - t0, 4),
+    }
+
+def hash_one(job) -> int:
+    """Fingerprint a seed in a worker from a small render."""
+    params, seed = job
+    return design_hash(params, seed)
+
+def parse_seeds(args) -> List[int]:
+    if args.seeds_file:
+        with open(args.seeds_file) as f:
+            return [int(line) for line in f if line.strip()]
+    return list(range(args.start_seed, args.start_seed + args.count))
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Render T-shirt designs for many seeds in parallel.")
+    p.add_argument("--out", default="designs", help="Output directory for PNGs and manifest.json")
+    p.add_argument("--count", type=int, default=100, help="Number of consecutive seeds to render")
+    p.add_argument("--start-seed", type=int, default=0)
+    p.add_argument("--seeds-file", help="Render the seeds listed in this file (one per line) instead")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    p.add_argument("--chunksize", type=int, default=4, help="Seeds handed to a worker at a time")
+    p.add_argument("--band-rows", type=int, default=None,
+                   help="Rows rendered per band (bounds per-worker memory; default: fit a 64 MB working set)")
+    p.add_argument("--format", choices=EXPORT_FORMATS, default="PNG")
+    p.add_argument("--compress-level", type=int, default=DEFAULT_COMPRESS_LEVEL,
+                   help="PNG zlib level, 0-9 (TIFF: 0 = uncompressed, anything else = deflate)")
+    p.add_argument("--optimize", action="store_true", help="Smaller files for a slower encode")
+    p.add_argument("--quality", type=int, default=90, help="WebP/JPEG quality")
+    p.add_argument("--dpi", type=int, default=None, help="Embed this print resolution (PNG/TIFF/JPEG)")
+    p.add_argument("--dedupe", choices=["off", "flag", "skip"], default="off",
+                   help="Check each seed's perceptual hash against the index; flag or skip near-duplicates")
+    p.add_argument("--dedupe-index", help="Persistent hash index (.npz) shared across batches "
+                                          "(default: phash_index.npz in --out)")
+    p.add_argument("--dedupe-radius", type=int, default=DEFAULT_RADIUS,
+                   help="Max Hamming distance (of 64 bits) that counts as a near-duplicate")
+
+    d = DesignParams()
+    p.add_argument("--width", type=int, default=d.width)
+    p.add_argument("--height", type=int, default=d.height)
+    p.add_argument("--transparent-bg", action="store_true")
+    p.add_argument("--palette-mode", choices=PALETTE_MODES, default=d.palette_mode)
+    p.add_argument("--base-style", choices=BASE_STYLES, default=d.base_style)
+    p.add_argument("--layers-count", type=int, default=d.layers_count)
+    p.add_argument("--no-text", dest="add_text", action="store_false")
+    p.add_argument("--no-lines", dest="add_lines", action="store_false")
+    p.add_argument("--no-blend-noise", dest="add_blend_noise", action="store_false")
+    p.add_argument("--no-anti-alias", dest="anti_alias", action="store_false")
+    p.add_argument("--noise-texture", choices=NOISE_TEXTURES, default=d.noise_texture)
+    p.add_argument("--text-layers", type=int, default=d.text_layers)
+    p.add_argument("--font", dest="fonts", action="append", default=[],
+                   help="Font file for text layers (repeat to let layers pick among several)")
+    return p
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    params = DesignParams(
+        width=args.width,
+        height=args.height,
+        transparent_bg=args.transparent_bg,
+        palette_mode=args.palette_mode,
+        base_style=args.base_style,
+        layers_count=args.layers_count,
+        add_text=args.add_text,
+        add_lines=args.add_lines,
+        add_blend_noise=args.add_blend_noise,
+        anti_alias=args.anti_alias,
+        noise_texture=args.noise_texture,
+        text_layers=args.text_layers,
+        fonts=tuple(args.fonts),
+    )
+    seeds = parse_seeds(args)
+    os.makedirs(args.out, exist_ok=True)
+
+    export = {"fmt": args.format, "compress_level": args.compress_level, "optimize": args.optimize,
+              "quality": args.quality, "dpi": args.dpi}
+    records = []
+    duplicates = {}
+    dedupe = None
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        if args.dedupe != "off":
+            # Fingerprint every seed first; decisions are made in seed order against the index
+            index_path = args.dedupe_index or os.path.join(args.out, "phash_index.npz")
+            index = HashIndex.load(index_path)
+            indexed_before = len(index)
+            hashes = list(pool.map(hash_one, [(params, seed) for seed in seeds], chunksize=args.chunksize))
+            fingerprints = {}
+            for seed, h in zip(seeds, hashes):
+                fingerprints[seed] = h
+                match = index.nearest(h, args.dedupe_radius)
+                if match is not None:
+                    duplicates[seed] = match
+                else:
+                    index.add(h, seed)
+            index.save(index_path)
+            if args.dedupe == "skip":
+                seeds = [seed for seed in seeds if seed not in duplicates]
+            dedupe = {
+                "mode": args.dedupe,
+                "index": index_path,
+                "radius": args.dedupe_radius,
+                "indexed_before": indexed_before,
+                "indexed_after": len(index),
+                "near_duplicates": len(duplicates),
+                "hash_seconds": round(time.perf_counter() - t0, 3),
+            }
+            print(f"Fingerprinted {len(hashes)} seeds: {len(duplicates)} near-duplicates "
+                  f"({'skipped' if args.dedupe == 'skip' else 'flagged'})", file=sys.stderr)
+
+        jobs = [(params, seed, args.out, args.band_rows, export) for seed in seeds]
+        for i, rec in enumerate(pool.map(render_one, jobs, chunksize=args.chunksize), 1):
+            if dedupe is not None:
+                rec["phash"] = f"{fingerprints[rec['seed']]:016x}"
+                if rec["seed"] in duplicates:
+                    rec["duplicate_of"], rec["distance"] = duplicates[rec["seed"]]
+            records.append(rec)
+            if i % max(1, len(jobs) // 20) == 0 or i == len(jobs):
+                elapsed = time.perf_counter() - t0
+                print(f"[{i}/{len(jobs)}] {i / elapsed:.2f} designs/s", file=sys.stderr)
+    elapsed = time.perf_counter() - t0
+
+    manifest = {
+        "params": params.to_dict(),
+        "export": export,
+        "workers": args.workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "designs_per_second": round(len(records) / elapsed, 3) if elapsed else None,
+        "encode_seconds": round(sum(r["encode_seconds"] for r in records), 3),
+        "output_bytes": sum(r["bytes"] for r in records),
+        "designs": records,
+    }
+    if dedupe is not None:
+        manifest["dedupe"] = dedupe
+        if args.dedupe == "skip":
+            manifest["skipped"] = [{"seed": seed, "duplicate_of": key, "distance": dist}
+                                   for seed, (key, dist) in duplicates.items()]
+    with open(os.path.join(args.out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Rendered {len(records)} designs in {elapsed:.1f}s "
+          f"({manifest['designs_per_second']} designs/s on {args.workers} workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
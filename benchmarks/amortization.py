@@ -0,0 +1,120 @@
+"""Correctness and speed of the vectorized amortization engine.
+
+    python benchmarks/amortization.py
+    python benchmarks/amortization.py --steps 100 --extra 250 --budget-s 10
+
+Checks schedules against a plain month-by-month loop (random loans, with and
+without extra and lump-sum payments) and the sweep's closed forms against
+those schedules; then times a steps^3 sweep with 360-month terms, and
+streaming it to CSV, reporting the CSV writer's peak traced memory next to
+what the grid's month-by-month schedules would take. Exits 1 if a check fails or the CSV takes
+longer than ``--budget-s``.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amortization import monthly_payment, schedule, sweep, write_sweep_csv
+
+
+def loop_schedule(amount: float, rate: float, months: int, extra: float = 0.0, lump_sums=None) -> np.ndarray:
+    """(payment, extra, interest, balance) per month, one month at a time."""
+    r = rate / 1200
+    level = float(monthly_payment(amount, rate, months))
+    balance, rows = amount, []
+    for k in range(1, months + 1):
+        interest = balance * r
+        payment = min(level, balance + interest)
+        paid_extra = min(extra + (lump_sums or {}).get(k, 0.0), balance + interest - payment)
+        balance = balance + interest - payment - paid_extra
+        if k == months and abs(balance) < 1e-6 * amount:
+            balance = 0.0
+        rows.append((payment, paid_extra, interest, balance))
+        if balance <= amount * 1e-9:
+            break
+    return np.array(rows)
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--loans", type=int, default=300, help="Random loans checked against the loop")
+    p.add_argument("--steps", type=int, default=100, help="Values per sweep axis")
+    p.add_argument("--extra", type=float, default=100.0, help="Extra monthly payment in the sweep")
+    p.add_argument("--budget-s", type=float, default=15.0, help="Budget for streaming the sweep to CSV")
+    args = p.parse_args(argv)
+
+    failures = []
+
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    rng = np.random.default_rng(0)
+    worst, mismatched, loop_s, vec_s = 0.0, 0, 0.0, 0.0
+    for _ in range(args.loans):
+        amount = rng.uniform(1e3, 1e6)
+        rate = float(rng.choice([0.0, rng.uniform(0.1, 20)]))
+        months = int(rng.integers(12, 361))
+        extra = float(rng.choice([0.0, rng.uniform(0, 2000)]))
+        lumps = {int(rng.integers(1, months + 1)): rng.uniform(0, amount / 3)} if rng.random() < 0.5 else None
+        t0 = time.perf_counter()
+        plan = schedule(amount, rate, months, extra, lumps)
+        vec_s += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        ref = loop_schedule(amount, rate, months, extra, lumps)
+        loop_s += time.perf_counter() - t0
+        if len(ref) != plan.months:
+            mismatched += 1
+            continue
+        got = np.column_stack([plan.payment, plan.extra, plan.interest, plan.balance])
+        worst = max(worst, float(np.abs(got - ref).max()) / amount)
+        if not lumps:
+            s = sweep([rate], [months / 12], [amount], extra)
+            if s.payoff_months[0, 0, 0] != plan.months or abs(s.total_interest[0, 0, 0] - plan.total_interest) > 1e-6 * amount:
+                mismatched += 1
+    check(mismatched == 0 and worst < 1e-9,
+          f"{args.loans} schedules match the loop (worst error {worst:.1e} of the amount); "
+          f"{vec_s / args.loans * 1000:.3f} ms each vs {loop_s / args.loans * 1000:.3f} ms looped")
+
+    rates = np.linspace(2, 12, args.steps)
+    years = np.linspace(5, 30, args.steps)
+    amounts = np.linspace(50_000, 1_000_000, args.steps)
+    scenarios = args.steps ** 3
+    t0 = time.perf_counter()
+    cube = sweep(rates, years, amounts, args.extra)
+    sweep_s = time.perf_counter() - t0
+    check(bool(np.isfinite(cube.total_interest).all() and (cube.interest_saved >= -1e-6).all()),
+          f"{scenarios:,}-scenario sweep (terms up to 360 months) in {sweep_s * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sweep.csv")
+        with open(path, "w", newline="") as f:
+            t0 = time.perf_counter()
+            rows = write_sweep_csv(f, rates, years, amounts, args.extra)
+            csv_s = time.perf_counter() - t0
+        size = os.path.getsize(path)
+        tracemalloc.start()
+        with open(os.devnull, "w") as f:
+            write_sweep_csv(f, rates, years, amounts, args.extra)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    schedules_bytes = scenarios * int(years.max() * 12) * 5 * 8  # payment, extra, interest, principal, balance
+    check(rows == scenarios and csv_s <= args.budget_s,
+          f"CSV: {rows:,} rows, {size / 2**20:.0f} MB in {csv_s:.1f} s; writer peak {peak / 2**20:.1f} MB "
+          f"(the grid's month-by-month schedules: {schedules_bytes / 2**30:.0f} GB)")
+
+    if failures:
+        print(f"{len(failures)} check(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Behaviour and cost of the API response cache against the API stub.
+
+    python benchmarks/api_cache.py
+    python benchmarks/api_cache.py --clients 50 --latency-ms 300
+
+Runs in-process against api_stub.py with short, scaled-down TTLs. It checks
+that:
+- N simultaneous identical requests make one upstream call (coalescing);
+- fresh hits make no call;
+- a stale response is served at once while one background call refreshes
+  it;
+- a rate-limited upstream (429) falls back to the last good response;
+- the disk tier serves a new process.
+It also reports the latency of a hit against a miss. Exits 1 if any check
+fails.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_stub import StubState, make_server
+from http_client import HttpClient
+from response_cache import CachePolicy, ResponseCache
+
+HOST = "api.coingecko.com"
+URL = f"https://{HOST}/api/v3/coins/markets?vs_currency=usd&per_page=10"
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--clients", type=int, default=20, help="Simultaneous identical requests")
+    p.add_argument("--latency-ms", type=float, default=200.0, help="Stub latency")
+    p.add_argument("--ttl", type=float, default=0.5, help="Scaled-down TTL (s); stale window = TTL")
+    args = p.parse_args(argv)
+
+    state = StubState(latency_ms=args.latency_ms)
+    server = make_server(state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = f"http://127.0.0.1:{server.server_port}"
+    policies = {(HOST, ""): CachePolicy(args.ttl, args.ttl, 60)}
+    failures = []
+
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = HttpClient(stub=stub, cache=ResponseCache(cache_dir, policies), workers=args.clients)
+        try:
+            t0 = time.perf_counter()
+            results = client.gather({i: (lambda: client.get(URL)) for i in range(args.clients)})
+            miss_ms = (time.perf_counter() - t0) * 1000
+            check(state.hits.get(HOST) == 1 and all(r.status_code == 200 for r in results.values()),
+                  f"{args.clients} simultaneous requests -> {state.hits.get(HOST)} upstream call ({miss_ms:.0f} ms)")
+
+            hit_times = []
+            for _ in range(200):
+                t0 = time.perf_counter()
+                r = client.get(URL)
+                hit_times.append((time.perf_counter() - t0) * 1000)
+            check(state.hits[HOST] == 1 and r.headers["X-Cache"] == "fresh",
+                  f"fresh hits: no upstream call, median {statistics.median(hit_times):.3f} ms "
+                  f"vs {args.latency_ms:.0f} ms upstream")
+
+            time.sleep(args.ttl * 1.2)
+            t0 = time.perf_counter()
+            r = client.get(URL)
+            stale_ms = (time.perf_counter() - t0) * 1000
+            time.sleep(args.latency_ms / 1000 + 0.1)
+            check(r.headers["X-Cache"] == "stale" and stale_ms < args.latency_ms / 2 and state.hits[HOST] == 2,
+                  f"stale-while-revalidate: served in {stale_ms:.1f} ms, refreshed in the background")
+            check(client.get(URL).headers["X-Cache"] == "fresh", "refreshed response is fresh")
+
+            time.sleep(args.ttl * 2.2)
+            state.flaky[HOST] = 100  # every call answers 503 until further notice
+            r = client.get(URL)
+            check(r.status_code == 200 and r.headers["X-Cache"] == "error-stale",
+                  f"upstream failing: last good response served ({r.headers['Age']} s old)")
+            state.flaky[HOST] = 0
+
+            restarted = HttpClient(stub=stub, cache=ResponseCache(cache_dir, {(HOST, ""): CachePolicy(60)}))
+            hits = state.hits[HOST]
+            r = restarted.get(URL)
+            check(r.headers["X-Cache"] == "fresh" and state.hits[HOST] == hits, "disk tier serves a new process")
+            restarted.close()
+            print("metrics:", {k: v for k, v in client.cache.metrics().items() if k != "by_host"})
+        finally:
+            client.close()
+            server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Count full-frame buffer copies and peak memory for one render.
+
+    python benchmarks/canvas_copies.py --width 3000 --height 3600
+    python benchmarks/canvas_copies.py --repo /path/to/other/checkout   # compare revisions
+
+Each configuration runs in a fresh subprocess so peak RSS is per render.
+A "copy" is a PIL<->NumPy conversion, Image.convert/alpha_composite/new or
+NumPy array/ascontiguousarray/concatenate call producing a buffer of at
+least half the canvas; arithmetic temporaries are covered by the NumPy
+(tracemalloc) peak instead.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = {
+    "default": {},
+    "transparent": {"transparent_bg": True},
+    "no_text": {"add_text": False},
+}
+
+
+def run_one(repo: str, config: str, width: int, height: int, seed: int) -> dict:
+    sys.path.insert(0, ROOT)
+    from profiler import Profiler  # this checkout's hooks, whichever --repo is measured
+
+    sys.path.insert(0, repo)
+    import engine
+
+    params = engine.DesignParams(width=width, height=height, **CONFIGS[config])
+    with Profiler(track_memory=False, copy_min_bytes=width * height * 3 // 2) as prof:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        img = engine.render_design(params, seed)
+        elapsed = time.perf_counter() - t0
+        _, np_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    counts = prof.copies_by_call
+    return {
+        "config": config,
+        "seconds": round(elapsed, 3),
+        "full_frame_copies": sum(counts.values()),
+        "copies_by_call": counts,
+        "numpy_peak_mb": round(np_peak / 2**20, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "output_mb": round(img.size[0] * img.size[1] * len(img.getbands()) / 2**20, 1),
+    }
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--repo", default=ROOT, help="Checkout whose engine.py to measure")
+    p.add_argument("--width", type=int, default=3000)
+    p.add_argument("--height", type=int, default=3600)
+    p.add_argument("--seed", type=int, default=1234)
+    p.add_argument("--config", choices=sorted(CONFIGS), action="append")
+    p.add_argument("--json", action="store_true", help="Print raw JSON results")
+    p.add_argument("--child", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_one(args.repo, args.child, args.width, args.height, args.seed)))
+        return 0
+
+    results = []
+    for config in args.config or list(CONFIGS):
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", config, "--repo", args.repo,
+               "--width", str(args.width), "--height", str(args.height), "--seed", str(args.seed)]
+        results.append(json.loads(subprocess.check_output(cmd).decode().strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'config':<12} {'time s':>7} {'copies':>7} {'numpy MB':>9} {'RSS MB':>8} {'output MB':>10}")
+    for r in results:
+        print(f"{r['config']:<12} {r['seconds']:>7} {r['full_frame_copies']:>7} "
+              f"{r['numpy_peak_mb']:>9} {r['peak_rss_mb']:>8} {r['output_mb']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
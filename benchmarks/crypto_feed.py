@@ -0,0 +1,128 @@
+"""Shared polling, diffs and render cost of the live crypto table, against the API stub.
+
+    python benchmarks/crypto_feed.py
+    python benchmarks/crypto_feed.py --viewers 100 --seconds 3
+
+Runs in-process against api_stub.py (whose prices tick on every request)
+with the poll floor scaled down to ``--interval``. It checks that:
+- N viewers watching at once cause one upstream request per interval, not N;
+- patching a table with each diff gives the same table as rebuilding it;
+- the cost of one refresh of the visible page (patch, then style and render
+  25 rows) stays flat from the top 10 to the top 1000 coins, where the old
+  way (rebuild from JSON, style every cell with a Python function) grows
+  with the row count.
+Exits 1 if a check fails.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_stub import StubState, make_server
+from crypto_feed import MARKETS_URL, CryptoFeed, diff, patch, style_rows
+from http_client import HttpClient
+
+HOST = "api.coingecko.com"
+PAGE_ROWS = 25
+
+
+def old_render(records: list) -> str:
+    """The previous table: rebuilt from JSON, styled cell by cell."""
+    df = pd.DataFrame(records)[["name", "symbol", "current_price", "market_cap", "price_change_percentage_24h"]]
+    df.columns = ["Name", "Symbol", "Price (USD)", "Market Cap", "24h Change %"]
+    return df.style.map(lambda v: f"color: {'green' if v > 0 else 'red'}", subset=["24h Change %"]).to_html()
+
+def _timed(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--viewers", type=int, default=50, help="Simultaneous viewers")
+    p.add_argument("--seconds", type=float, default=2.0, help="How long they watch")
+    p.add_argument("--interval", type=float, default=0.2, help="Poll interval (scaled down)")
+    p.add_argument("--latency-ms", type=float, default=20.0, help="Stub latency")
+    args = p.parse_args(argv)
+
+    state = StubState(latency_ms=args.latency_ms)
+    server = make_server(state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = HttpClient(stub=f"http://127.0.0.1:{server.server_port}")  # no response cache: every poll goes out
+    failures = []
+
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    feed = CryptoFeed(client, min_interval=args.interval, idle_after=args.interval * 2)
+    stop = time.time() + args.seconds
+
+    def viewer(i: int):
+        while time.time() < stop:
+            feed.watch(f"viewer{i}", args.interval)
+            time.sleep(args.interval / 2)
+
+    threads = [threading.Thread(target=viewer, args=(i,)) for i in range(args.viewers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    polls = state.hits.get(HOST, 0)
+    expected = args.seconds / args.interval
+    check(0 < polls <= expected + 2,
+          f"{args.viewers} viewers for {args.seconds:.0f} s at {args.interval} s: {polls} upstream requests "
+          f"(one per interval: {expected:.0f}; one per viewer per interval: {args.viewers * expected:.0f})")
+    time.sleep(args.interval * 4)
+    check(feed.active_viewers() == 0, "poller stops once every viewer has left")
+
+    # Diffs: patch a session's table snapshot by snapshot
+    feed = CryptoFeed(client, min_interval=0)
+    first = feed.refresh(250)
+    frame, previous, patched_rows, mismatches = first.frame(), first, 0, 0
+    for _ in range(20):
+        snapshot = feed.refresh(250)
+        changes = diff(previous, snapshot)
+        patch(frame, snapshot, changes)
+        patched_rows += len(changes.changed)
+        mismatches += not frame.equals(snapshot.frame())
+        previous = snapshot
+    check(mismatches == 0, f"patched tables match rebuilt ones over 20 ticks "
+                           f"({patched_rows / 20:.0f} of 250 rows patched per tick)")
+
+    # Render cost of one refresh as the table grows
+    new_ms, old_ms = {}, {}
+    for top in (10, 100, 250, 1000):
+        feed = CryptoFeed(client, min_interval=0)
+        base = feed.refresh(top)
+        frame = base.frame(top)
+        snapshot = feed.refresh(top)
+        changes = diff(base, snapshot)
+        moved = pd.Series(changes.direction, index=changes.changed)
+        new_ms[top] = _timed(lambda: style_rows(patch(frame, snapshot, changes).iloc[:PAGE_ROWS], moved).to_html())
+        records = client.get_json(f"{MARKETS_URL}?vs_currency=usd&per_page={min(top, 250)}&page=1")
+        records = records * (top // len(records)) if top > len(records) else records
+        old_ms[top] = _timed(lambda: old_render(records))
+    print("     refresh ms by top N:  " + "  ".join(f"{n}: {new_ms[n]:.1f} (was {old_ms[n]:.1f})" for n in new_ms))
+    check(new_ms[1000] < 3 * new_ms[10], "page refresh cost flat in the number of coins")
+
+    client.close()
+    server.shutdown()
+    if failures:
+        print(f"{len(failures)} check(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
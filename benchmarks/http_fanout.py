@@ -0,0 +1,100 @@
+"""Fan-out, retries, timeouts and per-host limits of http_client against the API stub.
+
+    python benchmarks/http_fanout.py
+    python benchmarks/http_fanout.py --latencies 200 300 400 --repeat 5
+
+Runs everything in-process against api_stub.py, so no network is needed.
+The name-prediction trio (agify, genderize, nationalize) is fetched one call
+after another and then with ``fetch_all``; fan-out should take about as
+long as the slowest call. It also checks that a flaky host is retried to
+success, a hung host fails at the timeout instead of blocking, and no host
+sees more concurrent calls than ``per_host``. Exits 1 if any check fails.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from api_stub import StubState, make_server
+from http_client import HttpClient
+
+PREDICT_HOSTS = ["api.agify.io", "api.genderize.io", "api.nationalize.io"]
+
+
+def predict_urls(name: str) -> dict:
+    return {host: f"https://{host}?name={name}" for host in PREDICT_HOSTS}
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--latencies", type=float, nargs=3, default=[200, 300, 400],
+                   help="Stub latency (ms) of agify, genderize and nationalize")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--per-host", type=int, default=4)
+    args = p.parse_args(argv)
+
+    state = StubState(host_latency_ms=dict(zip(PREDICT_HOSTS, args.latencies)))
+    server = make_server(state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = f"http://127.0.0.1:{server.server_port}"
+    client = HttpClient(stub=stub, per_host=args.per_host, timeout=(1.0, 2.0))
+    failures = []
+    try:
+        urls = predict_urls("Bhanu")
+        client.fetch_all(urls)  # open the pooled connections
+        serial = [timed(lambda: [client.get_json(u) for u in urls.values()]) for _ in range(args.repeat)]
+        fanout = [timed(lambda: client.fetch_all(urls)) for _ in range(args.repeat)]
+        slowest, total = max(args.latencies), sum(args.latencies)
+        print(f"Predict, serial:  {statistics.median(serial):7.1f} ms  (sum of latencies {total:.0f} ms)")
+        print(f"Predict, fan-out: {statistics.median(fanout):7.1f} ms  (slowest call {slowest:.0f} ms)")
+        if statistics.median(fanout) > slowest + 0.25 * (total - slowest):
+            failures.append("fan-out is not close to the slowest call")
+
+        state.flaky["flaky.example"] = 2
+        response = client.get("https://flaky.example/")
+        retries = client.stats().get("flaky.example", {}).get("retries", 0)
+        print(f"Flaky host (2 x 503): status {response.status_code} after {retries} retries")
+        if response.status_code != 404 or retries != 2:  # the stub has no canned body for it
+            failures.append("flaky host was not retried to an answer")
+
+        state.host_latency_ms["hung.example"] = 3000
+        slow = HttpClient(stub=stub, timeout=(1.0, 0.3), retries=1, backoff=0.05)
+        t0 = time.perf_counter()
+        try:
+            slow.get("https://hung.example/")
+            failures.append("hung host did not time out")
+        except requests.Timeout:
+            pass
+        hung_ms = (time.perf_counter() - t0) * 1000
+        print(f"Hung host: timed out after {hung_ms:.0f} ms (read timeout 300 ms, 1 retry)")
+        if hung_ms > 1500:
+            failures.append("timeout took too long")
+        slow.close()
+
+        state.host_latency_ms["busy.example"] = 100
+        client.gather({i: (lambda: client.get("https://busy.example/")) for i in range(4 * args.per_host)})
+        peak = state.peak_in_flight.get("busy.example", 0)
+        print(f"Per-host limit {args.per_host}: peak {peak} concurrent calls at the stub")
+        if peak > args.per_host:
+            failures.append("per-host limit exceeded")
+    finally:
+        client.close()
+        server.shutdown()
+
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
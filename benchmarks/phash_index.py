@@ -0,0 +1,102 @@
+"""Build and query latency of the perceptual-hash index at catalogue scale.
+
+    python benchmarks/phash_index.py --size 1000000 --radii 4 6 8 10
+    python benchmarks/phash_index.py --budget-ms 1.0      # exit 1 if any p99 is over budget
+
+Hashes are synthetic but clustered like a real catalogue: ``--clusters``
+random centres, each stored hash a few random bits away from its centre, so
+queries near a centre find many neighbours. Each query is a stored hash with
+one extra bit flipped. A sample of queries is checked against a brute-force
+popcount over the whole table.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phash import HashIndex, _popcount
+
+
+def clustered_hashes(size: int, clusters: int, flips: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.integers(0, 2**63, clusters, dtype=np.uint64) * np.uint64(2) \
+        + rng.integers(0, 2, clusters, dtype=np.uint64)
+    hashes = centres[rng.integers(0, clusters, size)]
+    for _ in range(flips):
+        flip = rng.random(size) < 0.5
+        hashes[flip] ^= np.uint64(1) << rng.integers(0, 64, int(flip.sum())).astype(np.uint64)
+    return hashes
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--size", type=int, default=1_000_000, help="Stored hashes")
+    p.add_argument("--clusters", type=int, default=20_000, help="Near-duplicate families")
+    p.add_argument("--flips", type=int, default=6, help="Random bit-flip rounds per stored hash")
+    p.add_argument("--radii", type=int, nargs="+", default=[4, 6, 8, 10])
+    p.add_argument("--queries", type=int, default=500, help="Queries per radius")
+    p.add_argument("--verify", type=int, default=20, help="Queries per radius checked by brute force")
+    p.add_argument("--budget-ms", type=float, default=None, help="Fail if any radius' p99 exceeds this")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--save", help="Write the results to this JSON file")
+    args = p.parse_args(argv)
+
+    hashes = clustered_hashes(args.size, args.clusters, args.flips, args.seed)
+    t0 = time.perf_counter()
+    index = HashIndex()
+    index.add_many(hashes, np.arange(args.size))
+    build = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.npz")
+        t0 = time.perf_counter()
+        index.save(path)
+        index = HashIndex.load(path)
+        save_load = time.perf_counter() - t0
+
+    rng = np.random.default_rng(args.seed + 1)
+    results = {"size": args.size, "build_seconds": round(build, 3), "save_load_seconds": round(save_load, 3),
+               "radii": {}}
+    print(f"{args.size} hashes: build {build:.2f} s, save+load {save_load:.2f} s")
+    print(f"{'radius':>6} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'matches':>8}")
+    failed = False
+    for radius in args.radii:
+        queries = hashes[rng.integers(0, args.size, args.queries)] \
+            ^ (np.uint64(1) << rng.integers(0, 64, args.queries).astype(np.uint64))
+        times, matches = [], 0
+        for q in queries.tolist():
+            t0 = time.perf_counter()
+            found = index.query(q, radius)
+            times.append((time.perf_counter() - t0) * 1000)
+            matches += len(found)
+        for q in queries[:args.verify].tolist():
+            expected = set(np.flatnonzero(_popcount(hashes ^ np.uint64(q)) <= radius).tolist())
+            if {key for key, _ in index.query(q, radius)} != expected:
+                print(f"radius {radius}: index disagrees with brute force for {q:016x}", file=sys.stderr)
+                return 2
+        times = np.array(times)
+        row = {"mean_ms": round(float(times.mean()), 4), "p50_ms": round(float(np.percentile(times, 50)), 4),
+               "p99_ms": round(float(np.percentile(times, 99)), 4), "max_ms": round(float(times.max()), 4),
+               "mean_matches": round(matches / args.queries, 1)}
+        results["radii"][radius] = row
+        print(f"{radius:>6} {row['mean_ms']:>8} {row['p50_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8} "
+              f"{row['mean_matches']:>8}")
+        if args.budget_ms is not None and row["p99_ms"] > args.budget_ms:
+            failed = True
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"results": results, "args": vars(args)}, f, indent=2)
+    if failed:
+        print(f"p99 over the {args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
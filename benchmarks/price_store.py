@@ -0,0 +1,159 @@
+"""Behaviour and speed of the local price store, offline against a fixture.
+
+    python benchmarks/price_store.py                            # synthetic 30-year fixture
+    python benchmarks/price_store.py --record AAPL --fixture fx # record real bars (needs the network)
+    python benchmarks/price_store.py --fixture fx --ticker AAPL # replay a recording
+
+The store is pointed at a FixtureFetcher that stops ``--lag`` bars before
+the end of the fixture. It checks that:
+- the first load fetches the whole history once;
+- every period of a ticker seen before is served with no fetch, and
+  matches slicing the fixture directly;
+- a new process reuses the stored history;
+- once time moves on, only the bars from the last stored date are fetched;
+- a new dividend (which rescales the adjusted history) triggers a full
+  re-fetch.
+Exits 1 if a check fails or a warm 5y/max load is over ``--budget-ms``.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from price_store import COLUMNS, FixtureFetcher, PriceStore, period_start, record_fixture
+
+PERIODS = ["1mo", "3mo", "6mo", "1y", "5y", "max"]
+TZ = "America/New_York"
+
+
+def synthetic_fixture(directory: str, ticker: str, years: int = 30, seed: int = 0) -> pd.DataFrame:
+    """Business-day bars ending today: a random walk with quarterly dividends."""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.now(tz=TZ).normalize()
+    index = pd.bdate_range(today - pd.DateOffset(years=years), today, tz=TZ, name="Date")
+    close = 20 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+    frame = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.003, len(index))),
+        "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(10**6, 10**8, len(index)).astype(float),
+        "Dividends": np.where(np.arange(len(index)) % 63 == 30, 0.2, 0.0),
+        "Stock Splits": 0.0}, index=index)
+    _write(directory, ticker, frame)
+    return frame
+
+def _write(directory: str, ticker: str, frame: pd.DataFrame):
+    os.makedirs(directory, exist_ok=True)
+    frame[COLUMNS].to_csv(os.path.join(directory, f"{ticker}.csv"), index_label="Date", float_format="%.17g")
+    with open(os.path.join(directory, f"{ticker}.json"), "w") as f:
+        f.write('{"symbol": "%s", "shortName": "%s Inc.", "currency": "USD", "exchangeTimezoneName": "%s"}'
+                % (ticker, ticker, TZ))
+
+def _read(directory: str, ticker: str) -> pd.DataFrame:
+    return FixtureFetcher(directory).history(ticker)[0]
+
+def _same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    return (len(a) == len(b) and bool((a.index == b.index).all())
+            and np.allclose(a[COLUMNS].to_numpy(), b[COLUMNS].to_numpy(), rtol=1e-12))
+
+def _timed(fn, repeat: int = 20) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--fixture", help="Fixture directory (default: a synthetic one in a temp dir)")
+    p.add_argument("--ticker", default="DEMO")
+    p.add_argument("--record", metavar="TICKER", help="Record TICKER's real history into --fixture and exit")
+    p.add_argument("--lag", type=int, default=10, help="Bars the fixture is behind at the first load")
+    p.add_argument("--budget-ms", type=float, default=50.0, help="Warm 5y/max load budget")
+    args = p.parse_args(argv)
+
+    if args.record:
+        if not args.fixture:
+            p.error("--record needs --fixture")
+        record_fixture(args.record, args.fixture)
+        print(f"recorded {args.record} into {args.fixture}")
+        return 0
+
+    failures = []
+
+    def check(ok: bool, what: str):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture_dir = args.fixture or os.path.join(tmp, "fixture")
+        ticker = args.ticker
+        full = _read(fixture_dir, ticker) if args.fixture else synthetic_fixture(fixture_dir, ticker)
+        days = full.index.strftime("%Y-%m-%d")
+        fetcher = FixtureFetcher(fixture_dir, as_of=days[-1 - args.lag])
+        store_dir = os.path.join(tmp, "store")
+
+        store = PriceStore(store_dir, fetcher)
+        t0 = time.perf_counter()
+        hist = store.history(ticker, "max")
+        first_ms = (time.perf_counter() - t0) * 1000
+        check(fetcher.calls == 1 and _same(hist, full.iloc[:len(full) - args.lag]),
+              f"first load: whole history ({len(hist)} bars) in one fetch, {first_ms:.0f} ms")
+
+        warm = {period: _timed(lambda: store.history(ticker, period)) for period in PERIODS}
+        now = pd.Timestamp.now(tz=TZ)
+        expected_ok = all(_same(store.history(ticker, period),
+                                full.iloc[:len(full) - args.lag][full.index[:len(full) - args.lag]
+                                                                 >= (period_start(period, now) or full.index[0])])
+                          for period in PERIODS)
+        check(fetcher.calls == 1 and expected_ok,
+              "warm loads: no fetch, same bars as slicing the fixture; median ms "
+              + ", ".join(f"{k} {v:.2f}" for k, v in warm.items()))
+        over = max(warm["5y"], warm["max"]) > args.budget_ms
+        check(not over, f"warm 5y/max within {args.budget_ms:.0f} ms")
+
+        fresh = PriceStore(store_dir, fetcher)
+        t0 = time.perf_counter()
+        fresh.history(ticker, "max")
+        check(fetcher.calls == 1, f"new process: stored history reused, {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        fetcher.as_of = days[-1]
+        store.refresh_after = 0
+        served = fetcher.rows_served
+        t0 = time.perf_counter()
+        hist = store.history(ticker, "max")
+        check(fetcher.calls == 2 and fetcher.rows_served - served == args.lag + 1 and _same(hist, full),
+              f"incremental update: {fetcher.rows_served - served} bars fetched "
+              f"({(time.perf_counter() - t0) * 1000:.0f} ms), history matches")
+
+        # A new dividend rescales every earlier adjusted price
+        next_day = full.index[-1] + pd.offsets.BDay()
+        adjusted = full.copy()
+        adjusted[["Open", "High", "Low", "Close"]] *= 0.99
+        bar = adjusted.iloc[[-1]].copy()
+        bar.index = pd.DatetimeIndex([next_day], name="Date")
+        bar["Dividends"] = 0.5
+        adjusted = pd.concat([adjusted, bar])
+        _write(fixture_dir, ticker, adjusted)
+        fetcher.as_of = None
+        hist = store.history(ticker, "max")
+        check(fetcher.calls == 4 and _same(hist, adjusted), "new dividend: full re-fetch, adjusted history stored")
+        if args.fixture:
+            _write(fixture_dir, ticker, full)  # leave a recorded fixture as it was
+
+    if failures:
+        print(f"{len(failures)} check(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Synthetic load against the render server: throughput and tail latency.
+
+    python benchmarks/render_load.py --jobs 60 --concurrency 8             # starts a local server
+    python benchmarks/render_load.py --url http://127.0.0.1:8765 --rate 2  # an already running one
+
+Clients submit jobs with a mix of canvas sizes and priorities, back off on
+429 for the server's Retry-After, and poll each job until it finishes.
+Latency is measured client-side from first submission to the job finishing,
+so it includes queueing and rejected attempts. ``--rate`` spaces submissions
+at that many jobs per second (open loop); without it every client submits
+its next job as soon as the last one finishes (closed loop).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import DesignParams
+from render_server import QueueFull, RenderClient, RenderQueue, make_server, percentile
+
+DEFAULT_SIZES = [512, 1024, 2048]
+
+
+def run_job(client: RenderClient, i: int, args, start_at: float) -> dict:
+    """Submit one job (retrying on 429), poll it to completion and time it."""
+    rng = random.Random(args.seed + i)
+    size = rng.choice(args.sizes)
+    priority = 1 if rng.random() < args.high_priority_share else 0
+    params = DesignParams(width=size, height=size)
+    delay = start_at - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+    t0 = time.perf_counter()
+    rejections = 0
+    while True:
+        try:
+            job = client.submit(params, args.seed + i, priority, args.timeout, {"fmt": args.format})
+            break
+        except QueueFull as exc:
+            rejections += 1
+            if rejections > args.max_retries:
+                return {"size": size, "priority": priority, "status": "rejected", "rejections": rejections}
+            time.sleep(exc.retry_after)
+    while job["status"] in ("queued", "running"):
+        time.sleep(args.poll)
+        job = client.status(job["id"])
+    return {"size": size, "priority": priority, "status": job["status"], "rejections": rejections,
+            "latency": time.perf_counter() - t0, "server_wait": job["wait_seconds"]}
+
+def summarize(results: List[dict], elapsed: float) -> Dict[str, dict]:
+    groups = defaultdict(list)
+    for r in results:
+        groups["all"].append(r)
+        groups[f"priority={r['priority']}"].append(r)
+        groups[f"size={r['size']}"].append(r)
+    summary = {}
+    for name, rs in groups.items():
+        latencies = [r["latency"] for r in rs if r["status"] == "done"]
+        summary[name] = {
+            "jobs": len(rs),
+            "done": len(latencies),
+            "timeout": sum(r["status"] == "timeout" for r in rs),
+            "rejected": sum(r["status"] == "rejected" for r in rs),
+            "retries_429": sum(r["rejections"] for r in rs),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(max(latencies), 4) if latencies else None,
+        }
+    summary["all"]["elapsed_seconds"] = round(elapsed, 3)
+    summary["all"]["jobs_per_second"] = round(summary["all"]["done"] / elapsed, 3) if elapsed else None
+    return summary
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--url", help="Render server to load (default: start one in-process)")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Workers for the in-process server")
+    p.add_argument("--max-queue", type=int, default=16, help="Queue limit for the in-process server")
+    p.add_argument("--jobs", type=int, default=40)
+    p.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    p.add_argument("--rate", type=float, default=None, help="Submissions per second (default: closed loop)")
+    p.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Square canvas sides to mix")
+    p.add_argument("--high-priority-share", type=float, default=0.2, help="Fraction of jobs at priority 1")
+    p.add_argument("--format", default="JPEG", help="Export format (JPEG keeps encode cost small)")
+    p.add_argument("--timeout", type=float, default=300.0, help="Per-job timeout sent to the server")
+    p.add_argument("--max-retries", type=int, default=20, help="429s tolerated per job before giving up")
+    p.add_argument("--poll", type=float, default=0.05, help="Status poll interval in seconds")
+    p.add_argument("--seed", type=int, default=1000, help="First design seed (each job uses its own)")
+    p.add_argument("--save", help="Write the summary and server stats to this JSON file")
+    args = p.parse_args(argv)
+
+    server = queue = None
+    url = args.url
+    if url is None:
+        queue = RenderQueue(args.workers, args.max_queue)
+        server = make_server(queue, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+    client = RenderClient(url)
+
+    t0 = time.perf_counter()
+    starts = [t0 + i / args.rate if args.rate else t0 for i in range(args.jobs)]
+    try:
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            results = list(pool.map(lambda i: run_job(client, i, args, starts[i]), range(args.jobs)))
+        elapsed = time.perf_counter() - t0
+        stats = client.stats()
+    finally:
+        if server is not None:
+            server.shutdown()
+            queue.close()
+
+    summary = summarize(results, elapsed)
+    print(f"{url}: {args.jobs} jobs, {args.concurrency} clients, "
+          f"{'rate ' + str(args.rate) + '/s' if args.rate else 'closed loop'}, {stats['workers']} workers")
+    print(f"{'group':<16} {'done':>5} {'t/o':>4} {'rej':>4} {'429s':>5} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7}")
+    for name, s in sorted(summary.items()):
+        print(f"{name:<16} {s['done']:>5} {s['timeout']:>4} {s['rejected']:>4} {s['retries_429']:>5} "
+              + " ".join(f"{s[k] if s[k] is not None else '-':>7}" for k in ("p50", "p95", "p99", "max")))
+    print(f"Throughput: {summary['all']['jobs_per_second']} jobs/s over {summary['all']['elapsed_seconds']} s")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"summary": summary, "server": stats, "args": vars(args)}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Stage-level benchmarks for the design generator, with a JSON baseline.
+
+    python benchmarks/stages.py --save baseline.json            # record
+    python benchmarks/stages.py --compare baseline.json         # exit 1 on regressions
+    python benchmarks/stages.py --sizes 1024 2048 --repeat 5    # smaller matrix
+
+Each stage runs over the axes that change its work, with fixed seeds:
+make_base over sizes x base styles x modes, draw_shapes over sizes x layer
+counts x modes, line splashes, blend_noise, the text overlay and the PNG
+export over sizes x modes, and the whole pipeline over the full matrix.
+A case's setup (e.g. painting the base it draws on) is not timed. Wall time is
+the best of ``--repeat`` runs; peak memory is the tracemalloc peak (NumPy
+buffers included) of one extra run, kept apart so tracing does not skew the
+timings.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from itertools import product
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+import PIL
+
+import engine
+from engine import BASE_STYLES, DesignParams
+from export import encode_png
+
+DEFAULT_SIZES = [1024, 2048, 4096, 8000]
+DEFAULT_LAYERS = [12, 25]
+MODES = ["rgb", "transparent"]
+SEED = 1234
+DEFAULT_THRESHOLD = 0.15
+# Timer and scheduler jitter on millisecond cases is not a regression.
+MIN_SLOWDOWN_SECONDS = 0.002
+
+
+def _params(size: int, mode: str, style: str = "radial_gradient", layers: int = 12) -> DesignParams:
+    return DesignParams(width=size, height=size, transparent_bg=mode == "transparent",
+                        base_style=style, layers_count=layers)
+
+def _based(p: DesignParams) -> np.ndarray:
+    """A canvas with its base painted, as the later stages receive it."""
+    canvas = engine.new_canvas(p)
+    engine.make_base(canvas, p.base_style, p.transparent_bg, SEED, engine.band_rows_for_budget(p.width))
+    return canvas
+
+def build_cases(sizes: List[int], styles: List[str], layers: List[int]) -> List[Tuple[str, Callable, Callable, int]]:
+    """(case id, setup() -> state, run(state), pixels) for the whole matrix."""
+    cases = []
+
+    def add(name, p, setup, run, **axes):
+        key = "/".join([name, f"{p.width}x{p.height}", *(f"{k}={v}" for k, v in axes.items())])
+        cases.append((key, setup, run, p.width * p.height))
+
+    for size, mode in product(sizes, MODES):
+        br = engine.band_rows_for_budget(size)
+        for style in styles:
+            p = _params(size, mode, style)
+            add("make_base", p, lambda p=p: engine.new_canvas(p),
+                lambda c, p=p, br=br: engine.make_base(c, p.base_style, p.transparent_bg, SEED, br),
+                style=style, mode=mode)
+        for n in layers:
+            p = _params(size, mode, layers=n)
+            shapes = engine.plan_shapes(size, size, engine.build_palette(p.palette_mode, SEED), n, SEED)
+            add("draw_shapes", p, lambda p=p: _based(p),
+                lambda c, s=shapes, br=br: engine.draw_shapes(c, s, True, br), layers=n, mode=mode)
+
+        p = _params(size, mode)
+        palette = engine.build_palette(p.palette_mode, SEED)
+        lines = engine.plan_line_splashes(size, size, palette, SEED)
+        add("line_splashes", p, lambda p=p: _based(p),
+            lambda c, s=lines, br=br: engine.draw_shapes(c, s, True, br), mode=mode)
+        add("blend_noise", p, lambda p=p: _based(p),
+            lambda c, br=br: engine.blend_noise(c, SEED, br), mode=mode)
+        add("text_overlay", p, lambda p=p: _based(p),
+            lambda c, pal=palette, br=br: engine.add_text_overlay(c, pal, SEED, br), mode=mode)
+        add("encode_png", p, lambda p=p: engine.render_array(p, SEED),
+            lambda c: encode_png(c), mode=mode)
+
+        for style, n in product(styles, layers):
+            p = _params(size, mode, style, n)
+            add("pipeline", p, lambda: None, lambda _, p=p: engine.render_array(p, SEED),
+                style=style, layers=n, mode=mode)
+    return cases
+
+def measure(setup: Callable, run: Callable, repeat: int) -> Tuple[float, float]:
+    """(best wall seconds, tracemalloc peak MB) of ``run`` on fresh setups."""
+    best = float("inf")
+    for _ in range(repeat):
+        state = setup()
+        t0 = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - t0)
+        del state
+
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "pillow": PIL.__version__,
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+    }
+
+def compare(results: Dict[str, dict], baseline: dict, threshold: float) -> List[str]:
+    """Cases whose time or peak memory grew by more than ``threshold`` (a fraction)."""
+    regressions = []
+    for key, r in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        for metric, unit, floor in (("seconds", "s", MIN_SLOWDOWN_SECONDS), ("peak_mb", " MB", 0.0)):
+            if base[metric] > 0 and r[metric] > base[metric] * (1 + threshold) and r[metric] - base[metric] > floor:
+                regressions.append(f"{key}: {metric} {base[metric]:.3f}{unit} -> {r[metric]:.3f}{unit} "
+                                   f"(+{r[metric] / base[metric] - 1:.0%})")
+    return regressions
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Square canvas sides")
+    p.add_argument("--styles", nargs="+", choices=BASE_STYLES, default=BASE_STYLES)
+    p.add_argument("--layers", type=int, nargs="+", default=DEFAULT_LAYERS)
+    p.add_argument("--stages", nargs="+", help="Only run cases whose stage is listed")
+    p.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    p.add_argument("--save", help="Write results to this JSON baseline")
+    p.add_argument("--compare", help="Baseline JSON to check against")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="Allowed slowdown or memory growth before failing (0.15 = 15%%)")
+    args = p.parse_args(argv)
+
+    cases = build_cases(args.sizes, args.styles, args.layers)
+    if args.stages:
+        cases = [c for c in cases if c[0].split("/")[0] in args.stages]
+
+    results = {}
+    print(f"{'case':<64} {'time s':>8} {'MP/s':>8} {'peak MB':>8}")
+    for key, setup, run, pixels in cases:
+        seconds, peak = measure(setup, run, args.repeat)
+        results[key] = {
+            "seconds": round(seconds, 5),
+            "peak_mb": round(peak, 2),
+            "megapixels_per_second": round(pixels / 1e6 / seconds, 2) if seconds else None,
+        }
+        print(f"{key:<64} {seconds:>8.3f} {results[key]['megapixels_per_second']:>8} {peak:>8.1f}")
+
+    report = {"environment": environment(), "repeat": args.repeat, "seed": SEED, "results": results}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(results)} cases to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        changed = {k: (v, report["environment"][k]) for k, v in baseline.get("environment", {}).items()
+                   if report["environment"].get(k) != v}
+        for k, (old, new) in changed.items():
+            print(f"environment: {k} {old} -> {new}")
+        regressions = compare(results, baseline, args.threshold)
+        missing = len([k for k in results if k not in baseline["results"]])
+        if missing:
+            print(f"{missing} cases have no baseline entry")
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.threshold:.0%}:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Cold-start time and import report for every page of the app, with a budget.
+
+    python benchmarks/startup.py                           # app.py and pages/*
+    python benchmarks/startup.py --budget-ms 800           # exit 1 if a page is slower
+    python benchmarks/startup.py --pages pages/3_*.py --top 10
+
+Each page's first run is timed in a fresh interpreter (``-X importtime``),
+as after a container cold start: Streamlit and its script runtime are loaded
+first by running an empty script, so the figure is what the page itself
+costs, mostly the modules it imports before drawing anything. The report
+lists the page's slowest top-level imports (cumulative, i.e. with everything
+they pull in). The median of ``--repeat`` runs is compared to the budget.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = "-- page run starts --"
+DEFAULT_BUDGET_MS = 1000.0
+
+CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+AppTest.from_string("import streamlit as st; st.set_page_config(page_icon='🎨')").run()
+sys.stderr.write("%s\n")
+sys.stderr.flush()
+t0 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+print(json.dumps({"ms": (time.perf_counter() - t0) * 1000,
+                  "exceptions": [e.message for e in at.exception]}))
+""" % MARKER
+
+
+def run_page(page: str, env: dict) -> dict:
+    """First run of ``page`` in a fresh interpreter: wall time and its top-level imports."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD, page],
+                          capture_output=True, text=True, cwd=ROOT, env=env)
+    if proc.returncode:
+        raise RuntimeError(f"{page}: {proc.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = {}
+    log = proc.stderr.split(MARKER, 1)[-1]
+    for line in log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Depth 0 (one space of indent): imported by the page, not by another module
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            imports[name.strip()] = int(cumulative) / 1000
+    result["imports"] = imports
+    result["import_ms"] = sum(imports.values())
+    return result
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--pages", nargs="+", help="Page scripts (default: app.py and pages/*.py)")
+    p.add_argument("--repeat", type=int, default=3, help="Cold runs per page (the median is reported)")
+    p.add_argument("--top", type=int, default=5, help="Slowest imports listed per page")
+    p.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Cold-start budget per page")
+    p.add_argument("--save", help="Write the results to this JSON file")
+    args = p.parse_args(argv)
+
+    pages = args.pages or ["app.py"] + sorted(glob.glob(os.path.join("pages", "*.py"), root_dir=ROOT))
+    results = {}
+    failed = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, TSHIRTGEN_CACHE_DIR=cache_dir)
+        for page in pages:
+            runs = [run_page(page, env) for _ in range(args.repeat)]
+            ms = statistics.median(r["ms"] for r in runs)
+            slowest = sorted(runs[-1]["imports"].items(), key=lambda kv: -kv[1])[:args.top]
+            results[page] = {"cold_ms": round(ms, 1), "import_ms": round(runs[-1]["import_ms"], 1),
+                             "slowest_imports": {name: round(t, 1) for name, t in slowest},
+                             "exceptions": runs[-1]["exceptions"]}
+            over = ms > args.budget_ms
+            if over or runs[-1]["exceptions"]:
+                failed.append(page)
+            print(f"{page}: {ms:.0f} ms cold ({runs[-1]['import_ms']:.0f} ms imports)"
+                  f"{'  OVER BUDGET' if over else ''}")
+            for name, t in slowest:
+                print(f"    {t:8.1f} ms  {name}")
+            for message in runs[-1]["exceptions"]:
+                print(f"    raised: {message}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "pages": results}, f, indent=2)
+    if failed:
+        print(f"{len(failed)} page(s) over the {args.budget_ms:.0f} ms budget or failing: {', '.join(failed)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Shared live feed of CoinGecko market data for the Crypto Tracker.
+
+One poller thread per process fetches the top coins by market cap (one
+request per 250) at the shortest interval any viewer asked for, and never
+more often than ``min_interval``. Viewers only read its latest snapshot, so
+N open pages cost one upstream request per interval. The thread stops when
+no viewer has checked in for ``idle_after`` seconds, and the next viewer
+starts it again.
+
+A snapshot holds one numpy array per field, ordered by market cap.
+``since(version)`` returns the latest snapshot and what changed after the
+viewer's version: the coins whose values differ, and whether coins entered,
+left or moved. The page patches those rows of the table it already has
+instead of rebuilding it, and styles and sends only the rows on screen.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+PER_REQUEST = 250                # CoinGecko's largest page
+MAX_TOP = 1000
+DEFAULT_MIN_INTERVAL = 10.0
+DEFAULT_IDLE_AFTER = 60.0
+_HISTORY = 16                    # snapshots kept for diffs
+
+# API field -> column label; the numeric fields are the ones that tick
+LABELS = {
+    "market_cap_rank": "#",
+    "name": "Name",
+    "symbol": "Symbol",
+    "current_price": "Price (USD)",
+    "market_cap": "Market Cap",
+    "price_change_percentage_24h": "24h Change %",
+}
+NUMERIC = ("market_cap_rank", "current_price", "market_cap", "price_change_percentage_24h")
+PRICE, CHANGE = LABELS["current_price"], LABELS["price_change_percentage_24h"]
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    version: int
+    fetched: float               # time.time() of the upstream call
+    ids: np.ndarray              # coin ids, by market cap
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def frame(self, top: Optional[int] = None) -> pd.DataFrame:
+        """The first ``top`` coins as a table indexed by coin id."""
+        rows = slice(None, top)
+        return pd.DataFrame({label: self.columns[field][rows] for field, label in LABELS.items()},
+                            index=pd.Index(self.ids[rows], name="id"))
+
+    def values(self, positions: np.ndarray) -> np.ndarray:
+        """The numeric columns (in NUMERIC order) of the coins at ``positions``."""
+        return np.column_stack([self.columns[field][positions] for field in NUMERIC])
+
+
+@dataclass(frozen=True)
+class SnapshotChanges:
+    since: int
+    version: int
+    changed: np.ndarray          # ids of coins whose values differ
+    direction: np.ndarray        # sign of each one's price move
+    reordered: bool              # coins entered, left or moved: rebuild rather than patch
+
+
+def diff(old: MarketSnapshot, new: MarketSnapshot) -> SnapshotChanges:
+    """What changed from ``old`` to ``new``, with whole-column comparisons."""
+    if len(old) != len(new) or not np.array_equal(old.ids, new.ids):
+        return SnapshotChanges(old.version, new.version, new.ids, np.zeros(len(new)), True)
+    differs = np.zeros(len(new), dtype=bool)
+    for field in NUMERIC:
+        a, b = old.columns[field], new.columns[field]
+        differs |= (a != b) & ~(np.isnan(a) & np.isnan(b))
+    direction = np.sign(new.columns["current_price"][differs] - old.columns["current_price"][differs])
+    return SnapshotChanges(old.version, new.version, new.ids[differs], np.nan_to_num(direction), False)
+
+
+def parse_markets(records: list) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """/coins/markets JSON -> (ids, columns)."""
+    ids = np.array([r.get("id", "") for r in records], dtype=object)
+    columns = {}
+    for field in LABELS:
+        values = [r.get(field) for r in records]
+        if field in NUMERIC:
+            columns[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            columns[field] = np.array(["" if v is None else str(v) for v in values], dtype=object)
+    return ids, columns
+
+
+class CryptoFeed:
+    """Polls the markets endpoint for whoever is watching; thread-safe."""
+
+    def __init__(self, client=None, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 idle_after: float = DEFAULT_IDLE_AFTER, url: str = MARKETS_URL):
+        if client is None:
+            from http_client import shared_client
+            client = shared_client()
+        self.client = client
+        self.min_interval = min_interval
+        self.idle_after = idle_after
+        self.url = url
+        self.upstream_calls = 0
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._viewers: Dict[str, Tuple[float, float, int]] = {}   # viewer -> (last seen, interval, top)
+        self._history = OrderedDict()   # version -> MarketSnapshot, oldest first
+        self._version = 0
+
+    # ---------------- Viewers ----------------
+    def watch(self, viewer: str, interval: float, top: int = PER_REQUEST) -> Optional[MarketSnapshot]:
+        """Check in ``viewer`` (wanting ``top`` coins every ``interval`` s) and
+        return the latest snapshot; None until the first poll lands."""
+        with self._lock:
+            self._viewers[viewer] = (time.time(), max(interval, self.min_interval), min(top, MAX_TOP))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="crypto-feed", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return self.latest()
+
+    def latest(self) -> Optional[MarketSnapshot]:
+        with self._lock:
+            return next(reversed(self._history.values()), None)
+
+    def since(self, version: Optional[int]) -> Tuple[Optional[MarketSnapshot], Optional[SnapshotChanges]]:
+        """The latest snapshot and the changes after ``version`` (None if that
+        snapshot is no longer kept, i.e. the viewer must rebuild)."""
+        with self._lock:
+            latest = next(reversed(self._history.values()), None)
+            old = self._history.get(version)
+        if latest is None or old is None:
+            return latest, None
+        return latest, diff(old, latest)
+
+    def refresh(self, top: int = PER_REQUEST) -> MarketSnapshot:
+        """Fetch now unless the latest snapshot is under ``min_interval`` old
+        and covers ``top``; concurrent callers share one call."""
+        with self._fetch_lock:
+            latest = self.latest()
+            if latest is not None and time.time() - latest.fetched < self.min_interval and len(latest) >= min(top, MAX_TOP):
+                return latest
+            return self._poll(top)
+
+    def active_viewers(self) -> int:
+        with self._lock:
+            return len(self._viewers)
+
+    # ---------------- Polling ----------------
+    def _poll(self, top: int) -> MarketSnapshot:
+        pages = math.ceil(min(top, MAX_TOP) / PER_REQUEST)
+        per_page = min(top, PER_REQUEST)
+        urls = {page: f"{self.url}?vs_currency=usd&order=market_cap_desc&per_page={per_page}&page={page}"
+                      "&sparkline=false" for page in range(1, pages + 1)}
+        with self._lock:
+            self.upstream_calls += len(urls)
+        results = self.client.fetch_all(urls)
+        for result in results.values():
+            if isinstance(result, Exception):
+                self.last_error = result
+                raise result
+        ids, columns = parse_markets([r for page in sorted(results) for r in results[page]])
+        with self._lock:
+            latest = next(reversed(self._history.values()), None)
+            if latest is not None and not diff(latest, MarketSnapshot(0, 0, ids, columns)).changed.size:
+                # Nothing moved: keep the version, so viewers have nothing to redraw
+                snapshot = MarketSnapshot(latest.version, time.time(), latest.ids, latest.columns)
+                del self._history[latest.version]
+            else:
+                self._version += 1
+                snapshot = MarketSnapshot(self._version, time.time(), ids, columns)
+            self._history[snapshot.version] = snapshot
+            while len(self._history) > _HISTORY:
+                self._history.popitem(last=False)
+            self.last_error = None
+        return snapshot
+
+    def _run(self):
+        while True:
+            now = time.time()
+            with self._lock:
+                for viewer, (seen, _, _) in list(self._viewers.items()):
+                    if now - seen > self.idle_after:
+                        del self._viewers[viewer]
+                if not self._viewers:
+                    self._thread = None
+                    return
+                interval = min(v[1] for v in self._viewers.values())
+                top = max(v[2] for v in self._viewers.values())
+            latest = self.latest()
+            due = latest is None or now - latest.fetched >= interval or len(latest) < top
+            if due:
+                try:
+                    self.refresh(top)
+                except Exception:
+                    pass  # kept in last_error; the old snapshot stays up and the next poll retries
+                latest = self.latest()
+            wait = interval - (time.time() - latest.fetched) if latest is not None else self.min_interval
+            self._wake.clear()
+            self._wake.wait(max(0.05, min(wait, self.idle_after)))
+
+
+# ---------------- Table ----------------
+def patch(frame: pd.DataFrame, snapshot: MarketSnapshot, changes: SnapshotChanges) -> pd.DataFrame:
+    """Copy the changed coins' values from ``snapshot`` into ``frame`` in place."""
+    ids = changes.changed[pd.Index(changes.changed).isin(frame.index)]
+    if len(ids):
+        positions = pd.Index(snapshot.ids).get_indexer(ids)
+        frame.loc[ids, [LABELS[f] for f in NUMERIC]] = snapshot.values(positions)
+    return frame
+
+def style_rows(rows: pd.DataFrame, moved: Optional[pd.Series] = None):
+    """Styler for the rows on screen: 24h change in green/red, and the prices
+    that just moved flashed, each computed a column at a time."""
+    styler = rows.style.format({"#": "{:.0f}", PRICE: "${:,.6g}", LABELS["market_cap"]: "${:,.0f}", CHANGE: "{:+.2f}%"},
+                               na_rep="–")
+    styler = styler.apply(lambda col: np.where(col > 0, "color: green", "color: red"), subset=[CHANGE])
+    if moved is not None and len(moved):
+        flash = moved.reindex(rows.index).to_numpy()
+        styler = styler.apply(lambda col: np.select([flash > 0, flash < 0],
+                                                    ["background-color: rgba(0, 200, 0, 0.2)",
+                                                     "background-color: rgba(220, 0, 0, 0.2)"], ""),
+                              subset=[PRICE])
+    return styler
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_feed() -> CryptoFeed:
+    """The process-wide feed every Finance page reads."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = CryptoFeed()
+        return _shared
@@ -0,0 +1,492 @@
+import math
+import random
+import colorsys
+import hashlib
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, replace
+from functools import lru_cache
+from typing import Tuple, List, Optional, Union
+
+import numpy as np
+import cv2
+from PIL import Image, ImageDraw, ImageFont
+
+from profiler import NULL_PROFILER
+from raster import shape_bounds, paint_shape, composite
+from textures import TEXTURE_KINDS, TEXTURE_SIZE, TEXTURES_PER_KIND, texture
+
+PALETTE_MODES = ["random", "complementary", "triadic", "analogous", "monochrome"]
+BASE_STYLES = ["solid", "vertical_stripes", "radial_gradient", "linear_gradient", "noise"]
+NOISE_TEXTURES = TEXTURE_KINDS
+
+
+@dataclass(frozen=True)
+class DesignParams:
+    """Everything the sidebar controls, minus the seed."""
+    width: int = 3000
+    height: int = 3600
+    transparent_bg: bool = False
+    palette_mode: str = "random"
+    base_style: str = "radial_gradient"
+    layers_count: int = 12
+    add_text: bool = True
+    add_lines: bool = True
+    add_blend_noise: bool = True
+    anti_alias: bool = True
+    noise_texture: str = "white"
+    text_layers: int = 1
+    fonts: Tuple[str, ...] = ()
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# ---------------- Seeds & RNG streams ----------------
+# Each stage (and each shape, line and noise block inside it) gets its own
+# np.random.Generator derived from (seed, stage, *key). Stages and bands can
+# then run in any order or on any thread, adding a shape does not disturb the
+# others, and nothing depends on process-salted hash() values.
+NOISE_BLOCK_ROWS = 64
+
+def resolve_seed(seed_text: Union[str, int, None]) -> int:
+    """Turn a seed input (int, numeric text, free text or empty) into an int seed."""
+    if isinstance(seed_text, int):
+        return seed_text % (2**32)
+    seed_text = (seed_text or "").strip()
+    if seed_text:
+        try:
+            return int(seed_text) % (2**32)
+        except ValueError:
+            digest = hashlib.blake2b(seed_text.encode("utf-8"), digest_size=4).digest()
+            return int.from_bytes(digest, "big")
+    return random.randint(0, 2**32 - 1)
+
+def stage_rng(seed: int, stage: str, *key: int) -> np.random.Generator:
+    """Independent, reproducible stream for one stage (and optional sub-key)."""
+    entropy = [seed, zlib.crc32(stage.encode("utf-8")), *key]
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(entropy)))
+
+def _pick(rng: np.random.Generator, items: list):
+    return items[int(rng.integers(len(items)))]
+
+def _randint(rng: np.random.Generator, a: int, b: int) -> int:
+    """Inclusive, like random.randint."""
+    return int(rng.integers(a, b + 1))
+
+def noise_rows(seed: int, stage: str, width: int, y0: int, y1: int) -> np.ndarray:
+    """uint8 RGB noise for rows [y0, y1), drawn per fixed block so any band sees the same field."""
+    out = np.empty((y1 - y0, width, 3), dtype=np.uint8)
+    for b in range(y0 // NOISE_BLOCK_ROWS, (y1 - 1) // NOISE_BLOCK_ROWS + 1):
+        b0 = b * NOISE_BLOCK_ROWS
+        block = stage_rng(seed, stage, b).integers(0, 256, (NOISE_BLOCK_ROWS, width, 3), dtype=np.uint8)
+        lo, hi = max(y0, b0), min(y1, b0 + NOISE_BLOCK_ROWS)
+        out[lo - y0:hi - y0] = block[lo - b0:hi - b0]
+    return out
+
+def clamp01(x):
+    """Clamp scalar or numpy array to [0,1]."""
+    return np.clip(x, 0.0, 1.0)
+
+def to_rgb_tuple(h, s, v) -> Tuple[int, int, int]:
+    r, g, b = colorsys.hsv_to_rgb(h, s, v)
+    return int(r * 255), int(g * 255), int(b * 255)
+
+def build_palette(mode: str, seed: int, base_h=None) -> List[Tuple[int, int, int]]:
+    rng = stage_rng(seed, "palette")
+    if base_h is None:
+        base_h = rng.random()
+    s = 0.7 + 0.3 * rng.random()
+    v = 0.8 + 0.2 * rng.random()
+    palette = []
+
+    if mode == "complementary":
+        palette = [to_rgb_tuple(base_h, s, v), to_rgb_tuple((base_h + 0.5) % 1.0, s, v)]
+    elif mode == "triadic":
+        palette = [
+            to_rgb_tuple(base_h, s, v),
+            to_rgb_tuple((base_h + 1/3) % 1.0, s, v),
+            to_rgb_tuple((base_h + 2/3) % 1.0, s, v),
+        ]
+    elif mode == "analogous":
+        offsets = [-0.08, -0.04, 0.0, 0.04, 0.08]
+        palette = [to_rgb_tuple((base_h + o) % 1.0, s, v) for o in offsets]
+    elif mode == "monochrome":
+        vs = [0.35, 0.55, 0.75, 0.9]
+        palette = [to_rgb_tuple(base_h, s, v_) for v_ in vs]
+    else:  # random
+        palette = [to_rgb_tuple(rng.random(), 0.6 + 0.4 * rng.random(), 0.6 + 0.4 * rng.random()) for _ in range(5)]
+    return palette
+
+# ---------------- Canvas & bands ----------------
+# Every stage draws its random parameters once, then paints the canvas in
+# horizontal bands of ``band_rows`` rows. Stage temporaries are sized by the
+# band, not the canvas, so the working set stays under a fixed ceiling, and
+# the pixels do not depend on the band height. Bands of one stage touch
+# disjoint rows, so they can be painted on worker threads.
+DEFAULT_BAND_BYTES = 64 * 2**20
+# Rough peak bytes of stage temporaries per canvas pixel in a band (float32
+# copies in blend_noise and the shape rasterizer).
+_TEMP_BYTES_PER_PIXEL = 48
+_MIN_BAND_ROWS = 16
+_NOISE_BLUR_HALO = 8  # >= radius of the sigma=1.2 Gaussian kernel
+
+def new_canvas(params: DesignParams) -> np.ndarray:
+    """The one buffer every stage paints into: contiguous uint8 RGBA, opaque
+    designs just keep alpha at 255. RGBA is the layout PIL can wrap without
+    copying (see canvas_image)."""
+    return np.empty((params.height, params.width, 4), dtype=np.uint8)
+
+def canvas_image(canvas: np.ndarray) -> Image.Image:
+    """Zero-copy PIL view of a contiguous RGBA canvas (PIL treats it as read-only)."""
+    h, w = canvas.shape[:2]
+    return Image.frombuffer("RGBA", (w, h), canvas, "raw", "RGBA", 0, 1)
+
+def band_rows_for_budget(width: int, budget_bytes: int = DEFAULT_BAND_BYTES) -> int:
+    """Largest band height whose stage temporaries fit in ``budget_bytes``."""
+    return max(_MIN_BAND_ROWS, budget_bytes // (width * _TEMP_BYTES_PER_PIXEL))
+
+def iter_bands(height: int, band_rows: int):
+    for y0 in range(0, height, band_rows):
+        yield y0, min(height, y0 + band_rows)
+
+def for_each_band(paint, height: int, band_rows: int, workers: int = 1):
+    """Call ``paint(y0, y1)`` for every band, on a thread pool when workers > 1."""
+    bands = list(iter_bands(height, band_rows))
+    if workers <= 1 or len(bands) == 1:
+        for y0, y1 in bands:
+            paint(y0, y1)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda b: paint(*b), bands))
+
+# Gradients are a 256-entry colour table indexed by a uint8 "position" field.
+# The field depends only on (width, height, style), so it is built once and
+# shared by every seed; a render then costs one 4-byte gather per pixel.
+GRADIENT_STYLES = ("radial_gradient", "linear_gradient")
+_GRADIENT_FIELDS_CACHED = 4
+
+@lru_cache(maxsize=_GRADIENT_FIELDS_CACHED)
+def gradient_field(width: int, height: int, style: str) -> np.ndarray:
+    """Read-only (height, width) uint8 gradient position, 0 = first colour, 255 = second."""
+    if style == "linear_gradient":
+        row = (np.arange(width, dtype=np.float32) * np.float32(255 / width) + 0.5).astype(np.uint8)
+        return np.broadcast_to(row, (height, width))
+
+    cx, cy = width / 2, height / 2
+    dx2 = (np.arange(width, dtype=np.float32) - np.float32(cx)) ** 2
+    inv_norm = np.float32(1 / math.sqrt(cx**2 + cy**2))
+    field = np.empty((height, width), dtype=np.uint8)
+    for y0, y1 in iter_bands(height, band_rows_for_budget(width)):
+        dy2 = (np.arange(y0, y1, dtype=np.float32) - np.float32(cy)) ** 2
+        d = np.sqrt(dx2[None, :] + dy2[:, None])
+        d *= inv_norm
+        np.minimum(d, 1, out=d)
+        t = np.power(1 - d, np.float32(1.2), out=d)
+        t *= 255
+        t += 0.5
+        field[y0:y1] = t
+    field.flags.writeable = False
+    return field
+
+def gradient_lut(c1: np.ndarray, c2: np.ndarray) -> np.ndarray:
+    """(256,) uint32 opaque RGBA pixels from c1 to c2, to gather into a canvas viewed as uint32."""
+    t = np.arange(256, dtype=np.float32)[:, None] / 255
+    lut = np.full((256, 4), 255, dtype=np.uint8)
+    lut[:, :3] = c1[None, :] * (1 - t) + c2[None, :] * t
+    return lut.view(np.uint32).ravel()
+
+def gradient_colors(seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The two float32 RGB end colours of a seed's gradient base."""
+    rng = stage_rng(seed, "base")
+    c1 = np.array([_randint(rng, 0, 255) for _ in range(3)], dtype=np.float32)
+    c2 = np.array([_randint(rng, 0, 255) for _ in range(3)], dtype=np.float32)
+    return c1, c2
+
+def paint_gradient(canvas: np.ndarray, style: str, c1: np.ndarray, c2: np.ndarray, band_rows: int, workers: int = 1):
+    """Fill the canvas with an opaque ``style`` gradient from c1 to c2."""
+    height, width = canvas.shape[:2]
+    lut = gradient_lut(c1, c2)
+    field = gradient_field(width, height, style)
+    pixels = canvas.view(np.uint32)[..., 0]
+
+    def paint(y0, y1):
+        np.take(lut, field[y0:y1], out=pixels[y0:y1], mode="clip")
+    for_each_band(paint, height, band_rows, workers)
+
+def make_base(canvas: np.ndarray, style: str, transparent: bool, seed: int, band_rows: int, workers: int = 1):
+    height, width = canvas.shape[:2]
+
+    if style in GRADIENT_STYLES:
+        paint_gradient(canvas, style, *gradient_colors(seed), band_rows, workers)
+        return
+
+    if style == "noise":
+        # Each band blurs its rows plus a halo; noise blocks are seeded by
+        # position, so the halo rows match what the neighbouring band sees.
+        halo = _NOISE_BLUR_HALO
+
+        def paint(y0, y1):
+            lo, hi = max(0, y0 - halo), min(height, y1 + halo)
+            blurred = cv2.GaussianBlur(noise_rows(seed, "base", width, lo, hi), (0, 0), sigmaX=1.2, sigmaY=1.2)
+            # Widen to opaque RGBA straight into the (contiguous) band
+            cv2.cvtColor(blurred[y0 - lo:y1 - lo], cv2.COLOR_RGB2RGBA, dst=canvas[y0:y1])
+        for_each_band(paint, height, band_rows, workers)
+        return
+
+    # solid, or a style without a renderer yet: the plain fill
+    canvas[:] = 0 if transparent else 255
+
+# ---------------- Shape drawing ----------------
+# Planners draw positions and sizes as fractions of the canvas and scale them
+# to pixels only at the end, so a seed lays out the same composition at any
+# resolution and a small preview stands in for the print-size render. Stroke
+# widths were tuned in pixels on the default canvas and scale with its short side.
+REFERENCE_SIDE = 3000
+
+def plan_shape(width: int, height: int, palette: List[Tuple[int, int, int]], rng: np.random.Generator) -> tuple:
+    """Draw one shape's parameters as (kind, geometry, fill[, width])."""
+    w, h = width, height
+    m = min(w, h)
+    color = _pick(rng, palette)
+    a = _randint(rng, 100, 200)
+    fill = (*color, a)
+    shape_type = _pick(rng, ["circle", "square", "rect", "poly", "line"])
+    cx, cy = rng.random() * w, rng.random() * h
+    size = rng.uniform(0.05, 0.35) * m
+
+    if shape_type == "circle":
+        bbox = [cx - size, cy - size, cx + size, cy + size]
+        return ("circle", bbox, fill)
+    elif shape_type == "square":
+        bbox = [cx - size, cy - size, cx + size, cy + size]
+        return ("rect", bbox, fill)
+    elif shape_type == "rect":
+        w2 = size * rng.uniform(0.6, 1.6)
+        h2 = size * rng.uniform(0.4, 1.4)
+        bbox = [cx - w2, cy - h2, cx + w2, cy + h2]
+        return ("rect", bbox, fill)
+    elif shape_type == "poly":
+        n = _randint(rng, 3, 8)
+        pts = []
+        for i in range(n):
+            ang = 2 * math.pi * i / n + rng.uniform(-0.2, 0.2)
+            r = size * rng.uniform(0.6, 1.2)
+            pts.append((cx + r * math.cos(ang), cy + r * math.sin(ang)))
+        return ("poly", pts, fill)
+    else:  # line
+        x1, y1 = rng.random() * w, rng.random() * h
+        x2, y2 = rng.random() * w, rng.random() * h
+        stroke = (*color, 255)
+        thickness = rng.uniform(2, 8) * m / REFERENCE_SIDE
+        return ("line", [(x1, y1), (x2, y2)], stroke, thickness)
+
+def plan_shapes(width: int, height: int, palette: List[Tuple[int, int, int]], layers: int, seed: int) -> list:
+    """Shape i always comes from its own stream, whatever the layer count."""
+    return [plan_shape(width, height, palette, stage_rng(seed, "shapes", i)) for i in range(layers)]
+
+def draw_shapes(canvas: np.ndarray, shapes: list, aa: bool, band_rows: int, workers: int = 1):
+    """Paint planned shapes band by band with the coverage rasterizer."""
+    bounds = [shape_bounds(s) for s in shapes]
+
+    def paint(y0, y1):
+        for shape, b in zip(shapes, bounds):
+            if b[3] > y0 and b[1] < y1:
+                paint_shape(canvas, shape, y0, y1, aa, b)
+    for_each_band(paint, canvas.shape[0], band_rows, workers)
+
+def plan_line_splashes(width: int, height: int, palette: List[Tuple[int, int, int]], seed: int) -> list:
+    """Extra opaque line splashes, as rasterizer line shapes."""
+    w, h = width, height
+    lines = []
+    for i in range(_randint(stage_rng(seed, "lines"), 6, 14)):
+        rng = stage_rng(seed, "lines", i)
+        x1, y1 = rng.random() * w, rng.random() * h
+        x2, y2 = rng.random() * w, rng.random() * h
+        color = _pick(rng, palette)
+        thickness = rng.uniform(2, 10) * min(w, h) / REFERENCE_SIDE
+        lines.append(("line", [(x1, y1), (x2, y2)], (*color, 255), thickness))
+    return lines
+
+# ---------------- Noise & text overlays ----------------
+# Noise is blended on the canvas viewed as uint32 RGBA pixels, two 8-bit
+# lanes per multiply (R/B in 0x00FF00FF, G in 0x0000FF00): each lane is
+# (dst * (256 - a) + noise * a) >> 8 with ``a`` the strength in 1/256ths,
+# and the alpha byte is carried over untouched.
+_LANES_RB = np.uint32(0x00FF00FF)
+_LANE_G = np.uint32(0x0000FF00)
+_LANE_A = np.uint32(0xFF000000)
+
+def blend_noise(canvas: np.ndarray, seed: int, band_rows: int, workers: int = 1, kind: str = "white"):
+    """Blend a tileable bank texture into the image for texture, in place and in fixed point."""
+    rng = stage_rng(seed, "noise")
+    strength = rng.uniform(0.15, 0.35)
+    index = _randint(rng, 0, TEXTURES_PER_KIND - 1)
+    dx, dy = _randint(rng, 0, TEXTURE_SIZE - 1), _randint(rng, 0, TEXTURE_SIZE - 1)
+
+    height, width = canvas.shape[:2]
+    a = np.uint32(round(strength * 256))
+    keep = np.uint32(256) - a
+
+    # One tile-high strip of the texture, repeated across the canvas width
+    # and pre-multiplied by ``a``; canvas row y reads strip row (y + dy) % size.
+    strip = np.zeros((TEXTURE_SIZE, width, 4), dtype=np.uint8)
+    strip[..., :3] = texture(kind, index)[:, (np.arange(width) + dx) % TEXTURE_SIZE]
+    strip = strip.view(np.uint32)[..., 0]
+    noise_rb, noise_g = (strip & _LANES_RB) * a, (strip & _LANE_G) * a
+    pixels = canvas.view(np.uint32)[..., 0]
+
+    def paint(y0, y1):
+        r0 = y0
+        while r0 < y1:
+            # Rows up to where the strip wraps back to its first row
+            s0 = (r0 + dy) % TEXTURE_SIZE
+            r1 = min(y1, r0 + TEXTURE_SIZE - s0)
+            dst = pixels[r0:r1]
+            rb = dst & _LANES_RB
+            rb *= keep
+            rb += noise_rb[s0:s0 + r1 - r0]
+            rb >>= 8
+            rb &= _LANES_RB
+            g = dst & _LANE_G
+            g *= keep
+            g += noise_g[s0:s0 + r1 - r0]
+            g >>= 8
+            g &= _LANE_G
+            rb |= g
+            dst &= _LANE_A
+            dst |= rb
+            r0 = r1
+    for_each_band(paint, height, band_rows, workers)
+
+TEXT_WORDS = ["VIBE", "RAW", "WAVE", "BOLD", "MOTION", "EDGE"]
+_FONTS_CACHED = 32
+
+@lru_cache(maxsize=_FONTS_CACHED)
+def load_font(font: Optional[str], size: int) -> ImageFont.ImageFont:
+    """Font file ``font`` (None = the default face) at ``size`` px, kept in an LRU cache."""
+    try:
+        return ImageFont.truetype(font or "Arial.ttf", size=size)
+    except OSError:
+        if font:
+            raise
+        # Pillow's bundled scalable font, so text keeps its proportions at any canvas size
+        return ImageFont.load_default(size=size)
+
+def add_text_overlay(canvas: np.ndarray, palette: List[Tuple[int, int, int]], seed: int, band_rows: int,
+                     layers: int = 1, fonts: Tuple[str, ...] = ()):
+    """Overlay random bold text onto the design, one word per layer.
+
+    ``fonts`` are font files to pick from per layer (default face if empty).
+    """
+    for i in range(layers):
+        _text_layer(canvas, palette, stage_rng(seed, "text", i), band_rows, fonts)
+
+def _text_layer(canvas: np.ndarray, palette: List[Tuple[int, int, int]], rng: np.random.Generator,
+                band_rows: int, fonts: Tuple[str, ...]):
+    h, w = canvas.shape[:2]
+    text = _pick(rng, TEXT_WORDS)
+    color = _pick(rng, palette)
+    alpha = _randint(rng, 160, 220)
+    fill = (*color, alpha)
+
+    size = max(1, int(min(w, h) * rng.uniform(0.08, 0.18)))
+    font = load_font(_pick(rng, list(fonts)) if fonts else None, size)
+
+    tx = int(w * rng.uniform(0.1, 0.8))
+    ty = int(h * rng.uniform(0.1, 0.8))
+    angle = rng.uniform(-25, 25)
+
+    # Glyph coverage mask over just the text's bounding box
+    l, t, r, b = font.getbbox(text)
+    if r <= l or b <= t:
+        return
+    mask = Image.new("L", (r - l, b - t), 0)
+    ImageDraw.Draw(mask).text((-l, -t), text, font=font, fill=255)
+
+    # Rotate about the text origin (tx, ty), counter-clockwise like
+    # Image.rotate, straight into the rotated box's window on the canvas.
+    rot = cv2.getRotationMatrix2D((float(tx), float(ty)), angle, 1.0)
+    corners = np.array([[tx + x, ty + y, 1.0] for x in (l, r) for y in (t, b)]) @ rot.T
+    wx0, wy0 = (max(0, int(math.floor(v)) - 2) for v in corners.min(axis=0))
+    wx1 = min(w, int(math.ceil(corners[:, 0].max())) + 3)
+    wy1 = min(h, int(math.ceil(corners[:, 1].max())) + 3)
+    if wx0 >= wx1 or wy0 >= wy1:
+        return
+    # mask (u, v) -> canvas (tx + l + u, ty + t + v) -> rotated -> window
+    to_window = rot.copy()
+    to_window[:, 2] += rot[:, :2] @ [tx + l, ty + t] - [wx0, wy0]
+    cov = cv2.warpAffine(np.asarray(mask), to_window, (wx1 - wx0, wy1 - wy0), flags=cv2.INTER_CUBIC,
+                         borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+    cov = cov.astype(np.float32) * np.float32(1 / 255)
+
+    # Composite into the canvas in place, band by band
+    for y0, y1 in iter_bands(h, band_rows):
+        y0, y1 = max(y0, wy0), min(y1, wy1)
+        if y0 < y1:
+            composite(canvas[y0:y1, wx0:wx1], fill, cov[y0 - wy0:y1 - wy0])
+
+# ---------------- Render pipeline ----------------
+PREVIEW_WIDTH = 800
+
+def render_array(params: DesignParams, seed: Union[str, int, None], band_rows: Optional[int] = None,
+                 out: Optional[np.ndarray] = None, workers: int = 1, profiler=NULL_PROFILER) -> np.ndarray:
+    """Render one design into a uint8 (H, W, 4) RGBA canvas.
+
+    ``band_rows`` bounds the per-stage working set (default: fit
+    DEFAULT_BAND_BYTES); pass ``params.height`` for a single full-frame band.
+    ``out`` may be a preallocated or memory-mapped canvas of the right shape.
+    ``workers`` > 1 paints the bands of each stage on a thread pool. The
+    result depends on neither ``band_rows`` nor ``workers``. ``profiler``
+    (see profiler.Profiler) records each stage.
+    """
+    seed = resolve_seed(seed)
+    if band_rows is None:
+        band_rows = band_rows_for_budget(params.width)
+
+    with profiler.stage("render", width=params.width, height=params.height, seed=seed):
+        # Base background
+        with profiler.stage("base", style=params.base_style):
+            canvas = new_canvas(params) if out is None else out
+            make_base(canvas, params.base_style, params.transparent_bg, seed, band_rows, workers)
+
+        # Palette
+        with profiler.stage("palette"):
+            palette = build_palette(params.palette_mode, seed)
+
+        # Shapes
+        with profiler.stage("shapes", layers=params.layers_count):
+            shapes = plan_shapes(params.width, params.height, palette, params.layers_count, seed)
+            draw_shapes(canvas, shapes, params.anti_alias, band_rows, workers)
+
+        # Extra line splashes
+        if params.add_lines:
+            with profiler.stage("line_splashes"):
+                lines = plan_line_splashes(params.width, params.height, palette, seed)
+                draw_shapes(canvas, lines, params.anti_alias, band_rows, workers)
+
+        # Blend noise
+        if params.add_blend_noise:
+            with profiler.stage("noise_blend", texture=params.noise_texture):
+                blend_noise(canvas, seed, band_rows, workers, params.noise_texture)
+
+        # Text overlay
+        if params.add_text:
+            with profiler.stage("text", layers=params.text_layers):
+                add_text_overlay(canvas, palette, seed, band_rows, params.text_layers, params.fonts)
+    return canvas
+
+def preview_params(params: DesignParams, preview_width: int = PREVIEW_WIDTH) -> DesignParams:
+    """The same design scaled down to ``preview_width`` (never up), aspect kept."""
+    if params.width <= preview_width:
+        return params
+    height = max(1, round(params.height * preview_width / params.width))
+    return replace(params, width=preview_width, height=height)
+
+def render_design(params: DesignParams, seed: Union[str, int, None], band_rows: Optional[int] = None,
+                  workers: int = 1, profiler=NULL_PROFILER) -> Image.Image:
+    """Render one design headlessly; the same (params, seed) gives the same image.
+
+    The image is a zero-copy view of the rendered canvas.
+    """
+    return canvas_image(render_array(params, seed, band_rows, workers=workers, profiler=profiler))
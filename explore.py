@@ -0,0 +1,52 @@
+"""Seed exploration: many seeds rendered as small thumbnails, in parallel.
+
+Designs are laid out in normalized coordinates (see engine.preview_params),
+so a thumbnail shows the same composition as the print-size render of its
+seed. Thumbnails render and encode in worker processes and are yielded as
+each one finishes, so a page can show them as they arrive.
+"""
+import multiprocessing
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Tuple
+
+from engine import DesignParams, preview_params, render_design
+from export import export_image
+
+THUMB_WIDTH = 256
+MIN_SHEET, MAX_SHEET = 16, 100
+
+
+def sheet_seeds(start: int, count: int, randomize: bool = False) -> List[int]:
+    """``count`` consecutive seeds from ``start``, or ``count`` distinct random ones."""
+    if randomize:
+        return random.sample(range(2**32), count)
+    return [(start + i) % 2**32 for i in range(count)]
+
+def render_thumbnail(job) -> Tuple[int, bytes]:
+    """Render one thumbnail in a worker; returns (seed, JPEG or WebP bytes)."""
+    params, seed = job
+    img = render_design(params, seed)
+    return seed, export_image(img, "WebP" if params.transparent_bg else "JPEG", quality=85).data
+
+def thumbnail_pool(workers: int = None) -> ProcessPoolExecutor:
+    # spawn, not fork: the pool is started from a threaded server
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+def render_sheet(pool: Executor, params: DesignParams, seeds: List[int],
+                 width: int = THUMB_WIDTH) -> Iterator[Tuple[int, bytes]]:
+    """Yield (seed, encoded thumbnail) for every seed, in completion order.
+
+    Closing the iterator early (e.g. the page rerunning) cancels the
+    thumbnails that have not started yet.
+    """
+    thumb = preview_params(params, width)
+    futures = [pool.submit(render_thumbnail, (thumb, seed)) for seed in seeds]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,197 @@
+"""Shared HTTP client for the API-backed pages.
+
+One pooled ``requests.Session`` per process, so keep-alive connections are
+reused across reruns, pages and sessions, with:
+
+- default (connect, read) timeouts, so no call can hang a script run;
+- retries with exponential backoff and jitter on connection errors,
+  timeouts, 429 and 5xx (a Retry-After header is honoured up to
+  ``max_backoff``);
+- a per-host concurrency limit, so a fan-out cannot flood one API;
+- ``gather``/``fetch_all``: independent calls run at once on a shared
+  thread pool, so a page waits for the slowest call, not the sum;
+- optionally a ResponseCache (response_cache.py) with per-endpoint TTLs,
+  stale-while-revalidate and coalescing of identical requests. Responses it
+  serves carry ``X-Cache`` (fresh, stale, miss, ...) and ``Age`` headers.
+
+With ``TSHIRTGEN_HTTP_STUB=http://127.0.0.1:8766`` every request goes to that
+base URL instead, with the original host as the first path segment, e.g. to
+the canned API server in api_stub.py.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from response_cache import CachedResponse, ResponseCache
+
+DEFAULT_TIMEOUT = (3.05, 10.0)   # (connect, read) seconds
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.25
+DEFAULT_MAX_BACKOFF = 4.0
+DEFAULT_PER_HOST = 4
+DEFAULT_POOL_SIZE = 32
+DEFAULT_WORKERS = 16
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+USER_AGENT = "tshirtgen-streamlit"
+
+
+class HttpClient:
+    """Pooled, retrying GET client; thread-safe."""
+
+    def __init__(self, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, max_backoff: float = DEFAULT_MAX_BACKOFF,
+                 per_host: int = DEFAULT_PER_HOST, pool_size: int = DEFAULT_POOL_SIZE,
+                 workers: int = DEFAULT_WORKERS, stub: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.per_host = per_host
+        self.stub = stub.rstrip("/") if stub else None
+        self.cache = cache
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ---------------- Single calls ----------------
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None,
+            timeout: Union[float, Tuple[float, float], None] = None) -> requests.Response:
+        """GET with retries, through the cache when the endpoint has a policy.
+        Returns the last response (whatever its status) or raises the last
+        connection/timeout error once retries run out."""
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        if self.cache is None or self.cache.policy(url) is None:
+            return self._fetch(url, headers, timeout)
+        cached, how = self.cache.get(url, lambda: _to_cached(self._fetch(url, headers, timeout)))
+        return _to_response(cached, how)
+
+    def get_json(self, url: str, **kwargs) -> Any:
+        """Parsed JSON of a successful GET; raises requests.HTTPError on 4xx/5xx."""
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    # ---------------- Fan-out ----------------
+    def gather(self, calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Run independent calls at once. Each value is the call's result, or
+        the exception it raised, so one failing API does not hide the others."""
+        futures = {name: self._pool.submit(fn) for name, fn in calls.items()}
+        out = {}
+        for name, future in futures.items():
+            try:
+                out[name] = future.result()
+            except Exception as exc:
+                out[name] = exc
+        return out
+
+    def fetch_all(self, urls: Dict[str, str], **kwargs) -> Dict[str, Any]:
+        """``get_json`` of every URL at once (see ``gather``)."""
+        return self.gather({name: (lambda u=url: self.get_json(u, **kwargs)) for name, url in urls.items()})
+
+    # ---------------- Introspection ----------------
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per host: responses received, retries and connection errors."""
+        with self._lock:
+            return {host: dict(counts) for host, counts in self._stats.items()}
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    # ---------------- Internals ----------------
+    def _fetch(self, url: str, headers: Optional[dict], timeout) -> requests.Response:
+        """One upstream GET with retries (no cache)."""
+        host = urlsplit(url).netloc  # limits and stats are per API host, stub or not
+        url = self._route(url)
+        for attempt in range(self.retries + 1):
+            wait = None
+            try:
+                with self._slot(host):
+                    response = self._session.get(url, headers=headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._count(host, "errors")
+                if attempt == self.retries:
+                    raise
+            else:
+                self._count(host, "requests")
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                wait = _retry_after(response)
+                response.close()
+            self._count(host, "retries")
+            time.sleep(self._delay(attempt, wait))
+
+    def _route(self, url: str) -> str:
+        if not self.stub:
+            return url
+        parts = urlsplit(url)
+        return urlunsplit(urlsplit(f"{self.stub}/{parts.netloc}{parts.path}")._replace(query=parts.query))
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _count(self, host: str, what: str):
+        with self._lock:
+            counts = self._stats.setdefault(host, {})
+            counts[what] = counts.get(what, 0) + 1
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        # Full jitter: spread the retries of concurrent callers apart
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def _to_cached(response: requests.Response) -> CachedResponse:
+    return CachedResponse(response.url, response.status_code, response.headers.get("Content-Type", ""),
+                          response.content, time.time())
+
+def _to_response(cached: CachedResponse, how: str) -> requests.Response:
+    """A requests.Response around a cached body, so callers need not know where it came from."""
+    response = requests.Response()
+    response.status_code = cached.status
+    response.url = cached.url
+    response._content = cached.body
+    response.headers = CaseInsensitiveDict({"Content-Type": cached.content_type, "X-Cache": how,
+                                            "Age": str(int(cached.age()))})
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    return response
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_client() -> HttpClient:
+    """The process-wide client every page uses."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpClient(stub=os.environ.get("TSHIRTGEN_HTTP_STUB"), cache=ResponseCache())
+        return _shared
@@ -0,0 +1,284 @@
+"""Animated seed morphs: N frames that move one design into another.
+
+    python morph.py --seed-a 1 --seed-b 2 --frames 48 --fps 24 --width 600 --out morph.gif
+
+Frame ``t`` (0..1) interpolates what the two seeds draw: palette colours
+(in HSV, hue along the shorter arc), each shape's position, size and fill
+where both seeds drew the same kind of shape for that layer (otherwise one
+fades out as the other fades in), line splashes likewise, and the gradient
+base's end colours. Noise and text are cross-faded. Frame 0 is exactly the
+still render of seed A, and the last frame (without ``loop``) that of B.
+
+Frames render and encode on a pool of worker processes and reach the encoder
+in order through a bounded window, so memory holds a few frames, not the
+whole animation. GIF frames are quantized and LZW-coded in the workers; MP4
+frames go to OpenCV's (FFmpeg) writer. Transparent designs are flattened
+over white, as neither format keeps alpha well.
+"""
+import argparse
+import colorsys
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+from engine import (GRADIENT_STYLES, DesignParams, add_text_overlay, band_rows_for_budget, blend_noise,
+                    build_palette, canvas_image, draw_shapes, gradient_colors, make_base, new_canvas,
+                    paint_gradient, plan_line_splashes, plan_shapes, preview_params, resolve_seed)
+from export import flatten
+
+MORPH_FORMATS = ["GIF", "MP4"]
+MORPH_MIME_TYPES = {"GIF": "image/gif", "MP4": "video/mp4"}
+MORPH_EXTENSIONS = {"GIF": "gif", "MP4": "mp4"}
+DEFAULT_FRAMES = 48
+DEFAULT_FPS = 24
+DEFAULT_WIDTH = 600
+
+
+# ---------------- Interpolation ----------------
+def lerp(a: float, b: float, t: float) -> float:
+    return a + (b - a) * t
+
+def lerp_color(c1: Tuple[int, ...], c2: Tuple[int, ...], t: float) -> Tuple[int, ...]:
+    """RGB(A) colour between c1 and c2 in HSV, hue along the shorter arc; exact at t = 0 and 1."""
+    if t <= 0:
+        return tuple(c1)
+    if t >= 1:
+        return tuple(c2)
+    h1, s1, v1 = colorsys.rgb_to_hsv(*(c / 255 for c in c1[:3]))
+    h2, s2, v2 = colorsys.rgb_to_hsv(*(c / 255 for c in c2[:3]))
+    dh = (h2 - h1 + 0.5) % 1.0 - 0.5
+    r, g, b = colorsys.hsv_to_rgb((h1 + dh * t) % 1.0, lerp(s1, s2, t), lerp(v1, v2, t))
+    rgb = (round(r * 255), round(g * 255), round(b * 255))
+    if len(c1) == 4:
+        return (*rgb, round(lerp(c1[3], c2[3], t)))
+    return rgb
+
+def _faded(shape: tuple, k: float) -> Optional[tuple]:
+    """``shape`` with its alpha scaled by ``k``; None once invisible."""
+    fill = shape[2]
+    alpha = round(fill[3] * k)
+    if alpha <= 0:
+        return None
+    return (shape[0], shape[1], (*fill[:3], alpha), *shape[3:])
+
+def morph_shapes(shapes_a: list, shapes_b: list, t: float) -> list:
+    """Layer-by-layer blend of two shape plans (a missing layer fades)."""
+    out = []
+    for i in range(max(len(shapes_a), len(shapes_b))):
+        sa = shapes_a[i] if i < len(shapes_a) else None
+        sb = shapes_b[i] if i < len(shapes_b) else None
+        if sa is not None and sb is not None and sa[0] == sb[0] and len(sa[1]) == len(sb[1]):
+            if sa[0] in ("circle", "rect"):
+                geom = [lerp(a, b, t) for a, b in zip(sa[1], sb[1])]
+            else:
+                geom = [(lerp(pa[0], pb[0], t), lerp(pa[1], pb[1], t)) for pa, pb in zip(sa[1], sb[1])]
+            extra = (lerp(sa[3], sb[3], t),) if sa[0] == "line" else ()
+            out.append((sa[0], geom, lerp_color(sa[2], sb[2], t), *extra))
+            continue
+        for shape, k in ((sa, 1 - t), (sb, t)):
+            faded = _faded(shape, k) if shape is not None else None
+            if faded is not None:
+                out.append(faded)
+    return out
+
+def _crossfade(canvas: np.ndarray, other: np.ndarray, t: float):
+    cv2.addWeighted(canvas, 1 - t, other, t, 0, dst=canvas)
+
+def morph_frame(params: DesignParams, seed_a, seed_b, t: float, band_rows: Optional[int] = None,
+                workers: int = 1) -> np.ndarray:
+    """Frame ``t`` of the morph from seed_a to seed_b as an RGBA canvas."""
+    seed_a, seed_b = resolve_seed(seed_a), resolve_seed(seed_b)
+    if t >= 1:
+        seed_a, seed_b, t = seed_b, seed_a, 0.0
+    if band_rows is None:
+        band_rows = band_rows_for_budget(params.width)
+    w, h = params.width, params.height
+
+    canvas = new_canvas(params)
+    if params.base_style in GRADIENT_STYLES:
+        (a1, a2), (b1, b2) = gradient_colors(seed_a), gradient_colors(seed_b)
+        c1 = np.array(lerp_color(tuple(a1), tuple(b1), t), dtype=np.float32)
+        c2 = np.array(lerp_color(tuple(a2), tuple(b2), t), dtype=np.float32)
+        paint_gradient(canvas, params.base_style, c1, c2, band_rows, workers)
+    else:
+        make_base(canvas, params.base_style, params.transparent_bg, seed_a, band_rows, workers)
+        if params.base_style == "noise" and t > 0:
+            other = new_canvas(params)
+            make_base(other, params.base_style, params.transparent_bg, seed_b, band_rows, workers)
+            _crossfade(canvas, other, t)
+
+    pal_a, pal_b = build_palette(params.palette_mode, seed_a), build_palette(params.palette_mode, seed_b)
+    palette = [lerp_color(ca, cb, t) for ca, cb in zip(pal_a, pal_b)]
+    shapes = morph_shapes(plan_shapes(w, h, pal_a, params.layers_count, seed_a),
+                          plan_shapes(w, h, pal_b, params.layers_count, seed_b), t)
+    draw_shapes(canvas, shapes, params.anti_alias, band_rows, workers)
+    if params.add_lines:
+        lines = morph_shapes(plan_line_splashes(w, h, pal_a, seed_a), plan_line_splashes(w, h, pal_b, seed_b), t)
+        draw_shapes(canvas, lines, params.anti_alias, band_rows, workers)
+
+    def overlays(target: np.ndarray, seed: int):
+        if params.add_blend_noise:
+            blend_noise(target, seed, band_rows, workers, params.noise_texture)
+        if params.add_text:
+            add_text_overlay(target, palette, seed, band_rows, params.text_layers, params.fonts)
+
+    if params.add_blend_noise or params.add_text:
+        other = canvas.copy() if t > 0 else None
+        overlays(canvas, seed_a)
+        if other is not None:
+            overlays(other, seed_b)
+            _crossfade(canvas, other, t)
+    return canvas
+
+def frame_times(frames: int, loop: bool = False) -> List[float]:
+    """``t`` per frame: A to B, or A to B and back (eased) for a seamless loop."""
+    if loop:
+        return [(1 - math.cos(2 * math.pi * i / frames)) / 2 for i in range(frames)]
+    return [i / (frames - 1) if frames > 1 else 0.0 for i in range(frames)]
+
+# ---------------- Workers & encoders ----------------
+def _frame_rgb(params: DesignParams, seed_a: int, seed_b: int, t: float) -> Image.Image:
+    canvas = morph_frame(params, seed_a, seed_b, t)
+    if params.transparent_bg:
+        return flatten(canvas_image(canvas))
+    return Image.fromarray(cv2.cvtColor(canvas, cv2.COLOR_RGBA2RGB))
+
+def encode_frame(job) -> Tuple[Optional[bytes], bytes]:
+    """Worker side: render frame ``t`` and encode it for ``fmt``; returns (GIF header or None, frame bytes)."""
+    params, seed_a, seed_b, t, fmt, duration_ms, first = job
+    img = _frame_rgb(params, seed_a, seed_b, t)
+    if fmt == "MP4":
+        return None, cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR).tobytes()
+    frame = img.quantize(256, method=Image.Quantize.FASTOCTREE)
+    data = b"".join(GifImagePlugin.getdata(frame, duration=duration_ms, include_color_table=True))
+    header = None
+    if first:
+        header = b"".join(GifImagePlugin.getheader(frame.copy(), None, {"loop": 0, "duration": duration_ms})[0])
+    return header, data
+
+def ordered_map(fn: Callable, jobs: Iterable, workers: int, window: int) -> Iterator:
+    """``map(fn, jobs)`` in order on a process pool, at most ``window`` results in flight."""
+    if workers <= 1:
+        yield from map(fn, jobs)
+        return
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque(pool.submit(fn, job) for job in islice(jobs, window))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for job in islice(jobs, 1):
+                    pending.append(pool.submit(fn, job))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+@dataclass
+class MorphResult:
+    path: str
+    format: str
+    width: int
+    height: int
+    frames: int
+    seconds: float
+    size: int
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.format} {self.width}×{self.height} · {self.frames} frames · {self.size / 2**20:.2f} MB · "
+                f"{self.seconds:.1f} s ({self.fps:.1f} frames/s)")
+
+
+def render_morph(params: DesignParams, seed_a, seed_b, out_path: str, fmt: str = "GIF",
+                 frames: int = DEFAULT_FRAMES, fps: int = DEFAULT_FPS, loop: bool = False,
+                 workers: int = 1, progress: Optional[Callable[[int, int], None]] = None) -> MorphResult:
+    """Render and encode the morph into ``out_path``, streaming frames in order."""
+    if fmt not in MORPH_FORMATS:
+        raise ValueError(f"Unknown animation format: {fmt}")
+    if fmt == "MP4":
+        # MPEG-4 wants even dimensions
+        params = replace(params, width=params.width - params.width % 2, height=params.height - params.height % 2)
+    seed_a, seed_b = resolve_seed(seed_a), resolve_seed(seed_b)
+    duration_ms = round(1000 / fps)
+    jobs = ((params, seed_a, seed_b, t, fmt, duration_ms, i == 0) for i, t in enumerate(frame_times(frames, loop)))
+
+    t0 = time.perf_counter()
+    writer = None
+    try:
+        if fmt == "MP4":
+            writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (params.width, params.height))
+            if not writer.isOpened():
+                raise RuntimeError("OpenCV could not open an MP4 writer (no FFmpeg support?)")
+            for i, (_, data) in enumerate(ordered_map(encode_frame, jobs, workers, 2 * workers)):
+                writer.write(np.frombuffer(data, np.uint8).reshape(params.height, params.width, 3))
+                if progress:
+                    progress(i + 1, frames)
+        else:
+            with open(out_path, "wb") as f:
+                for i, (header, data) in enumerate(ordered_map(encode_frame, jobs, workers, 2 * workers)):
+                    if header is not None:
+                        f.write(header)
+                    f.write(data)
+                    if progress:
+                        progress(i + 1, frames)
+                f.write(b";")  # trailer
+    finally:
+        if writer is not None:
+            writer.release()
+    return MorphResult(out_path, fmt, params.width, params.height, frames, time.perf_counter() - t0,
+                       os.path.getsize(out_path))
+
+
+def main(argv=None) -> int:
+    d = DesignParams()
+    p = argparse.ArgumentParser(description="Render an animated morph between two seeds.")
+    p.add_argument("--seed-a", required=True)
+    p.add_argument("--seed-b", required=True)
+    p.add_argument("--out", default="morph.gif")
+    p.add_argument("--format", choices=MORPH_FORMATS, help="Default: from the --out extension")
+    p.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    p.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    p.add_argument("--loop", action="store_true", help="Go A -> B -> A for a seamless loop")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    p.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="Frame width (the design is scaled to it)")
+    p.add_argument("--design-width", type=int, default=d.width)
+    p.add_argument("--design-height", type=int, default=d.height)
+    p.add_argument("--palette-mode", default=d.palette_mode)
+    p.add_argument("--base-style", default=d.base_style)
+    p.add_argument("--layers-count", type=int, default=d.layers_count)
+    p.add_argument("--transparent-bg", action="store_true")
+    p.add_argument("--no-text", dest="add_text", action="store_false")
+    p.add_argument("--no-lines", dest="add_lines", action="store_false")
+    p.add_argument("--no-blend-noise", dest="add_blend_noise", action="store_false")
+    args = p.parse_args(argv)
+
+    fmt = args.format or ("MP4" if args.out.lower().endswith(".mp4") else "GIF")
+    params = DesignParams(width=args.design_width, height=args.design_height, transparent_bg=args.transparent_bg,
+                          palette_mode=args.palette_mode, base_style=args.base_style,
+                          layers_count=args.layers_count, add_text=args.add_text, add_lines=args.add_lines,
+                          add_blend_noise=args.add_blend_noise)
+    params = preview_params(params, args.width)
+    result = render_morph(params, args.seed_a, args.seed_b, args.out, fmt, args.frames, args.fps, args.loop,
+                          args.workers)
+    print(f"{result.path}: {result.summary()}, {args.workers} workers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
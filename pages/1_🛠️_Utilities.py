@@ -1,11 +1,9 @@
 import streamlit as st
-import qrcode
 import io
 import random
 import string
 import uuid
 import json
-from PIL import Image
 
 st.set_page_config(page_title="Utilities", page_icon="🛠️", layout="wide")
 
@@ -22,6 +20,8 @@ with tab1:
     qr_bg = st.color_picker("Background Color", "#FFFFFF")
     
     if st.button("Generate QR Code"):
+        import qrcode  # pulls in PIL; only needed here
+
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(qr_text)
         qr.make(fit=True)
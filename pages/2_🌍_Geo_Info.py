@@ -1,7 +1,6 @@
 import streamlit as st
-import requests
-import pandas as pd
-import plotly.express as px
+
+# pandas, plotly and the HTTP client are imported only inside the actions that use them.
 
 st.set_page_config(page_title="Geo Info", page_icon="🌍", layout="wide")
 
@@ -15,10 +14,15 @@ with tab1:
     city = st.text_input("Enter City Name", "London")
     
     if st.button("Get Weather"):
+        import pandas as pd
+        import plotly.express as px
+        from http_client import shared_client
+
         # 1. Geocoding
         geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1&language=en&format=json"
         try:
-            geo_res = requests.get(geo_url).json()
+            client = shared_client()
+            geo_res = client.get_json(geo_url)
             if "results" in geo_res:
                 lat = geo_res["results"][0]["latitude"]
                 lon = geo_res["results"][0]["longitude"]
@@ -27,9 +31,9 @@ with tab1:
                 
                 st.success(f"Found: {name}, {country} ({lat}, {lon})")
                 
-                # 2. Weather Data
+                # 2. Weather Data (needs the coordinates, so it cannot overlap the geocoding call)
                 weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true&daily=temperature_2m_max,temperature_2m_min&timezone=auto"
-                w_res = requests.get(weather_url).json()
+                w_res = client.get_json(weather_url)
                 
                 curr = w_res["current_weather"]
                 st.metric("Temperature", f"{curr['temperature']} °C", f"Wind: {curr['windspeed']} km/h")
@@ -56,9 +60,12 @@ with tab2:
     country_name = st.text_input("Enter Country Name", "Japan")
     
     if st.button("Search Country"):
+        import pandas as pd
+        from http_client import shared_client
+
         url = f"https://restcountries.com/v3.1/name/{country_name}"
         try:
-            res = requests.get(url)
+            res = shared_client().get(url)
             if res.status_code == 200:
                 data = res.json()[0]
                 
@@ -89,11 +96,14 @@ with tab3:
     ip_addr = st.text_input("Enter IP Address (leave empty for yours)", "")
     
     if st.button("Lookup IP"):
+        import pandas as pd
+        from http_client import shared_client
+
         target = ip_addr if ip_addr else "json"
         url = f"https://ipapi.co/{target}/json/" if ip_addr else "https://ipapi.co/json/"
         
         try:
-            res = requests.get(url, headers={"User-Agent": "streamlit-app"})
+            res = shared_client().get(url, headers={"User-Agent": "streamlit-app"})
             data = res.json()
             
             if "error" in data:
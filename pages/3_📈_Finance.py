@@ -1,8 +1,7 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import plotly.express as px
-import requests
+
+# yfinance, pandas, plotly and the HTTP client (requests) take most of a cold
+# start; each is imported only inside the action that uses it.
 
 st.set_page_config(page_title="Finance", page_icon="📈", layout="wide")
 
@@ -13,28 +12,60 @@ tab1, tab2, tab3 = st.tabs(["Crypto Tracker", "Stock Charts", "Loan Calculator"]
 # --- Crypto Tracker ---
 with tab1:
     st.header("🪙 Crypto Price Tracker")
-    st.caption("Top 10 Cryptocurrencies by Market Cap (via CoinGecko)")
-    
+    c1, c2, c3 = st.columns(3)
+    top = c1.selectbox("Coins", [10, 50, 100, 250, 500])
+    auto = c2.toggle("Auto-refresh")
+    interval = c3.slider("Refresh every (seconds)", 10, 300, 30, disabled=not auto)
+    st.caption(f"Top {top} Cryptocurrencies by Market Cap (via CoinGecko)")
+    page_size = 25
+    page = st.number_input("Page", min_value=1, max_value=-(-top // page_size), value=1) if top > page_size else 1
+
     if st.button("Refresh Prices"):
-        url = "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=10&page=1&sparkline=false"
+        st.session_state["crypto_refresh"] = True
+
+    # Reruns on its own every `interval` s, without rerunning the rest of the page
+    @st.fragment(run_every=interval if auto else None)
+    def crypto_table():
+        import time
+
+        import pandas as pd
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        from crypto_feed import patch, shared_feed, style_rows
+
+        # One poller per server: every viewer reads the same snapshot
+        feed = shared_feed()
+        view = st.session_state.get("crypto_view")
         try:
-            res = requests.get(url)
-            if res.status_code == 200:
-                data = res.json()
-                df = pd.DataFrame(data)
-                df = df[["name", "symbol", "current_price", "market_cap", "price_change_percentage_24h"]]
-                df.columns = ["Name", "Symbol", "Price (USD)", "Market Cap", "24h Change %"]
-                
-                # Colorize change
-                def color_change(val):
-                    color = 'green' if val > 0 else 'red'
-                    return f'color: {color}'
-                
-                st.dataframe(df.style.applymap(color_change, subset=['24h Change %']), use_container_width=True)
-            else:
-                st.error("Rate limit exceeded or API error. Try again later.")
+            if st.session_state.pop("crypto_refresh", False):
+                feed.refresh(top)
+            if auto:
+                ctx = get_script_run_ctx()
+                if feed.watch(ctx.session_id if ctx else "bare", interval, top) is None:
+                    feed.refresh(top)
+            snapshot, changes = feed.since(view["version"] if view else None)
+            if snapshot is None:
+                snapshot, changes = feed.refresh(top), None
         except Exception as e:
-            st.error(f"Error: {e}")
+            st.error(f"Rate limit exceeded or API error. Try again later. ({e})")
+            return
+
+        # Patch only the coins that changed since this session's last draw
+        moved = None
+        if view and view["top"] == top and changes is not None and not changes.reordered and len(snapshot) >= top:
+            frame = patch(view["frame"], snapshot, changes)
+            moved = pd.Series(changes.direction, index=changes.changed)
+        else:
+            frame = snapshot.frame(top)
+        st.session_state["crypto_view"] = {"version": snapshot.version, "top": top, "frame": frame}
+
+        rows = frame.iloc[(page - 1) * page_size:page * page_size]
+        st.dataframe(style_rows(rows, moved), use_container_width=True, hide_index=True)
+        age = time.time() - snapshot.fetched
+        st.caption(f"Updated {age:.0f} s ago" + (f" · {len(moved)} coins changed" if moved is not None and len(moved) else ""))
+
+    if auto or "crypto_view" in st.session_state or st.session_state.get("crypto_refresh"):
+        crypto_table()
 
 # --- Stock Charts ---
 with tab2:
@@ -43,12 +74,16 @@ with tab2:
     period = st.selectbox("Period", ["1mo", "3mo", "6mo", "1y", "5y", "max"])
     
     if st.button("Get Stock Data"):
+        import plotly.express as px
+        from price_store import shared_store
+
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=period)
+            # Served from the local price store: only bars newer than the stored ones are downloaded
+            store = shared_store()
+            hist = store.history(ticker, period)
             
             if not hist.empty:
-                st.subheader(f"{ticker.upper()} - {stock.info.get('shortName', ticker)}")
+                st.subheader(f"{ticker.upper()} - {store.metadata(ticker).get('short_name', ticker)}")
                 st.metric("Current Price", f"${hist['Close'].iloc[-1]:.2f}")
                 
                 # Line Chart
@@ -67,30 +102,95 @@ with tab2:
 with tab3:
     st.header("💸 Simple Loan Calculator")
     
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         amount = st.number_input("Loan Amount ($)", min_value=1000, value=10000, step=500)
     with col2:
         rate = st.number_input("Interest Rate (% per year)", min_value=0.1, value=5.0, step=0.1)
     with col3:
         years = st.number_input("Loan Term (Years)", min_value=1, value=5)
+    with col4:
+        extra = st.number_input("Extra Payment ($ per month)", min_value=0, value=0, step=50)
         
     if st.button("Calculate"):
-        # Monthly interest rate
-        r = rate / 100 / 12
-        # Total number of payments
-        n = years * 12
-        
-        # Monthly payment formula
-        if r > 0:
-            monthly_payment = amount * (r * (1 + r)**n) / ((1 + r)**n - 1)
-        else:
-            monthly_payment = amount / n
-            
-        total_payment = monthly_payment * n
-        total_interest = total_payment - amount
+        import plotly.express as px
+        from amortization import schedule
+
+        # Whole schedule as array operations (see amortization.py)
+        plan = schedule(amount, rate, years * 12, extra)
+        monthly_payment = plan.level_payment
+        total_payment = plan.total_paid
+        total_interest = plan.total_interest
         
         c1, c2, c3 = st.columns(3)
         c1.metric("Monthly Payment", f"${monthly_payment:,.2f}")
         c2.metric("Total Interest", f"${total_interest:,.2f}")
         c3.metric("Total Cost", f"${total_payment:,.2f}")
+        if extra:
+            saved = schedule(amount, rate, years * 12).total_interest - total_interest
+            st.success(f"Paid off in {plan.months} months instead of {plan.term_months}, "
+                       f"saving ${saved:,.2f} in interest.")
+
+        table = plan.frame()
+        fig = px.area(table.assign(**{"Cumulative Interest": table["Interest"].cumsum()}),
+                      y=["Balance", "Cumulative Interest"], title="Balance and interest paid over time")
+        st.plotly_chart(fig, use_container_width=True)
+        with st.expander("Amortization Schedule"):
+            st.dataframe(table.round(2), use_container_width=True)
+        st.download_button("Download Schedule (CSV)", data=table.round(2).to_csv(), file_name="amortization.csv",
+                           mime="text/csv")
+
+    # Scenario sweep: rates x terms x amounts, with the extra payment above
+    with st.expander("📊 Scenario Sweep"):
+        s1, s2, s3 = st.columns(3)
+        rate_range = s1.slider("Rates (% per year)", 0.0, 20.0, (2.0, 10.0), 0.25)
+        term_range = s2.slider("Terms (years)", 1, 40, (5, 30))
+        amount_range = s3.slider("Amounts ($)", 1000, 2_000_000, (50_000, 1_000_000), 1000)
+        steps = st.slider("Steps per axis", 2, 100, 25)
+
+        if st.button("Run Sweep"):
+            st.session_state["loan_sweep"] = {"rates": rate_range, "terms": term_range, "amounts": amount_range,
+                                              "steps": steps, "extra": float(extra)}
+
+        grid = st.session_state.get("loan_sweep")
+        if grid:
+            import numpy as np
+            import plotly.express as px
+            from amortization import METRICS, sweep
+
+            rates = np.linspace(*grid["rates"], grid["steps"])
+            terms = np.unique(np.rint(np.linspace(*grid["terms"], grid["steps"])))
+            amounts = np.linspace(*grid["amounts"], grid["steps"])
+            m1, m2 = st.columns(2)
+            label = m1.selectbox("Metric", list(METRICS.values()))
+            metric = next(name for name, text in METRICS.items() if text == label)
+            amount_labels = [f"${a:,.0f}" for a in amounts]
+            heat_amount = amounts[amount_labels.index(
+                m2.select_slider("Amount", amount_labels, value=amount_labels[len(amounts) // 2]))]
+            # The heatmap is one amount's rates x terms slice; only the CSV covers the whole grid
+            result = sweep(rates, terms, [heat_amount], grid["extra"])
+            fig = px.imshow(result.metric(metric)[:, :, 0], x=terms, y=rates, origin="lower", aspect="auto",
+                            color_continuous_scale="Viridis",
+                            labels={"x": "Term (years)", "y": "Rate (%)", "color": METRICS[metric]},
+                            title=f"{METRICS[metric]} for ${heat_amount:,.0f}")
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{len(rates) * len(terms) * len(amounts):,} scenarios, "
+                       f"extra payment ${grid['extra']:,.0f}/month")
+
+            def sweep_csv():
+                import io
+                import tempfile
+
+                from amortization import write_sweep_csv
+
+                # Computed and written one rate at a time into a temp file (gone once
+                # closed), so neither the grid nor the CSV text builds up in memory
+                f = tempfile.TemporaryFile()
+                text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+                write_sweep_csv(text, rates, terms, amounts, grid["extra"])
+                f = text.detach()
+                f.seek(0)
+                return f
+
+            st.download_button("Download All Scenarios (CSV)", data=sweep_csv, file_name="loan_scenarios.csv",
+                               mime="text/csv")
@@ -1,7 +1,9 @@
 import streamlit as st
-import requests
 import random
 
+# The shared HTTP client (pooled connections, timeouts, retries) is imported
+# inside each action, so opening the page does not load it.
+
 st.set_page_config(page_title="Fun Zone", page_icon="🎲", layout="wide")
 
 st.title("🎲 Fun Zone")
@@ -12,9 +14,10 @@ tab1, tab2, tab3, tab4 = st.tabs(["Jokes & Trivia", "Predictions", "Cute Animals
 with tab1:
     st.header("😂 Random Joke Generator")
     if st.button("Tell me a joke"):
+        from http_client import shared_client
+
         try:
-            res = requests.get("https://official-joke-api.appspot.com/random_joke")
-            data = res.json()
+            data = shared_client().get_json("https://official-joke-api.appspot.com/random_joke")
             st.write(f"**{data['setup']}**")
             st.write(f"*{data['punchline']}*")
         except:
@@ -25,8 +28,10 @@ with tab1:
     st.header("🔢 Number Facts")
     num = st.number_input("Pick a number", value=42)
     if st.button("Get Fact"):
+        from http_client import shared_client
+
         try:
-            res = requests.get(f"http://numbersapi.com/{num}")
+            res = shared_client().get(f"http://numbersapi.com/{num}")
             st.info(res.text)
         except:
             st.error("API Error")
@@ -37,29 +42,39 @@ with tab2:
     name = st.text_input("Enter your name", "Bhanu")
     
     if st.button("Predict"):
+        from http_client import shared_client
+
         c1, c2, c3 = st.columns(3)
-        
+
+        # The three APIs are independent: fetch them at once, so this takes as
+        # long as the slowest one. A failed call comes back as its exception.
+        res = shared_client().fetch_all({
+            "age": f"https://api.agify.io?name={name}",
+            "gender": f"https://api.genderize.io?name={name}",
+            "nationality": f"https://api.nationalize.io?name={name}",
+        })
+
         # Agify
-        try:
-            res = requests.get(f"https://api.agify.io?name={name}").json()
-            c1.metric("Predicted Age", res.get("age", "N/A"))
-        except: c1.error("Error")
-            
+        if isinstance(res["age"], Exception):
+            c1.error("Error")
+        else:
+            c1.metric("Predicted Age", res["age"].get("age", "N/A"))
+
         # Genderize
-        try:
-            res = requests.get(f"https://api.genderize.io?name={name}").json()
-            c2.metric("Predicted Gender", f"{res.get('gender', 'N/A')} ({res.get('probability', 0)*100:.0f}%)")
-        except: c2.error("Error")
-            
+        if isinstance(res["gender"], Exception):
+            c2.error("Error")
+        else:
+            gender = res["gender"]
+            c2.metric("Predicted Gender", f"{gender.get('gender', 'N/A')} ({(gender.get('probability') or 0)*100:.0f}%)")
+
         # Nationalize
-        try:
-            res = requests.get(f"https://api.nationalize.io?name={name}").json()
-            if res.get("country"):
-                top_country = res["country"][0]["country_id"]
-                c3.metric("Likely Nationality", top_country)
-            else:
-                c3.metric("Nationality", "Unknown")
-        except: c3.error("Error")
+        if isinstance(res["nationality"], Exception):
+            c3.error("Error")
+        elif res["nationality"].get("country"):
+            top_country = res["nationality"]["country"][0]["country_id"]
+            c3.metric("Likely Nationality", top_country)
+        else:
+            c3.metric("Nationality", "Unknown")
 
 # --- Cute Animals ---
 with tab3:
@@ -67,13 +82,15 @@ with tab3:
     animal = st.radio("Choose your fighter", ["Cat", "Dog"])
     
     if st.button("Show me!"):
+        from http_client import shared_client
+
         if animal == "Cat":
             url = "https://api.thecatapi.com/v1/images/search"
         else:
             url = "https://api.thedogapi.com/v1/images/search"
             
         try:
-            res = requests.get(url).json()
+            res = shared_client().get_json(url)
             st.image(res[0]["url"], width=400)
         except:
             st.error("Could not load image")
@@ -84,9 +101,10 @@ with tab4:
     st.write("Get an activity suggestion!")
     
     if st.button("I'm Bored"):
+        from http_client import shared_client
+
         try:
-            res = requests.get("https://bored.api.lewagon.com/api/activity/")
-            data = res.json()
+            data = shared_client().get_json("https://bored.api.lewagon.com/api/activity/")
             st.success(f"**Activity:** {data['activity']}")
             st.write(f"**Type:** {data['type']}")
             st.write(f"**Participants:** {data['participants']}")
@@ -1,5 +1,4 @@
 import streamlit as st
-from PIL import Image, ImageFilter, ImageOps
 import io
 
 st.set_page_config(page_title="Image Tools", page_icon="🖼️", layout="wide")
@@ -11,6 +10,9 @@ tab1, tab2, tab3 = st.tabs(["Filters", "Resizer", "Metadata"])
 uploaded_file = st.sidebar.file_uploader("Upload an image", type=["png", "jpg", "jpeg"])
 
 if uploaded_file:
+    # PIL is only needed once there is an image to work on
+    from PIL import Image, ImageFilter, ImageOps
+
     image = Image.open(uploaded_file)
     st.sidebar.image(image, caption="Original Image", use_container_width=True)
 
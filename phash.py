@@ -0,0 +1,168 @@
+"""Perceptual hashes of designs and a Hamming-distance index over them.
+
+A design's fingerprint is a 64-bit DCT hash (pHash) of a HASH_WIDTH-wide
+render: designs are laid out in normalized coordinates, so the small render
+shows the same composition as the print file and near-identical designs get
+hashes a few bits apart, at a fraction of the cost of rendering them.
+
+HashIndex answers "which stored hashes are within ``radius`` bits of h" by
+multi-index hashing: each hash is cut into four 16-bit substrings, and two
+hashes within ``radius`` bits must agree to within ``radius // 4`` bits on at
+least one substring (pigeonhole). Per substring, rows are sorted by its
+value and a 65537-entry offset table gives each value's bucket, so a query
+reads the buckets of the substring and its few-bit variants directly and
+runs a vectorized popcount over the candidates they hold.
+Recent inserts sit in a small unsorted buffer that is scanned directly and
+merged into the tables when it grows. The index saves to and loads from one
+``.npz`` file.
+"""
+import os
+from itertools import combinations
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from engine import DesignParams, preview_params, render_array
+
+HASH_WIDTH = 128
+DEFAULT_RADIUS = 6
+_SUBSTRINGS = 4
+_SUB_BITS = 64 // _SUBSTRINGS
+_MIN_BUFFER = 4096
+
+
+def perceptual_hash(img: Union[Image.Image, np.ndarray]) -> int:
+    """64-bit pHash: signs of the lowest 8x8 DCT frequencies (DC excluded) against their median."""
+    arr = np.asarray(img)
+    if arr.ndim == 3:
+        arr = cv2.cvtColor(np.ascontiguousarray(arr[..., :3]), cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(arr, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    bits[0] = False
+    return int(np.packbits(bits).view(">u8")[0])
+
+def design_hash(params: DesignParams, seed: int) -> int:
+    """Fingerprint of (params, seed) from a HASH_WIDTH-wide render."""
+    return perceptual_hash(render_array(preview_params(params, HASH_WIDTH), seed))
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    """Set bits per uint64."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(*x.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+def _flip_masks(bits: int) -> np.ndarray:
+    """All uint16 masks with at most ``bits`` bits set."""
+    masks = [0]
+    for k in range(1, bits + 1):
+        masks.extend(sum(1 << b for b in c) for c in combinations(range(_SUB_BITS), k))
+    return np.array(masks, dtype=np.uint16)
+
+
+class HashIndex:
+    """Multi-index hash table of 64-bit hashes, each with an integer key (e.g. a seed)."""
+
+    def __init__(self):
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._keys = np.empty(0, dtype=np.int64)
+        # Per substring: rows sorted by its value, and where each value's bucket starts
+        self._orders = [np.empty(0, dtype=np.uint32) for _ in range(_SUBSTRINGS)]
+        self._starts = [np.zeros(2**_SUB_BITS + 1, dtype=np.uint32) for _ in range(_SUBSTRINGS)]
+        self._buffer_hashes: List[int] = []
+        self._buffer_keys: List[int] = []
+        self._masks = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._buffer_hashes)
+
+    # ---------------- Updates ----------------
+    def add(self, h: int, key: int):
+        self._buffer_hashes.append(h)
+        self._buffer_keys.append(key)
+        if len(self._buffer_hashes) >= max(_MIN_BUFFER, len(self._hashes) // 64):
+            self.flush()
+
+    def add_many(self, hashes, keys):
+        self._buffer_hashes.extend(int(h) for h in hashes)
+        self._buffer_keys.extend(int(k) for k in keys)
+        self.flush()
+
+    def flush(self):
+        """Merge buffered inserts into the sorted tables."""
+        if not self._buffer_hashes:
+            return
+        self._hashes = np.concatenate([self._hashes, np.array(self._buffer_hashes, dtype=np.uint64)])
+        self._keys = np.concatenate([self._keys, np.array(self._buffer_keys, dtype=np.int64)])
+        self._buffer_hashes, self._buffer_keys = [], []
+        for j in range(_SUBSTRINGS):
+            sub = (self._hashes >> np.uint64(j * _SUB_BITS)).astype(np.uint16)
+            self._orders[j] = np.argsort(sub, kind="stable").astype(np.uint32)
+            self._starts[j] = np.searchsorted(sub[self._orders[j]], np.arange(2**_SUB_BITS + 1)).astype(np.uint32)
+
+    # ---------------- Queries ----------------
+    def query(self, h: int, radius: int = DEFAULT_RADIUS) -> List[Tuple[int, int]]:
+        """(key, distance) of every stored hash within ``radius`` bits of ``h``, nearest first."""
+        masks = self._masks.get(radius // _SUBSTRINGS)
+        if masks is None:
+            masks = self._masks[radius // _SUBSTRINGS] = _flip_masks(radius // _SUBSTRINGS)
+        found = []
+        if len(self._hashes):
+            rows = []
+            for j in range(_SUBSTRINGS):
+                probes = np.uint16((h >> (j * _SUB_BITS)) & 0xFFFF) ^ masks
+                lo = self._starts[j][probes].astype(np.int64)
+                hi = self._starts[j][probes.astype(np.int64) + 1].astype(np.int64)
+                hit = hi > lo
+                if hit.any():
+                    lo, counts = lo[hit], (hi - lo)[hit]
+                    # Concatenated ranges [lo, hi) without a Python loop
+                    starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+                    rows.append(self._orders[j][starts + np.arange(counts.sum())])
+            if rows:
+                # A row can come back from several tables; dedupe the (few) matches only
+                rows = np.concatenate(rows)
+                rows = np.sort(rows[_popcount(self._hashes[rows] ^ np.uint64(h)) <= radius])
+                rows = rows[np.r_[True, rows[1:] != rows[:-1]]] if len(rows) else rows
+                dist = _popcount(self._hashes[rows] ^ np.uint64(h))
+                found.extend(zip(self._keys[rows].tolist(), dist.tolist()))
+        if self._buffer_hashes:
+            dist = _popcount(np.array(self._buffer_hashes, dtype=np.uint64) ^ np.uint64(h))
+            for i in np.flatnonzero(dist <= radius).tolist():
+                found.append((self._buffer_keys[i], int(dist[i])))
+        return sorted(found, key=lambda kd: kd[1])
+
+    def nearest(self, h: int, radius: int = DEFAULT_RADIUS) -> Optional[Tuple[int, int]]:
+        """(key, distance) of the closest stored hash within ``radius``, or None."""
+        found = self.query(h, radius)
+        return found[0] if found else None
+
+    # ---------------- Persistence ----------------
+    def save(self, path: str):
+        """Write the index to ``path`` (.npz) atomically."""
+        self.flush()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, hashes=self._hashes, keys=self._keys,
+                     **{f"starts{j}": self._starts[j] for j in range(_SUBSTRINGS)},
+                     **{f"order{j}": self._orders[j] for j in range(_SUBSTRINGS)})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "HashIndex":
+        """The index saved at ``path``, or an empty one if there is none yet."""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with np.load(path) as data:
+            index._hashes, index._keys = data["hashes"], data["keys"]
+            index._starts = [data[f"starts{j}"] for j in range(_SUBSTRINGS)]
+            index._orders = [data[f"order{j}"] for j in range(_SUBSTRINGS)]
+        return index
@@ -0,0 +1,258 @@
+"""Local OHLCV store for the Stock Charts tab: each ticker's history is
+downloaded once, then only the rows after the last stored date.
+
+Per ticker, daily bars live in ``<dir>/<TICKER>.npz`` as one array per
+column (dates as int64 UTC nanoseconds, then OHLC, volume, dividends and
+splits), and metadata (short name, currency, exchange timezone, when the
+ticker was last checked) separately in ``<TICKER>.json``.
+
+``history(ticker, period)``:
+
+* first time: the full ("max") history is fetched and stored;
+* afterwards, at most every ``refresh_after`` seconds, only bars from the
+  last stored date on are fetched (that bar again, as it may have been a
+  partial day) and appended. Prices are split/dividend adjusted, so when
+  the re-fetched bar no longer matches the stored one, or the new bars carry
+  a dividend or split, the whole history is fetched again instead;
+* any period is then a slice of the stored columns, with no network call.
+
+Metadata comes from the chart response (no separate, slow ``info`` call).
+Fetchers are swappable: YahooFetcher calls yfinance, FixtureFetcher replays a
+recorded CSV for offline runs (see benchmarks/price_store.py); the app uses
+a fixture directory when TSHIRTGEN_PRICE_FIXTURE is set.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+DEFAULT_REFRESH_AFTER = 15 * 60
+DEFAULT_STORE_DIR = os.environ.get(
+    "TSHIRTGEN_PRICE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".price_store"))
+_MATCH_RTOL = 1e-6
+
+
+# ---------------- Fetchers ----------------
+class YahooFetcher:
+    """Daily, adjusted bars from Yahoo Finance via yfinance."""
+
+    def history(self, ticker: str, start: Optional[str] = None) -> Tuple[pd.DataFrame, dict]:
+        """Bars from ``start`` (YYYY-MM-DD, inclusive) or the whole history, and the chart metadata."""
+        import yfinance as yf
+
+        t = yf.Ticker(ticker)
+        if start is None:
+            frame = t.history(period="max", auto_adjust=True, actions=True, raise_errors=True)
+        else:
+            frame = t.history(start=start, auto_adjust=True, actions=True, raise_errors=True)
+        return frame, t.get_history_metadata()
+
+
+class FixtureFetcher:
+    """Replays recorded bars (``<TICKER>.csv`` in yfinance's history layout,
+    plus optional ``<TICKER>.json`` chart metadata) from a directory.
+
+    Only bars up to ``as_of`` (a date string, or None for all) are served,
+    so a test can move time forward and watch the store fetch new rows.
+    """
+
+    def __init__(self, directory: str, as_of: Optional[str] = None):
+        self.directory = directory
+        self.as_of = as_of
+        self.calls = 0
+        self.rows_served = 0
+
+    def history(self, ticker: str, start: Optional[str] = None) -> Tuple[pd.DataFrame, dict]:
+        self.calls += 1
+        frame = pd.read_csv(os.path.join(self.directory, f"{ticker}.csv"), index_col="Date")
+        frame.index = pd.to_datetime(frame.index, utc=True).tz_convert(_fixture_tz(self.directory, ticker))
+        days = frame.index.strftime("%Y-%m-%d")
+        keep = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            keep &= days >= start
+        if self.as_of is not None:
+            keep &= days <= self.as_of
+        frame = frame[keep]
+        self.rows_served += len(frame)
+        return frame, _fixture_meta(self.directory, ticker)
+
+
+def _fixture_meta(directory: str, ticker: str) -> dict:
+    path = os.path.join(directory, f"{ticker}.json")
+    if not os.path.exists(path):
+        return {"symbol": ticker, "exchangeTimezoneName": "America/New_York"}
+    with open(path) as f:
+        return json.load(f)
+
+def _fixture_tz(directory: str, ticker: str) -> str:
+    return _fixture_meta(directory, ticker).get("exchangeTimezoneName", "America/New_York")
+
+def record_fixture(ticker: str, directory: str, fetcher=None):
+    """Save a ticker's full history and metadata as a FixtureFetcher fixture (needs the network)."""
+    frame, meta = (fetcher or YahooFetcher()).history(ticker)
+    os.makedirs(directory, exist_ok=True)
+    frame[COLUMNS].to_csv(os.path.join(directory, f"{ticker}.csv"), index_label="Date")
+    with open(os.path.join(directory, f"{ticker}.json"), "w") as f:
+        json.dump({k: v for k, v in meta.items() if isinstance(v, (str, int, float, bool))}, f, indent=2)
+
+
+# ---------------- Store ----------------
+class PriceStore:
+    """Incrementally updated daily bars per ticker; thread-safe."""
+
+    def __init__(self, directory: str = DEFAULT_STORE_DIR, fetcher=None,
+                 refresh_after: float = DEFAULT_REFRESH_AFTER):
+        self.directory = directory
+        self.fetcher = fetcher or YahooFetcher()
+        self.refresh_after = refresh_after
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._ticker_locks: Dict[str, threading.Lock] = {}
+        self._loaded: Dict[str, Tuple[float, Dict[str, np.ndarray]]] = {}  # ticker -> (mtime, columns)
+
+    # ---------------- Public API ----------------
+    def history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+        """Daily bars for ``period`` (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd or max), like
+        ``yf.Ticker(ticker).history(period=period)``, updating the store first if it is due."""
+        ticker = ticker.strip().upper()
+        columns = self.update(ticker)
+        meta = self.metadata(ticker)
+        dates = columns["Date"]
+        start = period_start(period, pd.Timestamp.now(tz=meta.get("timezone", "UTC")))
+        lo = 0 if start is None else int(np.searchsorted(dates, start.tz_convert("UTC").value))
+        index = pd.DatetimeIndex(pd.to_datetime(dates[lo:], utc=True), name="Date")
+        return pd.DataFrame({c: columns[c][lo:] for c in COLUMNS},
+                            index=index.tz_convert(meta.get("timezone", "UTC")))
+
+    def metadata(self, ticker: str) -> dict:
+        """Stored metadata (short_name, currency, timezone, checked, ...); {} if never fetched."""
+        path = self._path(ticker.strip().upper(), "json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def update(self, ticker: str, force: bool = False) -> Dict[str, np.ndarray]:
+        """The ticker's stored columns, after fetching new bars if ``refresh_after`` has passed."""
+        ticker = ticker.strip().upper()
+        with self._lock:
+            lock = self._ticker_locks.setdefault(ticker, threading.Lock())
+        with lock:  # concurrent sessions asking for one ticker make one fetch
+            columns = self._load(ticker)
+            meta = self.metadata(ticker)
+            due = force or columns is None or time.time() - meta.get("checked", 0) >= self.refresh_after
+            if not due:
+                return columns
+            if columns is None or not len(columns["Date"]):
+                columns, meta = self._fetch(ticker, None)
+                self._save(ticker, columns, meta)
+                return columns
+            last = pd.Timestamp(int(columns["Date"][-1]), tz="UTC").tz_convert(meta.get("timezone", "UTC"))
+            try:
+                new, meta = self._fetch(ticker, last.strftime("%Y-%m-%d"))
+                merged = _append(columns, new)
+                merged = merged if merged is not None else self._fetch(ticker, None)[0]
+            except Exception:
+                return columns  # offline or rate-limited: serve what is stored, retry next time
+            self._save(ticker, merged, meta)
+            return merged
+
+    # ---------------- Internals ----------------
+    def _fetch(self, ticker: str, start: Optional[str]) -> Tuple[Dict[str, np.ndarray], dict]:
+        frame, chart_meta = self.fetcher.history(ticker, start)
+        index = frame.index
+        if index.tz is None:
+            index = index.tz_localize(chart_meta.get("exchangeTimezoneName", "UTC"))
+        columns = {"Date": index.tz_convert("UTC").as_unit("ns").asi8.astype(np.int64)}
+        for c in COLUMNS:
+            columns[c] = frame[c].to_numpy(dtype=np.float64) if c in frame else np.zeros(len(frame))
+        meta = {
+            "symbol": chart_meta.get("symbol", ticker),
+            "short_name": chart_meta.get("shortName") or chart_meta.get("longName") or ticker,
+            "currency": chart_meta.get("currency"),
+            "timezone": chart_meta.get("exchangeTimezoneName") or str(index.tz),
+            "checked": time.time(),
+        }
+        return columns, meta
+
+    def _load(self, ticker: str) -> Optional[Dict[str, np.ndarray]]:
+        path = self._path(ticker, "npz")
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            loaded = self._loaded.get(ticker)
+            if loaded is not None and loaded[0] == mtime:
+                return loaded[1]
+        with np.load(path) as data:
+            columns = {k: data[k] for k in data.files}
+        with self._lock:
+            self._loaded[ticker] = (mtime, columns)
+        return columns
+
+    def _save(self, ticker: str, columns: Dict[str, np.ndarray], meta: dict):
+        """Write columns and metadata atomically (metadata last, so 'checked' never runs ahead)."""
+        path = self._path(ticker, "npz")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp, path)
+        with self._lock:
+            self._loaded[ticker] = (os.stat(path).st_mtime, columns)
+        meta_path = self._path(ticker, "json")
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def _path(self, ticker: str, ext: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_.^=" else "_" for c in ticker)
+        return os.path.join(self.directory, f"{safe}.{ext}")
+
+
+def _append(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Optional[Dict[str, np.ndarray]]:
+    """``old`` with ``new``'s bars from old's last date on, or None if the
+    adjusted history changed (re-fetched bar differs, new dividend or split)."""
+    if not len(new["Date"]):
+        return old
+    at = int(np.searchsorted(new["Date"], old["Date"][-1]))
+    keep = len(old["Date"])
+    if at < len(new["Date"]) and new["Date"][at] == old["Date"][-1]:
+        # Adjustment only rescales the past, so an intraday change of the
+        # last bar shows in its close, not its open
+        if not np.isclose(new["Open"][at], old["Open"][-1], rtol=_MATCH_RTOL):
+            return None
+        if np.any(new["Dividends"][at + 1:] != 0) or np.any(new["Stock Splits"][at + 1:] != 0):
+            return None
+        keep -= 1  # replaced by its re-fetched version, as it may have been a partial day
+    elif np.any(new["Dividends"][at:] != 0) or np.any(new["Stock Splits"][at:] != 0):
+        return None
+    return {k: np.concatenate([old[k][:keep], new[k][at:]]) for k in old}
+
+def period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """First instant of a yfinance-style ``period`` ending ``now``; None for max."""
+    if period == "max":
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    for suffix, unit in (("mo", "months"), ("d", "days"), ("y", "years")):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return now.normalize() - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unknown period: {period}")
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_store() -> PriceStore:
+    """The process-wide store the Finance page uses."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            fixture = os.environ.get("TSHIRTGEN_PRICE_FIXTURE")
+            _shared = PriceStore(fetcher=FixtureFetcher(fixture) if fixture else None)
+        return _shared
@@ -0,0 +1,236 @@
+"""Optional per-stage instrumentation for the render pipeline.
+
+Stages are wrapped as ``with profiler.stage("shapes"): ...``. The default
+NULL_PROFILER hands back one shared no-op context manager, so an
+uninstrumented render pays a method call per stage and nothing else.
+
+A live Profiler records, per stage: wall time, process CPU time (which
+includes band worker threads), peak bytes allocated above the level at entry
+(tracemalloc, so NumPy buffers count), and large array copies (PIL<->NumPy
+conversions and NumPy array/ascontiguousarray/concatenate results of at
+least ``copy_min_bytes``). Memory and copy hooks are process-wide and only
+installed while a Profiler is open; concurrent profiled renders see each
+other's allocations.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+
+@dataclass
+class StageRecord:
+    name: str
+    depth: int
+    start: float          # seconds since the profiler was opened
+    wall: float
+    cpu: float
+    bytes_allocated: int
+    copies: int
+    thread: int
+    args: dict = field(default_factory=dict)
+
+
+class _NullProfiler:
+    enabled = False
+    _null = contextlib.nullcontext()
+
+    def stage(self, name: str, **args):
+        return self._null
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+class Profiler:
+    """Collects StageRecords; use as ``with Profiler() as prof:`` to install hooks."""
+    enabled = True
+
+    def __init__(self, track_memory: bool = True, count_copies: bool = True, copy_min_bytes: int = 2**20):
+        self.track_memory = track_memory
+        self.count_copies = count_copies
+        self.copy_min_bytes = copy_min_bytes
+        self.records: List[StageRecord] = []
+        self.copies_by_call: Dict[str, int] = {}   # large copies per hooked call, once closed
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._epoch = time.perf_counter()
+        self._started_tracemalloc = False
+        self._open = False
+
+    # ---------------- Lifecycle ----------------
+    def __enter__(self) -> "Profiler":
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        if self._open:
+            return
+        self._open = True
+        self._epoch = time.perf_counter()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.count_copies:
+            _copy_hooks.install(self.copy_min_bytes)
+            self._copies0 = dict(_copy_hooks.by_call)
+
+    def close(self):
+        if not self._open:
+            return
+        self._open = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self.count_copies:
+            self.copies_by_call = {k: n - self._copies0.get(k, 0) for k, n in _copy_hooks.by_call.items()
+                                   if n > self._copies0.get(k, 0)}
+            _copy_hooks.uninstall()
+
+    # ---------------- Recording ----------------
+    @contextlib.contextmanager
+    def stage(self, name: str, **args):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        frame = {"base": 0, "peak": 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame = {"base": current, "peak": current}
+        stack.append(frame)
+        copies0 = _copy_hooks.count
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = time.process_time() - cpu0
+            copies = _copy_hooks.count - copies0
+            if tracing:
+                frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+            record = StageRecord(name, len(stack), t0 - self._epoch, wall, cpu,
+                                 frame["peak"] - frame["base"], copies, threading.get_ident(), args)
+            with self._lock:
+                self.records.append(record)
+
+    # ---------------- Reports ----------------
+    def table(self) -> List[dict]:
+        """One row per stage in start order, names indented by nesting depth."""
+        rows = []
+        for r in sorted(self.records, key=lambda r: r.start):
+            rows.append({
+                "stage": "  " * r.depth + r.name,
+                "wall ms": round(r.wall * 1000, 2),
+                "cpu ms": round(r.cpu * 1000, 2),
+                "alloc MB": round(r.bytes_allocated / 2**20, 2),
+                "copies": r.copies,
+            })
+        return rows
+
+    def chrome_trace(self) -> dict:
+        """Chrome trace-event JSON (chrome://tracing, Perfetto) of the recorded stages."""
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            events.append({
+                "name": r.name,
+                "cat": "render",
+                "ph": "X",
+                "ts": round(r.start * 1e6, 3),
+                "dur": round(r.wall * 1e6, 3),
+                "pid": pid,
+                "tid": r.thread,
+                "args": dict(r.args, cpu_ms=round(r.cpu * 1000, 3),
+                             bytes_allocated=r.bytes_allocated, copies=r.copies),
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def chrome_trace_json(self) -> str:
+        return json.dumps(self.chrome_trace())
+
+    def to_dict(self) -> List[dict]:
+        return [asdict(r) for r in self.records]
+
+
+# ---------------- Copy counting ----------------
+class _CopyHooks:
+    """Wraps the buffer-copying entry points while any Profiler is open."""
+
+    _targets = [
+        (np, "array"), (np, "ascontiguousarray"), (np, "concatenate"),
+        (Image, "fromarray"), (Image, "new"), (Image, "alpha_composite"),
+        (Image.Image, "convert"), (Image.Image, "copy"), (Image.Image, "resize"), (Image.Image, "rotate"),
+    ]
+
+    def __init__(self):
+        self.count = 0
+        self.by_call: Dict[str, int] = {}
+        self.min_bytes = 2**20
+        self._users = 0
+        self._originals = {}
+        self._lock = threading.Lock()
+
+    def install(self, min_bytes: int):
+        with self._lock:
+            self._users += 1
+            self.min_bytes = min(self.min_bytes, min_bytes) if self._users > 1 else min_bytes
+            if self._users > 1:
+                return
+            for owner, name in self._targets:
+                orig = getattr(owner, name)
+                self._originals[(owner, name)] = orig
+                setattr(owner, name, self._wrap(orig, f"{getattr(owner, '__name__', owner)}.{name}"))
+
+    def uninstall(self):
+        with self._lock:
+            self._users -= 1
+            if self._users:
+                return
+            for (owner, name), orig in self._originals.items():
+                setattr(owner, name, orig)
+            self._originals.clear()
+
+    def _wrap(self, orig, key: str):
+        def wrapper(*args, **kwargs):
+            out = orig(*args, **kwargs)
+            if _nbytes(out) >= self.min_bytes:
+                self.count += 1
+                self.by_call[key] = self.by_call.get(key, 0) + 1
+            return out
+        wrapper.__wrapped__ = orig
+        return wrapper
+
+
+def _nbytes(obj) -> int:
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, Image.Image):
+        return obj.size[0] * obj.size[1] * len(obj.getbands())
+    return 0
+
+
+_copy_hooks = _CopyHooks()
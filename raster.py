@@ -0,0 +1,180 @@
+"""Anti-aliased NumPy rasterizer for the generator's shape primitives.
+
+Each shape is evaluated only over its bounding box (intersected with the band
+being painted): a signed distance to the shape's edge gives per-pixel
+coverage, which scales the fill alpha before compositing into the canvas in
+place. Coverage is a pure function of pixel position, so painting a shape in
+bands gives exactly the same pixels as painting it in one go.
+"""
+import math
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Shapes are planned by the engine as (kind, geometry, fill[, width]):
+#   ("circle", [x0, y0, x1, y1], rgba)   ellipse inscribed in the box
+#   ("rect",   [x0, y0, x1, y1], rgba)
+#   ("poly",   [(x, y), ...], rgba)
+#   ("line",   [(x1, y1), (x2, y2)], rgba, width)
+# Box and point coordinates are pixel indices, as ImageDraw takes them; the
+# rasterizer samples pixel (x, y) at its centre (x + 0.5, y + 0.5).
+
+
+def shape_bounds(shape) -> Tuple[int, int, int, int]:
+    """Integer pixel box [x0, x1) x [y0, y1) that can receive coverage."""
+    kind, geom = shape[0], shape[1]
+    if kind in ("circle", "rect"):
+        x0, y0, x1, y1 = geom
+        return int(math.floor(x0)) - 1, int(math.floor(y0)) - 1, int(math.ceil(x1)) + 2, int(math.ceil(y1)) + 2
+    pad = shape[3] / 2 + 1 if kind == "line" else 1
+    xs = [p[0] for p in geom]
+    ys = [p[1] for p in geom]
+    return (int(math.floor(min(xs) - pad)), int(math.floor(min(ys) - pad)),
+            int(math.ceil(max(xs) + pad)) + 1, int(math.ceil(max(ys) + pad)) + 1)
+
+def _segment_distance(px, py, ax, ay, bx, by) -> np.ndarray:
+    dx, dy = bx - ax, by - ay
+    len2 = dx * dx + dy * dy
+    if len2 == 0:
+        return np.hypot(px - ax, py - ay)
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / len2, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+def _signed_distance(shape, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+    """Distance inside the shape's edge (positive inside), in pixels."""
+    kind, geom = shape[0], shape[1]
+    if kind == "circle":
+        x0, y0, x1, y1 = geom
+        cx, cy = (x0 + x1 + 1) / 2, (y0 + y1 + 1) / 2
+        rx, ry = (x1 - x0 + 1) / 2, (y1 - y0 + 1) / 2
+        # Distance for an ellipse, scaled back to pixels along the minor radius.
+        r = min(rx, ry)
+        return r - np.hypot((px - cx) * (r / rx), (py - cy) * (r / ry))
+    if kind == "rect":
+        x0, y0, x1, y1 = geom
+        return np.minimum(np.minimum(px - x0, x1 + 1 - px), np.minimum(py - y0, y1 + 1 - py))
+    if kind == "line":
+        (ax, ay), (bx, by) = geom
+        return shape[3] / 2 - _segment_distance(px, py, ax + 0.5, ay + 0.5, bx + 0.5, by + 0.5)
+
+    # poly: distance to the nearest edge, signed by the even-odd rule
+    pts = [(x + 0.5, y + 0.5) for x, y in geom]
+    dist = None
+    inside = np.zeros(np.broadcast(px, py).shape, dtype=bool)
+    for (ax, ay), (bx, by) in zip(pts, pts[1:] + pts[:1]):
+        d = _segment_distance(px, py, ax, ay, bx, by)
+        dist = d if dist is None else np.minimum(dist, d)
+        if ay != by:
+            crosses = (ay > py) != (by > py)
+            x_at = (bx - ax) * (py - ay) / (by - ay) + ax
+            inside ^= crosses & (px < x_at)
+    return np.where(inside, dist, -dist)
+
+def _rect_coverage(geom, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+    """Exact area coverage of an axis-aligned rectangle (box filter)."""
+    x0, y0, x1, y1 = geom
+    cov_x = np.clip(np.minimum(px + 0.5, x1 + 1) - np.maximum(px - 0.5, x0), 0.0, 1.0)
+    cov_y = np.clip(np.minimum(py + 0.5, y1 + 1) - np.maximum(py - 0.5, y0), 0.0, 1.0)
+    return cov_x * cov_y
+
+def _pixel_coverage(shape, px: np.ndarray, py: np.ndarray, aa: bool) -> np.ndarray:
+    """Coverage at pixel indices ``px``, ``py`` (broadcastable integer-valued arrays)."""
+    px = px.astype(np.float32) + 0.5
+    py = py.astype(np.float32) + 0.5
+    if aa and shape[0] == "rect":
+        return _rect_coverage(shape[1], px, py)
+    sd = _signed_distance(shape, px, py)
+    if aa:
+        return np.clip(sd + 0.5, 0.0, 1.0)
+    return sd >= 0
+
+# Coverage is evaluated per pixel only in TILE x TILE tiles that straddle an
+# edge. The signed distance changes by at most one per pixel, so a tile whose
+# centre is further than its half-diagonal (plus slack) from the edge is
+# entirely inside (coverage 1) or outside (coverage 0).
+TILE = 16
+_TILE_MARGIN = TILE * 0.7072 + 2.0
+
+def coverage(shape, x0: int, y0: int, x1: int, y1: int, aa: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Float32 coverage in [0, 1] of ``shape`` over pixels [x0, x1) x [y0, y1).
+
+    Also returns the (rows, cols) tile mask of tiles with any coverage.
+    """
+    nty, ntx = -(-(y1 - y0) // TILE), -(-(x1 - x0) // TILE)
+    tx = x0 + np.arange(ntx) * TILE + TILE / 2
+    ty = y0 + np.arange(nty) * TILE + TILE / 2
+    sd = _signed_distance(shape, tx[None, :], ty[:, None])
+    inside = sd > _TILE_MARGIN
+    edge = ~inside & (sd >= -_TILE_MARGIN)
+
+    tiles = inside.astype(np.float32)
+    cov = np.repeat(np.repeat(tiles, TILE, axis=0), TILE, axis=1)
+    ti, tj = np.nonzero(edge)
+    if len(ti):
+        offs = np.arange(TILE)
+        py = (y0 + ti * TILE)[:, None, None] + offs[None, :, None]
+        px = (x0 + tj * TILE)[:, None, None] + offs[None, None, :]
+        cov.reshape(nty, TILE, ntx, TILE)[ti, :, tj, :] = _pixel_coverage(shape, px, py, aa)
+    return cov[:y1 - y0, :x1 - x0], inside | edge
+
+_WEIGHT_SCALE = np.float32(2**16)
+
+def composite(region: np.ndarray, rgba: Tuple[int, int, int, int], cov: np.ndarray,
+              color: Optional[np.ndarray] = None):
+    """Composite a flat colour with per-pixel coverage into ``region`` in place.
+
+    RGB regions blend; RGBA regions use Porter-Duff "over". ``color`` may be a
+    preallocated block of the colour at least as large as ``region``.
+    """
+    h, w, c = region.shape
+    if color is None:
+        color = _color_block(rgba, h, w, c)
+    src_a = cov * np.float32(rgba[3] / 255)
+    if c == 3:
+        keep = 1 - src_a
+    else:
+        keep = region[..., 3].astype(np.float32) * np.float32(1 / 255) * (1 - src_a)
+    if c == 4:
+        alpha = ((keep + src_a) * 255 + 0.5).astype(np.uint8)
+        # Both weights zero (no coverage over alpha 0) would blend to black;
+        # weight the pixel itself instead so it stays as it was
+        keep[(keep == 0) & (cov == 0)] = 1
+    # blendLinear normalises by the weight sum, which for "over" is the new
+    # alpha; it writes straight into the (row-strided) canvas view. It divides
+    # by (sum + 1e-5), so the weights are scaled up to keep that epsilon from
+    # shifting faint pixels: zero coverage must leave a pixel untouched.
+    keep *= _WEIGHT_SCALE
+    src_a *= _WEIGHT_SCALE
+    cv2.blendLinear(region, color[:h, :w], keep, src_a, dst=region)
+    if c == 4:
+        region[..., 3] = alpha
+
+def _color_block(rgba: Tuple[int, int, int, int], h: int, w: int, c: int) -> np.ndarray:
+    """Read-only (h, w, c) block of one colour (bytes repetition beats array fill)."""
+    pixel = bytes((*rgba[:3], 255)[:c])
+    return np.frombuffer(pixel * (h * w), dtype=np.uint8).reshape(h, w, c)
+
+def paint_shape(canvas: np.ndarray, shape, y0: int, y1: int, aa: bool = True,
+                bounds: Optional[Tuple[int, int, int, int]] = None):
+    """Paint ``shape`` into canvas rows [y0, y1), touching only its bounding box."""
+    h, w, c = canvas.shape
+    bx0, by0, bx1, by1 = bounds or shape_bounds(shape)
+    bx0, bx1 = max(bx0, 0), min(bx1, w)
+    by0, by1 = max(by0, y0, 0), min(by1, y1, h)
+    if bx0 >= bx1 or by0 >= by1:
+        return
+    cov, hit = coverage(shape, bx0, by0, bx1, by1, aa)
+    rows = np.nonzero(hit.any(axis=1))[0]
+    if not len(rows):
+        return
+    if hit.mean() > 0.5:
+        composite(canvas[by0:by1, bx0:bx1], shape[2], cov)
+        return
+    # Sparse shapes (long thin lines): composite each tile row's covered span.
+    color = _color_block(shape[2], TILE, bx1 - bx0, c)
+    for i in rows:
+        cols = np.nonzero(hit[i])[0]
+        r0, r1 = i * TILE, min((i + 1) * TILE, by1 - by0)
+        c0, c1 = cols[0] * TILE, min((cols[-1] + 1) * TILE, bx1 - bx0)
+        composite(canvas[by0 + r0:by0 + r1, bx0 + c0:bx0 + c1], shape[2], cov[r0:r1, c0:c1], color)
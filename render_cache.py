@@ -0,0 +1,226 @@
+"""Content-addressed cache of rendered designs.
+
+A design is a pure function of (seed, DesignParams), so the canonical hash of
+those fields names its pixels. Two LRU tiers sit in front of the engine:
+
+* memory: recently served designs as decoded images plus their PNG bytes,
+  bounded by total bytes. Designs bigger than ``max_item_bytes`` decoded
+  (print sizes) skip this tier, so memory holds previews, not print files;
+* disk: encoded PNGs named ``<key>.png``, bounded by total file size. Last use
+  is the file's mtime, so the LRU order survives restarts.
+
+A memory miss that hits disk decodes the PNG and promotes it; a miss on both
+renders, encodes and fills both tiers.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from engine import DesignParams, resolve_seed, render_design
+from export import encode_png
+
+# Bump when the engine's output for a given (seed, params) changes, so stale
+# PNGs on disk are never served for a new renderer.
+RENDER_VERSION = 5
+
+# PNGs on disk are a storage format (exports re-encode from pixels), so favour speed.
+STORE_COMPRESS_LEVEL = 1
+
+DEFAULT_MEMORY_BYTES = 512 * 2**20
+DEFAULT_MAX_ITEM_BYTES = 32 * 2**20  # a 2800x2800 RGBA design; ~800 px previews are ~4 MB
+DEFAULT_DISK_BYTES = 2 * 2**30
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TSHIRTGEN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".render_cache"))
+
+
+def cache_key(params: DesignParams, seed: int) -> str:
+    """Canonical hash of everything that determines a design's pixels."""
+    fields = dict(params.to_dict(), seed=int(seed), version=RENDER_VERSION)
+    blob = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RenderCache:
+    """Two-tier (memory, disk) LRU cache in front of ``render_design``; thread-safe."""
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 memory_bytes: int = DEFAULT_MEMORY_BYTES, disk_bytes: int = DEFAULT_DISK_BYTES,
+                 max_item_bytes: int = DEFAULT_MAX_ITEM_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.max_item_bytes = max_item_bytes
+        self.disk_bytes = disk_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (image, png bytes)
+        self._memory_used = 0
+        self._disk = OrderedDict()    # key -> file size, least recently used first
+        self._disk_used = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    # ---------------- Public API ----------------
+    def get(self, params: DesignParams, seed, workers: int = 1) -> Tuple[Image.Image, bytes]:
+        """The design for (params, seed) as (image, PNG bytes), rendering only on a miss."""
+        seed = resolve_seed(seed)
+        key = cache_key(params, seed)
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+
+        img = render_design(params, seed, workers=workers)
+        png = encode_png(img, STORE_COMPRESS_LEVEL, workers=workers)
+        with self._lock:
+            self.stats.misses += 1
+            self._remember(key, img, png)
+        self._store_disk(key, png)
+        return img, png
+
+    def __contains__(self, item) -> bool:
+        params, seed = item
+        key = cache_key(params, resolve_seed(seed))
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def clear(self):
+        """Drop both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            for key in list(self._disk):
+                self._drop_disk(key)
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "memory_budget": self.memory_bytes,
+                "disk_items": len(self._disk),
+                "disk_bytes": self._disk_used,
+            }
+
+    # ---------------- Tiers ----------------
+    def _lookup(self, key: str) -> Optional[Tuple[Image.Image, bytes]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return entry
+            on_disk = key in self._disk
+        if not on_disk:
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                png = f.read()
+            img = Image.open(io.BytesIO(png))
+            img.load()
+        except (OSError, Image.UnidentifiedImageError):
+            # Removed or truncated behind our back: forget it and re-render.
+            with self._lock:
+                self._drop_disk(key)
+            return None
+        with self._lock:
+            self.stats.disk_hits += 1
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._remember(key, img, png)
+        self._touch(key)
+        return img, png
+
+    def _remember(self, key: str, img: Image.Image, png: bytes):
+        """Put an entry in the memory tier (lock held)."""
+        size = img.width * img.height * len(img.getbands()) + len(png)
+        if size > min(self.memory_bytes, self.max_item_bytes):
+            return
+        if key in self._memory:
+            self._memory_used -= self._entry_size(self._memory.pop(key))
+        self._memory[key] = (img, png)
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_used -= self._entry_size(old)
+            self.stats.memory_evictions += 1
+
+    @staticmethod
+    def _entry_size(entry) -> int:
+        img, png = entry
+        return img.width * img.height * len(img.getbands()) + len(png)
+
+    def _store_disk(self, key: str, png: bytes):
+        if not self.cache_dir or len(png) > self.disk_bytes:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._disk_used -= self._disk.pop(key, 0)
+            self._disk[key] = len(png)
+            self._disk_used += len(png)
+            while self._disk_used > self.disk_bytes and len(self._disk) > 1:
+                self._drop_disk(next(iter(self._disk)))
+                self.stats.disk_evictions += 1
+
+    def _drop_disk(self, key: str):
+        """Forget and delete one disk entry (lock held)."""
+        self._disk_used -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _scan_disk(self):
+        """Index existing PNGs, least recently used (oldest mtime) first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".png"):
+                continue
+            st = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_used += size
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
@@ -0,0 +1,581 @@
+"""Local render service: a priority job queue in front of a process pool.
+
+    python render_server.py --port 8765 --workers 2 --max-queue 32
+
+Streamlit sessions submit print renders here instead of rendering in the
+server process, so one 8000x8000 design no longer stalls every other
+session. Jobs wait in a priority queue (higher ``priority`` first, FIFO
+within a priority) and are handed to a fixed number of worker processes only
+as workers free up, so priorities hold under load. When ``max_queue`` jobs
+are waiting, a submission waits up to its ``wait`` seconds for room and is
+then rejected with 429 and a Retry-After estimate. A job that passes its
+``timeout`` (counted from submission) is marked ``timeout`` and its result
+dropped; a worker cannot be interrupted mid-render, so its slot stays busy
+until that render returns. Submitting a job identical to one still held
+(same params, seed, export settings and owner) returns the existing job,
+unless its file has been evicted from the spool.
+
+Workers write finished files straight into a disk spool (see spool.py), so
+results never sit in the server's heap; downloads are streamed from a memory
+map. A job's optional ``owner`` (the app sends its session id) is charged
+for its files against a per-owner budget, and all files together against a
+global one; the oldest are evicted first and their jobs answer 410.
+``params.fonts`` may only name files in the font directory the app saves
+uploads to ($TSHIRTGEN_FONT_DIR, by default ``.fonts`` next to this module).
+
+API (JSON unless noted)
+    POST   /jobs              {"params": {...}, "seed": 1, "priority": 0, "timeout": 300,
+                               "wait": 0, "owner": "...", "export": {"fmt": "PNG", "dpi": 300, ...}}
+                              -> 202 job | 400 bad request | 429 queue full
+    GET    /jobs/<id>         job status
+    GET    /jobs/<id>/result  the encoded file (409 until done, 410 once evicted)
+    DELETE /jobs/<id>         cancel a queued job
+    GET    /stats             queue depth, counters, wait/latency percentiles
+"""
+import argparse
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from engine import BASE_STYLES, NOISE_TEXTURES, PALETTE_MODES, DesignParams, render_design
+from export import MIME_TYPES, export_image
+from render_cache import cache_key
+from spool import DEFAULT_OWNER_BYTES, DEFAULT_TOTAL_BYTES, Spool, SpoolEntry
+
+DEFAULT_PORT = 8765
+# Fonts a request may name: files in the directory the app saves uploaded fonts to
+FONT_DIR = os.environ.get(
+    "TSHIRTGEN_FONT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fonts"))
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_KEEP_RESULTS = 256  # finished jobs remembered; their files are also bounded by the spool
+JOB_STATES = ["queued", "running", "done", "failed", "timeout", "cancelled"]
+FINISHED = {"done", "failed", "timeout", "cancelled"}
+
+
+class QueueFull(Exception):
+    """The queue stayed full for as long as the submitter was willing to wait."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"render queue is full; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    id: str
+    params: DesignParams
+    seed: int
+    priority: int
+    timeout: float
+    export: dict
+    submitted: float
+    owner: Optional[str] = None
+    status: str = "queued"
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    error: Optional[str] = None
+    render_seconds: Optional[float] = None
+    encode_seconds: Optional[float] = None
+    result: Optional[SpoolEntry] = field(default=None, repr=False)
+
+    @property
+    def format(self) -> str:
+        return self.export.get("fmt", "PNG")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "seed": self.seed,
+            "priority": self.priority,
+            "format": self.format,
+            "wait_seconds": _rounded(self.started, self.submitted),
+            "seconds": _rounded(self.finished, self.submitted),
+            "render_seconds": self.render_seconds,
+            "encode_seconds": self.encode_seconds,
+            "bytes": self.result.size if self.result is not None else None,
+            "error": self.error,
+        }
+
+
+def _rounded(end: Optional[float], start: float) -> Optional[float]:
+    return round(end - start, 4) if end is not None else None
+
+def run_job(params: DesignParams, seed: int, export: dict, out_path: str):
+    """Worker side: render and encode one design into ``out_path``; returns (render s, encode s)."""
+    t0 = time.perf_counter()
+    img = render_design(params, seed)
+    render_seconds = time.perf_counter() - t0
+    result = export_image(img, **export)
+    with open(out_path, "wb") as f:
+        f.write(result.data)
+    return round(render_seconds, 4), round(result.seconds, 4)
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (``q`` in 0-100) of ``values``."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, max(0, -(-len(ordered) * q // 100) - 1))], 4)
+
+
+class RenderQueue:
+    """Priority queue + process pool; every method is thread-safe."""
+
+    def __init__(self, workers: int = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                 default_timeout: float = DEFAULT_TIMEOUT, keep_results: int = DEFAULT_KEEP_RESULTS,
+                 spool: Spool = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.keep_results = keep_results
+        self.spool = spool or Spool()
+        self._pool = self._new_pool()
+        self._pool_restarts = 0
+        self._cond = threading.Condition()
+        self._heap = []                  # (-priority, seq, job)
+        self._seq = itertools.count()
+        self._jobs = OrderedDict()       # id -> Job, oldest first
+        self._by_key = {}                # (design key, export, owner) -> id, for identical submissions
+        self._busy = 0                   # worker slots in use, timed-out renders included
+        self._counts = dict.fromkeys(["submitted", "rejected", "coalesced"] + JOB_STATES[2:], 0)
+        self._waits = deque(maxlen=2000)
+        self._latencies = deque(maxlen=2000)
+        self._started = time.monotonic()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="render-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    # ---------------- Public API ----------------
+    def submit(self, params: DesignParams, seed: int, priority: int = 0, timeout: float = None,
+               export: dict = None, wait: float = 0.0, owner: str = None) -> Job:
+        """Queue a job, waiting up to ``wait`` seconds for room; raises QueueFull after that."""
+        export = dict(export or {})
+        # Per owner: a shared job's file would be charged to (and evicted under) the first owner's budget
+        dedupe = (cache_key(params, seed), json.dumps(export, sort_keys=True), owner)
+        deadline = time.monotonic() + wait
+        with self._cond:
+            existing = self._jobs.get(self._by_key.get(dedupe))
+            if (existing is not None and existing.status == "done"
+                    and self.spool.get(existing.result.owner, existing.result.key) is None):
+                del self._by_key[dedupe]  # its file was evicted: render it again
+                existing = None
+            if existing is not None and existing.status in ("queued", "running", "done"):
+                self._counts["coalesced"] += 1
+                return existing
+            while len(self._heap) >= self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    self._counts["rejected"] += 1
+                    raise QueueFull(self._retry_after())
+                self._cond.wait(remaining)
+            job = Job(uuid.uuid4().hex, params, int(seed), int(priority),
+                      float(timeout or self.default_timeout), export, time.monotonic(), owner)
+            heapq.heappush(self._heap, (-job.priority, next(self._seq), job))
+            self._jobs[job.id] = job
+            self._by_key[dedupe] = job.id
+            self._counts["submitted"] += 1
+            self._cond.notify_all()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def position(self, job: Job) -> Optional[int]:
+        """0-based place of a queued job in dispatch order."""
+        with self._cond:
+            if job.status != "queued":
+                return None
+            entry = next(e for e in self._heap if e[2] is job)
+            return sum(1 for e in self._heap if e[:2] < entry[:2])
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; running jobs cannot be cancelled."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return False
+            self._heap = [entry for entry in self._heap if entry[2] is not job]
+            heapq.heapify(self._heap)
+            self._finish(job, "cancelled")
+            self._cond.notify_all()
+            return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            elapsed = time.monotonic() - self._started
+            waits, latencies = list(self._waits), list(self._latencies)
+            return dict(
+                self._counts,
+                queued=len(self._heap),
+                running=sum(1 for j in self._jobs.values() if j.status == "running"),
+                busy_workers=self._busy,
+                pool_restarts=self._pool_restarts,
+                workers=self.workers,
+                max_queue=self.max_queue,
+                spool=self.spool.usage(),
+                throughput_per_minute=round(self._counts["done"] / elapsed * 60, 2) if elapsed else 0.0,
+                wait_p50=percentile(waits, 50),
+                wait_p95=percentile(waits, 95),
+                latency_p50=percentile(latencies, 50),
+                latency_p95=percentile(latencies, 95),
+                latency_p99=percentile(latencies, 99),
+            )
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._dispatcher.join()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.spool.close()
+
+    # ---------------- Scheduling ----------------
+    def _dispatch(self):
+        """Hand queued jobs to free workers and expire overdue ones."""
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                self._expire(now)
+                while self._heap and self._busy < self.workers:
+                    _, _, job = heapq.heappop(self._heap)
+                    job.status, job.started = "running", now
+                    self._waits.append(now - job.submitted)
+                    self._busy += 1
+                    out_path = self.spool.temp_path()
+                    pool = self._pool
+                    try:
+                        future = pool.submit(run_job, job.params, job.seed, job.export, out_path)
+                    except Exception as exc:  # BrokenProcessPool once a worker has died
+                        self._busy -= 1
+                        job.error = f"{type(exc).__name__}: {exc}"
+                        self._finish(job, "failed")
+                        self._replace_pool(pool, exc)
+                        continue
+                    future.add_done_callback(
+                        lambda f, job=job, out_path=out_path, pool=pool: self._completed(job, f, out_path, pool))
+                    self._cond.notify_all()  # room in the queue
+                deadlines = [j.submitted + j.timeout for j in self._jobs.values()
+                             if j.status in ("queued", "running")]
+                self._cond.wait(max(0.01, min(deadlines) - now) if deadlines else None)
+
+    def _expire(self, now: float):
+        """Time out jobs past their deadline (lock held)."""
+        overdue = [j for j in self._jobs.values()
+                   if j.status in ("queued", "running") and now >= j.submitted + j.timeout]
+        if not overdue:
+            return
+        for job in overdue:
+            job.error = f"timed out after {job.timeout:g}s ({'queued' if job.status == 'queued' else 'rendering'})"
+            self._finish(job, "timeout")
+        self._heap = [entry for entry in self._heap if entry[2].status == "queued"]
+        heapq.heapify(self._heap)
+        self._cond.notify_all()
+
+    def _completed(self, job: Job, future, out_path: str, pool: ProcessPoolExecutor):
+        with self._cond:
+            self._busy -= 1
+            if job.status == "running":
+                try:
+                    job.render_seconds, job.encode_seconds = future.result()
+                    job.result = self.spool.adopt(job.owner or job.id, job.id, out_path)
+                    self._finish(job, "done")
+                except Exception as exc:
+                    job.error = f"{type(exc).__name__}: {exc}"
+                    self._finish(job, "failed")
+            if not future.cancelled() and future.exception() is not None:
+                self._replace_pool(pool, future.exception())
+            self._cond.notify_all()
+        if os.path.exists(out_path):  # failed or timed out
+            os.remove(out_path)
+
+    def _finish(self, job: Job, status: str):
+        """Record a terminal state and drop the oldest finished jobs (lock held)."""
+        job.status, job.finished = status, time.monotonic()
+        self._counts[status] += 1
+        if status == "done":
+            self._latencies.append(job.finished - job.submitted)
+        done = [j for j in self._jobs.values() if j.status in FINISHED]
+        for old in done[:max(0, len(done) - self.keep_results)]:
+            del self._jobs[old.id]
+            if old.result is not None:
+                self.spool.drop(old.result.owner, old.result.key)
+        self._by_key = {k: v for k, v in self._by_key.items() if v in self._jobs}
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the queue lives in a threaded server
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, pool: ProcessPoolExecutor, exc: BaseException):
+        """After a worker died (segfault, OOM kill) the whole pool is broken:
+        shut it down and start a fresh one (lock held). Its other jobs fail too."""
+        if not isinstance(exc, BrokenProcessPool) or pool is not self._pool or self._closed:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        self._pool_restarts += 1
+
+    def _retry_after(self) -> float:
+        """Rough seconds until a queue slot frees up: one render's time over the workers (lock held)."""
+        recent = [j.finished - j.started for j in self._jobs.values() if j.status == "done"][-20:]
+        service = sum(recent) / len(recent) if recent else 1.0
+        return max(1.0, service / self.workers)
+
+
+# ---------------- HTTP API ----------------
+# Same bounds and choices as the app's sidebar, so no request can ask for more than the UI can
+PARAM_RANGES = {"width": (512, 8000), "height": (512, 8000), "layers_count": (3, 25), "text_layers": (1, 6)}
+PARAM_CHOICES = {"palette_mode": PALETTE_MODES, "base_style": BASE_STYLES, "noise_texture": NOISE_TEXTURES}
+EXPORT_RANGES = {"compress_level": (0, 9), "quality": (50, 100), "dpi": (72, 1200)}
+EXPORT_KEYS = ("fmt", "optimize") + tuple(EXPORT_RANGES)
+MAX_OWNER_CHARS = 128
+
+
+def _integer(name: str, value, lo: Optional[int] = None, hi: Optional[int] = None) -> int:
+    """``value`` as an int; ValueError unless it is a whole number within [lo, hi]."""
+    if (isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+            or value != int(value)):
+        raise ValueError(f"{name} must be an integer")
+    if lo is not None and not lo <= value <= hi:
+        raise ValueError(f"{name} must be between {lo} and {hi}")
+    return int(value)
+
+
+def parse_params(data: dict) -> DesignParams:
+    """DesignParams from JSON; unknown fields raise TypeError, bad values ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("params must be a JSON object")
+    data = dict(data)
+    for name, (lo, hi) in PARAM_RANGES.items():
+        if name in data:
+            data[name] = _integer(name, data[name], lo, hi)
+    for name, choices in PARAM_CHOICES.items():
+        if name in data and data[name] not in choices:
+            raise ValueError(f"{name} must be one of {', '.join(choices)}")
+    for f in fields(DesignParams):
+        if f.type is bool and f.name in data and not isinstance(data[f.name], bool):
+            raise ValueError(f"{f.name} must be true or false")
+    if "fonts" in data:
+        if not isinstance(data["fonts"], list) or not all(isinstance(f, str) for f in data["fonts"]):
+            raise ValueError("fonts must be a list of strings")
+        data["fonts"] = tuple(_font_path(f) for f in data["fonts"])
+    return DesignParams(**data)
+
+def _font_path(font: str) -> str:
+    """``font`` (a name or path) as a file in FONT_DIR; ValueError for anything
+    else, so a request can't have the server open arbitrary paths."""
+    root = os.path.realpath(FONT_DIR)
+    path = os.path.realpath(os.path.join(root, font))
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        raise ValueError("fonts must name files in the server's font directory")
+    return path
+
+def parse_export(data: dict) -> dict:
+    """export_image keyword arguments from JSON; anything else raises ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("export must be a JSON object")
+    unknown = sorted(set(data) - set(EXPORT_KEYS))
+    if unknown:
+        raise ValueError(f"unknown export settings: {', '.join(unknown)}")
+    export = dict(data)
+    if export.get("fmt", "PNG") not in MIME_TYPES:
+        raise ValueError(f"unknown export format {export.get('fmt')!r}")
+    if not isinstance(export.get("optimize", False), bool):
+        raise ValueError("optimize must be true or false")
+    for name, (lo, hi) in EXPORT_RANGES.items():
+        if name in export and not (name == "dpi" and export[name] is None):  # dpi=None: no metadata
+            export[name] = _integer(name, export[name], lo, hi)
+    return export
+
+
+class _Handler(BaseHTTPRequestHandler):
+    queue: RenderQueue = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, obj, headers: dict = None):
+        self._send(status, json.dumps(obj).encode("utf-8"), headers=headers)
+
+    def _job(self, parts: List[str]) -> Optional[Job]:
+        job = self.queue.get(parts[1]) if len(parts) >= 2 else None
+        if job is None:
+            self._json(404, {"error": "no such job"})
+        return job
+
+    def _status(self, job: Job) -> dict:
+        return dict(job.to_dict(), position=self.queue.position(job))
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/jobs":
+            return self._json(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("body must be a JSON object")
+            params = parse_params(body.get("params", {}))
+            export = parse_export(body.get("export", {}))
+            owner = body.get("owner")
+            if owner is not None and (not isinstance(owner, str) or not 0 < len(owner) <= MAX_OWNER_CHARS):
+                raise ValueError(f"owner must be a string of 1 to {MAX_OWNER_CHARS} characters")
+            priority = _integer("priority", body.get("priority", 0))
+            job = self.queue.submit(params, int(body.get("seed", 0)), priority, body.get("timeout"), export,
+                                    float(body.get("wait", 0)), owner)
+        except QueueFull as exc:
+            return self._json(429, {"error": str(exc), "retry_after": round(exc.retry_after, 1)},
+                              {"Retry-After": str(int(-(-exc.retry_after // 1)))})
+        except (TypeError, ValueError) as exc:
+            return self._json(400, {"error": str(exc)})
+        self._json(202, self._status(job), {"Location": f"/jobs/{job.id}"})
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if parts == ["stats"]:
+            return self._json(200, self.queue.stats())
+        if parts[0] != "jobs" or len(parts) not in (2, 3):
+            return self._json(404, {"error": "not found"})
+        job = self._job(parts)
+        if job is None:
+            return
+        if len(parts) == 2:
+            return self._json(200, self._status(job))
+        if parts[2] != "result":
+            return self._json(404, {"error": "not found"})
+        if job.status != "done":
+            return self._json(409, self._status(job))
+        entry = self.queue.spool.get(job.result.owner, job.result.key)
+        chunks = None
+        if entry is not None:
+            try:
+                # Once mapped, the file stays readable even if it is evicted mid-download
+                chunks = self.queue.spool.iter_chunks(entry)
+                first = next(chunks, b"")
+            except OSError:
+                chunks = None
+        if chunks is None:
+            return self._json(410, dict(self._status(job), error="result evicted from the spool; submit again"))
+        self.send_response(200)
+        self.send_header("Content-Type", MIME_TYPES[job.format])
+        self.send_header("Content-Length", str(entry.size))
+        self.end_headers()
+        self.wfile.write(first)
+        for chunk in chunks:
+            self.wfile.write(chunk)
+
+    def do_DELETE(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        job = self._job(parts) if parts[0] == "jobs" and len(parts) == 2 else None
+        if job is None:
+            return
+        if not self.queue.cancel(job.id):
+            return self._json(409, self._status(job))
+        self._json(200, self._status(job))
+
+
+def make_server(queue: RenderQueue, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """An HTTP server (not yet serving) exposing ``queue``; port 0 picks a free one."""
+    handler = type("Handler", (_Handler,), {"queue": queue})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ---------------- Client ----------------
+class RenderClient:
+    """Talks to a render server, e.g. RenderClient("http://127.0.0.1:8765")."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def submit(self, params: DesignParams, seed: int, priority: int = 0, timeout: float = None,
+               export: dict = None, wait: float = 0.0, owner: str = None) -> dict:
+        body = {"params": params.to_dict(), "seed": int(seed), "priority": priority,
+                "timeout": timeout, "export": export or {}, "wait": wait, "owner": owner}
+        r = self._session.post(f"{self.base_url}/jobs", json=body, timeout=self.timeout + wait)
+        if r.status_code == 429:
+            raise QueueFull(float(r.json().get("retry_after", 1)))
+        r.raise_for_status()
+        return r.json()
+
+    def status(self, job_id: str) -> dict:
+        r = self._session.get(f"{self.base_url}/jobs/{job_id}", timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def result(self, job_id: str) -> bytes:
+        r = self._session.get(f"{self.base_url}/jobs/{job_id}/result", timeout=self.timeout)
+        r.raise_for_status()
+        return r.content
+
+    def cancel(self, job_id: str) -> bool:
+        r = self._session.delete(f"{self.base_url}/jobs/{job_id}", timeout=self.timeout)
+        return r.status_code == 200
+
+    def stats(self) -> dict:
+        r = self._session.get(f"{self.base_url}/stats", timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Serve design renders from a priority queue and process pool.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    p.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="Waiting jobs before submissions get 429")
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Default per-job timeout in seconds")
+    p.add_argument("--keep-results", type=int, default=DEFAULT_KEEP_RESULTS,
+                   help="Finished jobs remembered for status and fetching")
+    p.add_argument("--spool-dir", help="Directory for finished files (default: a fresh temp dir)")
+    p.add_argument("--spool-mb", type=int, default=DEFAULT_TOTAL_BYTES // 2**20, help="Disk budget for all results")
+    p.add_argument("--owner-spool-mb", type=int, default=DEFAULT_OWNER_BYTES // 2**20,
+                   help="Disk budget for one owner's (session's) results")
+    args = p.parse_args(argv)
+
+    spool = Spool(args.spool_dir, args.owner_spool_mb * 2**20, args.spool_mb * 2**20)
+    queue = RenderQueue(args.workers, args.max_queue, args.timeout, args.keep_results, spool)
+    server = make_server(queue, args.host, args.port)
+    print(f"Render server on http://{args.host}:{server.server_port} "
+          f"({queue.workers} workers, queue limit {args.max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
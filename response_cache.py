@@ -0,0 +1,320 @@
+"""TTL cache of API responses, with stale-while-revalidate and request coalescing.
+
+Each endpoint gets a CachePolicy (first matching host and path prefix in
+``policies``); endpoints without one (jokes, random activities) are never
+cached. For a cached endpoint, by the age of the stored response:
+
+* ``age < ttl``: fresh, served without a call;
+* ``age < ttl + stale``: served at once while one background call refreshes it;
+* older, or missing: fetched. Identical requests arriving while that call is
+  in flight wait for it instead of making their own (coalescing);
+* if the call fails (connection error, 429, 5xx), a response up to
+  ``ttl + stale_if_error`` old is served instead, so a rate-limited API
+  degrades to slightly old data rather than an error.
+
+Only 2xx responses are stored. Two tiers, like the render cache: memory
+(LRU, bounded by bytes) and an optional directory (one file per URL, bounded
+by total size), which lets several server processes share responses.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+
+DEFAULT_MEMORY_BYTES = 64 * 2**20
+DEFAULT_DISK_BYTES = 256 * 2**20
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TSHIRTGEN_API_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".api_cache"))
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float                   # seconds a response is fresh
+    stale: float = 0.0           # then served while revalidating, for this long
+    stale_if_error: float = 0.0  # served when the upstream fails, up to ttl + this
+
+
+# (host, path prefix) -> policy; the first match wins
+DEFAULT_POLICIES = {
+    ("geocoding-api.open-meteo.com", ""): CachePolicy(3 * DAY, DAY, 7 * DAY),
+    ("api.open-meteo.com", "/v1/forecast"): CachePolicy(10 * MINUTE, 5 * MINUTE, HOUR),
+    ("restcountries.com", ""): CachePolicy(14 * DAY, DAY, 30 * DAY),
+    ("ipapi.co", ""): CachePolicy(DAY, HOUR, 7 * DAY),
+    ("api.coingecko.com", ""): CachePolicy(10, 0, 10 * MINUTE),  # the crypto feed's poll floor
+    ("api.agify.io", ""): CachePolicy(7 * DAY, DAY, 30 * DAY),
+    ("api.genderize.io", ""): CachePolicy(7 * DAY, DAY, 30 * DAY),
+    ("api.nationalize.io", ""): CachePolicy(7 * DAY, DAY, 30 * DAY),
+    ("numbersapi.com", ""): CachePolicy(HOUR, HOUR, DAY),
+}
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    content_type: str
+    body: bytes
+    fetched: float               # time.time() of the upstream call
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched
+
+
+@dataclass
+class ResponseCacheStats:
+    fresh_hits: int = 0
+    stale_hits: int = 0          # served stale while revalidating
+    error_hits: int = 0          # served old after an upstream failure
+    misses: int = 0              # upstream calls made for a request
+    coalesced: int = 0           # requests that waited on another's call
+    refreshes: int = 0           # background revalidations
+    errors: int = 0              # upstream failures
+    by_host: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def hits(self) -> int:
+        return self.fresh_hits + self.stale_hits + self.error_hits + self.coalesced
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def count(self, host: str, what: str):
+        setattr(self, what, getattr(self, what) + 1)
+        counts = self.by_host.setdefault(host, {})
+        counts[what] = counts.get(what, 0) + 1
+
+
+def canonical_url(url: str) -> str:
+    """The URL with its query parameters sorted, so equivalent requests share a key."""
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(query=urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))))
+
+
+class ResponseCache:
+    """Policy-driven two-tier cache of GET responses; thread-safe."""
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 policies: Optional[Dict[Tuple[str, str], CachePolicy]] = None,
+                 memory_bytes: int = DEFAULT_MEMORY_BYTES, disk_bytes: int = DEFAULT_DISK_BYTES,
+                 refresh_workers: int = 4):
+        self.cache_dir = cache_dir or None
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.stats = ResponseCacheStats()
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # url -> CachedResponse, least recently used first
+        self._memory_used = 0
+        self._disk = OrderedDict()     # file key -> size, least recently used first
+        self._disk_used = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="revalidate")
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    # ---------------- Public API ----------------
+    def policy(self, url: str) -> Optional[CachePolicy]:
+        parts = urlsplit(url)
+        for (host, prefix), policy in self.policies.items():
+            if parts.netloc == host and parts.path.startswith(prefix):
+                return policy
+        return None
+
+    def get(self, url: str, fetch: Callable[[], CachedResponse]) -> Tuple[CachedResponse, str]:
+        """The response for ``url`` and how it was served ("fresh", "stale",
+        "error-stale", "coalesced" or "miss"). ``fetch`` makes the upstream call
+        and may raise; non-2xx results are returned but not stored."""
+        policy = self.policy(url)
+        if policy is None:
+            return fetch(), "uncached"
+        url = canonical_url(url)
+        host = urlsplit(url).netloc
+        now = time.time()
+        entry = self._lookup(url)
+        with self._lock:
+            if entry is not None and entry.age(now) < policy.ttl:
+                self.stats.count(host, "fresh_hits")
+                return entry, "fresh"
+            if entry is not None and entry.age(now) < policy.ttl + policy.stale:
+                self.stats.count(host, "stale_hits")
+                if url not in self._in_flight:
+                    self._in_flight[url] = future = Future()
+                    self.stats.count(host, "refreshes")
+                    self._refresher.submit(self._call, url, host, fetch, future)
+                return entry, "stale"
+            future = self._in_flight.get(url)
+            leader = future is None
+            if leader:
+                self._in_flight[url] = future = Future()
+                self.stats.count(host, "misses")
+            else:
+                self.stats.count(host, "coalesced")
+        if leader:
+            self._call(url, host, fetch, future)
+        try:
+            response = future.result()
+        except Exception:
+            response = None
+        if response is not None and 200 <= response.status < 300:
+            return response, "miss" if leader else "coalesced"
+        # The call failed: fall back to an old response if the policy allows it
+        if entry is not None and entry.age() < policy.ttl + policy.stale_if_error:
+            with self._lock:
+                self.stats.count(host, "error_hits")
+            return entry, "error-stale"
+        if response is None:
+            return future.result()  # re-raise the upstream error
+        return response, "miss" if leader else "coalesced"
+
+    def clear(self):
+        """Drop both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            for key in list(self._disk):
+                self._drop_disk(key)
+
+    def usage(self) -> dict:
+        with self._lock:
+            return {
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_items": len(self._disk),
+                "disk_bytes": self._disk_used,
+                "in_flight": len(self._in_flight),
+            }
+
+    def metrics(self) -> dict:
+        """Counters, hit rate and tier usage as plain values."""
+        with self._lock:
+            s = self.stats
+            out = {k: getattr(s, k) for k in ("fresh_hits", "stale_hits", "error_hits", "misses", "coalesced",
+                                              "refreshes", "errors")}
+            out["hit_rate"] = round(s.hit_rate, 4)
+            out["by_host"] = {host: dict(counts) for host, counts in s.by_host.items()}
+        out.update(self.usage())
+        return out
+
+    def close(self):
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------- Upstream ----------------
+    def _call(self, url: str, host: str, fetch: Callable[[], CachedResponse], future: Future):
+        """Make the one upstream call for ``url``, store a 2xx result and release its waiters."""
+        try:
+            response = fetch()
+        except Exception as exc:
+            with self._lock:
+                self.stats.count(host, "errors")
+                self._in_flight.pop(url, None)
+            future.set_exception(exc)
+            return
+        if 200 <= response.status < 300:
+            response.url = url
+            self._store(response)
+        else:
+            with self._lock:
+                self.stats.count(host, "errors")
+        with self._lock:
+            self._in_flight.pop(url, None)
+        future.set_result(response)
+
+    # ---------------- Tiers ----------------
+    def _lookup(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+                return entry
+            on_disk = self._file_key(url) in self._disk
+        if not on_disk:
+            return None
+        try:
+            with open(self._path(self._file_key(url)), "rb") as f:
+                header, body = f.read().split(b"\n", 1)
+            meta = json.loads(header)
+            entry = CachedResponse(meta["url"], meta["status"], meta["content_type"], body, meta["fetched"])
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._drop_disk(self._file_key(url))
+            return None
+        with self._lock:
+            self._remember(entry)
+        return entry
+
+    def _store(self, response: CachedResponse):
+        with self._lock:
+            self._remember(response)
+        if not self.cache_dir:
+            return
+        key = self._file_key(response.url)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        header = json.dumps({"url": response.url, "status": response.status,
+                             "content_type": response.content_type, "fetched": response.fetched})
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header.encode() + b"\n" + response.body)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._disk_used -= self._disk.pop(key, 0)
+            self._disk[key] = size
+            self._disk_used += size
+            while self._disk_used > self.disk_bytes and len(self._disk) > 1:
+                self._drop_disk(next(iter(self._disk)))
+
+    def _remember(self, entry: CachedResponse):
+        """Put a response in the memory tier (lock held)."""
+        if len(entry.body) > self.memory_bytes:
+            return
+        old = self._memory.pop(entry.url, None)
+        if old is not None:
+            self._memory_used -= len(old.body)
+        self._memory[entry.url] = entry
+        self._memory_used += len(entry.body)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted.body)
+
+    def _drop_disk(self, key: str):
+        """Forget and delete one disk entry (lock held)."""
+        self._disk_used -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _scan_disk(self):
+        """Index existing responses, oldest first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".resp"):
+                continue
+            st = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((st.st_mtime, name[:-5], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_used += size
+
+    @staticmethod
+    def _file_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:40]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.resp")
@@ -0,0 +1,171 @@
+"""Disk spool for rendered artefacts, with per-owner and global byte budgets.
+
+Print files are tens of MB each; holding them in every session's memory
+makes RSS grow with the number of designers. The spool writes them to files
+in a temp directory instead and serves them back through memory maps, so the
+bytes live in the page cache (shared, reclaimable) rather than the heap.
+
+Each artefact belongs to an owner (a Streamlit session, a render job's
+submitter). When an owner goes over ``owner_bytes``, or everyone together
+over ``total_bytes``, the oldest artefacts are deleted first. The newest
+artefact of an owner is never evicted to make room for itself.
+"""
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+DEFAULT_OWNER_BYTES = 256 * 2**20
+DEFAULT_TOTAL_BYTES = 2 * 2**30
+CHUNK_BYTES = 2**20
+
+
+@dataclass(frozen=True)
+class SpoolEntry:
+    key: str
+    owner: str
+    path: str
+    size: int
+    created: float
+
+
+class Spool:
+    """Budgeted artefact files under one directory; thread-safe."""
+
+    def __init__(self, directory: Optional[str] = None, owner_bytes: int = DEFAULT_OWNER_BYTES,
+                 total_bytes: int = DEFAULT_TOTAL_BYTES):
+        self._own_dir = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="tshirtgen-spool-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.owner_bytes = owner_bytes
+        self.total_bytes = total_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # (owner, key) -> SpoolEntry, oldest first
+        self._owner_used: Dict[str, int] = {}
+        self._used = 0
+
+    # ---------------- Public API ----------------
+    def put(self, owner: str, key: str, data: bytes) -> SpoolEntry:
+        """Spool ``data`` as (owner, key), replacing any previous artefact of that name."""
+        tmp = self.temp_path()
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.adopt(owner, key, tmp)
+
+    def temp_path(self) -> str:
+        """A fresh path inside the spool for a writer (e.g. another process) to fill and ``adopt``."""
+        return os.path.join(self.directory, f"incoming-{uuid.uuid4().hex}.tmp")
+
+    def adopt(self, owner: str, key: str, src: str) -> SpoolEntry:
+        """Move a finished file at ``src`` (ideally from ``temp_path``) into the spool as (owner, key)."""
+        path = os.path.join(self.directory, f"{_safe(owner)}-{_safe(key)}")
+        os.replace(src, path)
+        entry = SpoolEntry(key, owner, path, os.path.getsize(path), time.time())
+        with self._lock:
+            self._forget((owner, key), delete=False)
+            self._entries[(owner, key)] = entry
+            self._owner_used[owner] = self._owner_used.get(owner, 0) + entry.size
+            self._used += entry.size
+            self._evict(owner)
+        return entry
+
+    def get(self, owner: str, key: str) -> Optional[SpoolEntry]:
+        """The artefact, or None if it was never spooled or has been evicted."""
+        with self._lock:
+            return self._entries.get((owner, key))
+
+    def read(self, entry: SpoolEntry) -> bytes:
+        """The artefact's bytes, copied out of a memory map."""
+        if entry.size == 0:
+            return b""
+        with open(entry.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+
+    def iter_chunks(self, entry: SpoolEntry, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+        """Stream the artefact from a memory map, ``chunk_bytes`` at a time."""
+        with open(entry.path, "rb") as f:
+            if entry.size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, len(mm), chunk_bytes):
+                    yield mm[start:start + chunk_bytes]
+
+    def drop(self, owner: str, key: str):
+        with self._lock:
+            self._forget((owner, key))
+
+    def drop_owner(self, owner: str):
+        with self._lock:
+            for name in [n for n in self._entries if n[0] == owner]:
+                self._forget(name)
+
+    def usage(self, owner: Optional[str] = None) -> dict:
+        """Bytes and artefact counts, overall and for ``owner`` if given."""
+        with self._lock:
+            out = {
+                "bytes": self._used,
+                "items": len(self._entries),
+                "owners": len(self._owner_used),
+                "total_budget": self.total_bytes,
+                "owner_budget": self.owner_bytes,
+                "evictions": self.evictions,
+            }
+            if owner is not None:
+                out["owner_bytes"] = self._owner_used.get(owner, 0)
+                out["owner_items"] = sum(1 for n in self._entries if n[0] == owner)
+            return out
+
+    def close(self):
+        """Delete every artefact (and the directory, if the spool created it)."""
+        with self._lock:
+            for name in list(self._entries):
+                self._forget(name)
+        if self._own_dir:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    # ---------------- Budgets ----------------
+    def _evict(self, owner: str):
+        """Delete the oldest artefacts until both budgets hold (lock held)."""
+        newest = next(reversed(self._entries))
+        for name in [n for n in self._entries if n[0] == owner]:
+            if self._owner_used.get(owner, 0) <= self.owner_bytes:
+                break
+            if name != newest:
+                self._forget(name)
+                self.evictions += 1
+        for name in list(self._entries):
+            if self._used <= self.total_bytes:
+                break
+            if name != newest:
+                self._forget(name)
+                self.evictions += 1
+
+    def _forget(self, name, delete: bool = True):
+        """Drop one artefact's accounting and, by default, its file (lock held)."""
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        self._used -= entry.size
+        self._owner_used[entry.owner] -= entry.size
+        if not self._owner_used[entry.owner]:
+            del self._owner_used[entry.owner]
+        if delete:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def _safe(name: str) -> str:
+    """A filename part for ``name``; the hash keeps names that sanitize or
+    truncate alike apart."""
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)[:96] + f"_{digest}"
@@ -0,0 +1,94 @@
+"""Process-wide bank of tileable noise textures for the blend-noise stage.
+
+The bank holds TEXTURES_PER_KIND tiles of each kind in TEXTURE_KINDS, all
+TEXTURE_SIZE square, RGB uint8 and seamless when repeated. It is generated
+from a fixed seed, so every process gets the same bank: the first one saves
+it next to this module (or to $TSHIRTGEN_TEXTURE_BANK) and the rest
+memory-map that file, sharing its pages. A design seed only picks a tile and
+an offset, so texturing costs the same however many renders run.
+
+* white: independent uniform noise per channel.
+* value: four octaves of smoothstep-interpolated lattice noise.
+* grain: monochrome Gaussian film grain, lightly blurred.
+"""
+import os
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+TEXTURE_KINDS = ["white", "value", "grain"]
+TEXTURE_SIZE = 512
+TEXTURES_PER_KIND = 8
+BANK_SEED = 20240611
+BANK_VERSION = 1
+
+DEFAULT_BANK_PATH = os.environ.get(
+    "TSHIRTGEN_TEXTURE_BANK",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 f".texture_bank_v{BANK_VERSION}_{TEXTURE_SIZE}.npy"))
+
+
+def _white(rng: np.random.Generator, size: int) -> np.ndarray:
+    return rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+
+def _value(rng: np.random.Generator, size: int) -> np.ndarray:
+    total = np.zeros((size, size, 3), dtype=np.float32)
+    for cells, amp in ((4, 1.0), (8, 0.5), (16, 0.25), (32, 0.125)):
+        lattice = rng.random((cells, cells, 3), dtype=np.float32)
+        # Lattice indices wrap, so the tile is seamless
+        x = np.arange(size, dtype=np.float32) * (cells / size)
+        i0 = x.astype(np.int64)
+        i1 = (i0 + 1) % cells
+        f = x - i0
+        f = f * f * (3 - 2 * f)
+        rows = lattice[:, i0] * (1 - f)[None, :, None] + lattice[:, i1] * f[None, :, None]
+        total += amp * (rows[i0] * (1 - f)[:, None, None] + rows[i1] * f[:, None, None])
+    lo, hi = total.min(), total.max()
+    return ((total - lo) * (255 / (hi - lo)) + 0.5).astype(np.uint8)
+
+def _grain(rng: np.random.Generator, size: int) -> np.ndarray:
+    pad = 4
+    grain = rng.normal(128, 48, (size, size)).astype(np.float32)
+    grain = cv2.GaussianBlur(np.pad(grain, pad, mode="wrap"), (0, 0), sigmaX=0.7)[pad:-pad, pad:-pad]
+    grain = np.clip(grain + 0.5, 0, 255).astype(np.uint8)
+    return np.repeat(grain[..., None], 3, axis=2)
+
+_GENERATORS = {"white": _white, "value": _value, "grain": _grain}
+
+def build_bank(size: int = TEXTURE_SIZE, per_kind: int = TEXTURES_PER_KIND) -> np.ndarray:
+    """(kinds, per_kind, size, size, 3) uint8 bank, the same in every process."""
+    bank = np.empty((len(TEXTURE_KINDS), per_kind, size, size, 3), dtype=np.uint8)
+    for k, kind in enumerate(TEXTURE_KINDS):
+        for i in range(per_kind):
+            rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence([BANK_SEED, k, i])))
+            bank[k, i] = _GENERATORS[kind](rng, size)
+    return bank
+
+@lru_cache(maxsize=None)
+def texture_bank(path: str = DEFAULT_BANK_PATH) -> np.ndarray:
+    """The bank, memory-mapped from ``path``; built and saved there on first use."""
+    expected = (len(TEXTURE_KINDS), TEXTURES_PER_KIND, TEXTURE_SIZE, TEXTURE_SIZE, 3)
+    if path:
+        try:
+            bank = np.load(path, mmap_mode="r")
+            if bank.shape == expected and bank.dtype == np.uint8:
+                return bank
+        except (OSError, ValueError):
+            pass
+    bank = build_bank()
+    if path:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.save(f, bank)
+            os.replace(tmp, path)
+            return np.load(path, mmap_mode="r")
+        except OSError:
+            pass
+    bank.flags.writeable = False
+    return bank
+
+def texture(kind: str, index: int) -> np.ndarray:
+    """One (TEXTURE_SIZE, TEXTURE_SIZE, 3) tile; ``index`` wraps around the bank."""
+    return texture_bank()[TEXTURE_KINDS.index(kind), index % TEXTURES_PER_KIND]